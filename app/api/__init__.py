@@ -1,5 +1,34 @@
 # coding:utf-8
-from .khinsider import KhinsiderAPI
+"""
+Network and scraping layer
 
-__all__ = ['KhinsiderAPI']
+requests, urllib3 and BeautifulSoup take a noticeable part of the startup
+time to import, so a submodule is only imported when one of its names is
+first used.
+"""
+from importlib import import_module
 
+_EXPORTS = {
+    'HttpSession': 'session',
+    'NetworkScheduler': 'scheduler',
+    'TokenBucket': 'scheduler',
+    'networkScheduler': 'scheduler',
+    'ResponseCache': 'response_cache',
+    'responseCache': 'response_cache',
+    'AlbumIndex': 'album_index',
+    'albumIndex': 'album_index',
+    'KhinsiderAPI': 'khinsider',
+    'AsyncKhinsiderAPI': 'async_khinsider',
+    'asyncKhinsider': 'async_khinsider'
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,346 @@
+# coding:utf-8
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from ..common.config import get_cache_dir
+
+
+class AlbumIndex:
+    """
+    Local full-text index of every album the app has seen
+
+    Records are upserted from category pages and album pages, so the index
+    grows while the user browses. Queries match word prefixes of the title,
+    platform, type and year through SQLite FTS5, best match first. When no
+    album contains all query words, albums matching any of them are returned.
+
+    Upserts share one connection behind a lock, while searches borrow one of
+    a few reader connections, so WAL lets a search run during a large upsert
+    instead of waiting for it. If the database can not be opened, e.g. because
+    SQLite lacks FTS5, searches find nothing and the error is printed once.
+    """
+
+    FIELDS = ('title', 'platform', 'type', 'year', 'url', 'cover')
+
+    # columns of the FTS table, title matches weigh most
+    WEIGHTS = (10.0, 2.0, 1.0, 1.0)
+    RANK = f"bm25(album_search, {', '.join(map(str, WEIGHTS))})"
+
+    # ranking costs time per match, so queries matching more albums only rank
+    # this many candidates, preferring the newest albums matching by title
+    MAX_RANKED = 200
+
+    # connections searches borrow, threads beyond it wait for one
+    MAX_READERS = 4
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS albums (
+            id INTEGER PRIMARY KEY,
+            url TEXT UNIQUE NOT NULL,
+            title TEXT NOT NULL DEFAULT '',
+            platform TEXT NOT NULL DEFAULT '',
+            type TEXT NOT NULL DEFAULT '',
+            year TEXT NOT NULL DEFAULT '',
+            cover TEXT,
+            updatedAt REAL NOT NULL
+        );
+        CREATE VIRTUAL TABLE IF NOT EXISTS album_search USING fts5(
+            title, platform, type, year,
+            content='albums', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='1 2 3'
+        );
+        CREATE TRIGGER IF NOT EXISTS albums_ai AFTER INSERT ON albums BEGIN
+            INSERT INTO album_search(rowid, title, platform, type, year)
+            VALUES (new.id, new.title, new.platform, new.type, new.year);
+        END;
+        CREATE TRIGGER IF NOT EXISTS albums_au AFTER UPDATE ON albums BEGIN
+            INSERT INTO album_search(album_search, rowid, title, platform, type, year)
+            VALUES ('delete', old.id, old.title, old.platform, old.type, old.year);
+            INSERT INTO album_search(rowid, title, platform, type, year)
+            VALUES (new.id, new.title, new.platform, new.type, new.year);
+        END;
+    """
+
+    # empty or unknown fields never overwrite known ones
+    UPSERT = """
+        INSERT INTO albums (url, title, platform, type, year, cover, updatedAt)
+        VALUES (:url, :title, :platform, :type, :year, :cover, :updatedAt)
+        ON CONFLICT(url) DO UPDATE SET
+            title = COALESCE(NULLIF(excluded.title, ''), title),
+            platform = COALESCE(NULLIF(excluded.platform, ''), platform),
+            type = COALESCE(NULLIF(excluded.type, ''), type),
+            year = COALESCE(NULLIF(excluded.year, ''), year),
+            cover = COALESCE(cover, excluded.cover),
+            updatedAt = excluded.updatedAt
+        WHERE excluded.title != '' AND excluded.title != title
+            OR excluded.platform != '' AND excluded.platform != platform
+            OR excluded.type != '' AND excluded.type != type
+            OR excluded.year != '' AND excluded.year != year
+            OR cover IS NULL AND excluded.cover IS NOT NULL
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._db = None     # type: Optional[sqlite3.Connection]
+        self._isBroken = False
+        self._idleReaders = []  # type: List[sqlite3.Connection]
+        self._readerCount = 0
+        self._readerAvailable = threading.Condition()
+
+    def addAlbums(self, albums: Iterable[Dict]):
+        """
+        Add or update album records, safe to call from worker threads
+
+        Parameters
+        ----------
+        albums: Iterable[Dict]
+            album records with keys: title, platform, type, year, url, cover
+        """
+        rows = [self._row(album) for album in albums if album.get('url')]
+        if not rows:
+            return
+
+        with self._lock:
+            db = self._connection()
+            if db is None:
+                return
+
+            try:
+                with db:
+                    db.executemany(self.UPSERT, rows)
+            except sqlite3.Error as e:
+                print(f"Error updating album index: {e}")
+
+    def addDetails(self, url: str, details: Dict):
+        """
+        Update an album from the details parsed from its page
+
+        Parameters
+        ----------
+        url: str
+            album page URL
+        details: Dict
+            album details with keys: info, cover
+        """
+        info = details.get('info') or {}
+        self.addAlbums([{
+            'url': url,
+            'title': info.get('title', ''),
+            'platform': info.get('platforms', ''),
+            'type': info.get('album_type', ''),
+            'year': info.get('year', ''),
+            'cover': details.get('cover')
+        }])
+
+    def search(self, query: str, limit=50) -> List[Dict]:
+        """
+        Search albums as the user types
+
+        Parameters
+        ----------
+        query: str
+            search text, every word is matched as a prefix
+        limit: int
+            maximum number of albums
+
+        Returns
+        -------
+        albums: List[Dict]
+            album records with keys: title, platform, type, year, url, cover
+        """
+        words = re.findall(r'\w+', query.lower())
+        if not words:
+            return []
+
+        terms = [f'"{word}"*' for word in words]
+        albums = self._match(' AND '.join(terms), words, limit)
+        if not albums and len(terms) > 1:
+            albums = self._match(' OR '.join(terms), words, limit)
+
+        return albums
+
+    def count(self) -> int:
+        """ Get number of indexed albums """
+        with self._reader() as db:
+            if db is None:
+                return 0
+
+            try:
+                return db.execute("SELECT COUNT(*) FROM albums").fetchone()[0]
+            except sqlite3.Error as e:
+                print(f"Error counting album index: {e}")
+                return 0
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+        # borrowed readers are closed when they are returned
+        with self._readerAvailable:
+            for db in self._idleReaders:
+                db.close()
+
+            self._readerCount -= len(self._idleReaders)
+            self._idleReaders.clear()
+
+    def _match(self, expression: str, words: List[str], limit: int) -> List[Dict]:
+        columns = "a.id, a.title, a.platform, a.type, a.year, a.url, a.cover"
+        with self._reader() as db:
+            if db is None:
+                return []
+
+            try:
+                count = len(db.execute(
+                    "SELECT rowid FROM album_search WHERE album_search MATCH ? LIMIT ?",
+                    (expression, self.MAX_RANKED + 1)
+                ).fetchall())
+
+                if count <= self.MAX_RANKED:
+                    rows = db.execute(
+                        f"SELECT {columns} FROM album_search JOIN albums a ON a.id = album_search.rowid "
+                        f"WHERE album_search MATCH ? ORDER BY {self.RANK} LIMIT ?",
+                        (expression, limit)
+                    ).fetchall()
+                    return [self._album(row[1:]) for row in rows]
+
+                # a broad query like a single letter ranks the newest title matches,
+                # topped up with the newest albums matching in another column
+                ids = [row[0] for row in db.execute(
+                    "SELECT rowid FROM album_search WHERE album_search MATCH ? ORDER BY rowid DESC LIMIT ?",
+                    (f"title : ({expression})", self.MAX_RANKED)
+                )]
+                if len(ids) < self.MAX_RANKED:
+                    known = set(ids)
+                    for (rowid,) in db.execute(
+                            "SELECT rowid FROM album_search WHERE album_search MATCH ? ORDER BY rowid DESC LIMIT ?",
+                            (expression, self.MAX_RANKED)):
+                        if len(ids) >= self.MAX_RANKED:
+                            break
+                        if rowid not in known:
+                            ids.append(rowid)
+
+                rows = db.execute(
+                    f"SELECT {columns} FROM albums a WHERE a.id IN ({','.join('?' * len(ids))})", ids
+                ).fetchall()
+            except sqlite3.Error as e:
+                print(f"Error searching album index: {e}")
+                return []
+
+        rows.sort(key=lambda row: (-self._score(row[1:5], words), -row[0]))
+        return [self._album(row[1:]) for row in rows[:limit]]
+
+    def _score(self, values, words: List[str]) -> float:
+        """ Approximate bm25 with the same column weights, dense matches in short fields rank first """
+        score = 0.0
+        for weight, value in zip(self.WEIGHTS, values):
+            tokens = re.findall(r'\w+', value.lower())
+            if not tokens:
+                continue
+
+            hits = sum(1 for word in words for token in tokens if token.startswith(word))
+            score += weight * hits / len(tokens)
+
+        return score
+
+    @contextmanager
+    def _reader(self) -> Iterator[Optional[sqlite3.Connection]]:
+        """ Borrow a connection for a search, None if the database can not be opened """
+        db = self._borrowReader()
+        try:
+            yield db
+        finally:
+            if db is not None:
+                self._returnReader(db)
+
+    def _borrowReader(self) -> Optional[sqlite3.Connection]:
+        # the writer creates the database and its schema
+        if self._db is None:
+            with self._lock:
+                if self._connection() is None:
+                    return None
+
+        with self._readerAvailable:
+            while not self._idleReaders and self._readerCount >= self.MAX_READERS:
+                self._readerAvailable.wait()
+
+            if self._idleReaders:
+                return self._idleReaders.pop()
+
+            self._readerCount += 1
+
+        try:
+            db = sqlite3.connect(str(self.path), check_same_thread=False)
+            db.execute("PRAGMA query_only=ON")
+        except sqlite3.Error as e:
+            print(f"Error opening album index: {e}")
+            with self._readerAvailable:
+                self._readerCount -= 1
+                self._readerAvailable.notify()
+            return None
+
+        return db
+
+    def _returnReader(self, db: sqlite3.Connection):
+        with self._readerAvailable:
+            if self._db is None:
+                # the index was closed while the connection was borrowed
+                db.close()
+                self._readerCount -= 1
+            else:
+                self._idleReaders.append(db)
+
+            self._readerAvailable.notify()
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        """ Open the database on first use, None if it can not be opened """
+        if self._db is not None or self._isBroken:
+            return self._db
+
+        db = None
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(str(self.path), check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.executescript(self.SCHEMA)
+        except sqlite3.Error as e:
+            if db is not None:
+                db.close()
+
+            # searching is skipped from now on instead of failing on every keystroke
+            self._isBroken = True
+            print(f"Error opening album index, searching is disabled: {e}")
+            return None
+
+        self._db = db
+        return db
+
+    @staticmethod
+    def _row(album: Dict) -> Dict:
+        row = {}
+        for field in AlbumIndex.FIELDS:
+            value = (album.get(field) or '').strip()
+            row[field] = '' if value == 'Unknown' else value
+
+        row['cover'] = row['cover'] or None
+        row['updatedAt'] = time.time()
+        return row
+
+    @staticmethod
+    def _album(row) -> Dict:
+        album = dict(zip(AlbumIndex.FIELDS, row))
+        for field in ('platform', 'type', 'year'):
+            album[field] = album[field] or 'Unknown'
+
+        return album
+
+
+albumIndex = AlbumIndex(get_cache_dir() / 'albums.db')
@@ -0,0 +1,320 @@
+# coding:utf-8
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .album_index import albumIndex
+from .khinsider import KhinsiderAPI
+from .response_cache import ResponseCache, responseCache
+from .scheduler import networkScheduler
+from .session import HttpSession
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+class AsyncKhinsiderAPI:
+    """
+    Asyncio variant of KhinsiderAPI
+
+    All requests go through one connection pool and at most `maxConcurrency`
+    of them are in flight at once. With aiohttp installed the requests run on
+    the event loop itself, otherwise the shared `HttpSession` pool is driven
+    from a small executor, where a cancelled coroutine stops its request at
+    the next `networkScheduler` check. Parsing, extraction and response cache
+    I/O run on the executor so a large page never stalls the loop. Pages share
+    the disk response cache and the `networkScheduler` limits with KhinsiderAPI.
+    Speculative fetches pass `bulk=True`, so they yield slots and bandwidth to
+    the pages the user is waiting for.
+    """
+
+    MAX_CONCURRENCY = 8
+
+    def __init__(self, maxConcurrency: int = MAX_CONCURRENCY, cache: ResponseCache = None):
+        self.maxConcurrency = maxConcurrency
+        self.cache = cache or responseCache
+        self.executor = None       # type: ThreadPoolExecutor
+        self._loop = None
+        self._semaphore = None     # type: asyncio.Semaphore
+        self._session = None       # type: aiohttp.ClientSession
+
+    async def fetchAlbumsByCategory(self, category='latest', limit=10, offset=0, bulk=False) -> List[Dict]:
+        """
+        Fetch albums by category, see `KhinsiderAPI.fetchAlbumsByCategory`
+
+        Parameters
+        ----------
+        bulk: bool
+            whether the fetch is speculative background work, see `NetworkScheduler`
+
+        Returns
+        -------
+        albums: List[Dict]
+            list of album dictionaries with keys: title, platform, type, year, url, cover
+        """
+        url = KhinsiderAPI.BASE_URL + KhinsiderAPI.CATEGORY_URLS.get(category, '')
+        ttl = KhinsiderAPI.CATEGORY_TTL.get(category, 0)
+        albums, _ = await self._fetchAlbumsFromUrl(url, limit, ttl, (url, offset), bulk=bulk)
+        return albums
+
+    async def search(self, query: str, limit=KhinsiderAPI.SEARCH_LIMIT) -> List[Dict]:
+        """ Search albums, see `KhinsiderAPI.search` """
+        query = KhinsiderAPI.normalizeQuery(query)
+        if not query:
+            return []
+
+        albums = KhinsiderAPI.cachedSearch(query, limit)
+        if albums is not None:
+            return albums
+
+        try:
+            albums, _ = await self._fetchAlbumsFromUrl(
+                KhinsiderAPI.searchUrl(query), limit, KhinsiderAPI.SEARCH_TTL, raiseErrors=True)
+        except Exception as e:
+            print(f"Error searching albums for {query}: {e}")
+            return []
+
+        KhinsiderAPI.cacheSearch(query, limit, albums)
+        return albums
+
+    async def fetchCategories(self, categories: Iterable[str] = None, limit=10, bulk=False) -> Dict[str, List[Dict]]:
+        """
+        Fetch several categories concurrently
+
+        Parameters
+        ----------
+        categories: Iterable[str]
+            category names, all of `KhinsiderAPI.CATEGORY_URLS` by default
+        limit: int
+            number of albums to fetch per category
+        bulk: bool
+            whether the fetch is speculative background work, see `NetworkScheduler`
+
+        Returns
+        -------
+        albums: Dict[str, List[Dict]]
+            albums of each category
+        """
+        categories = list(categories or KhinsiderAPI.CATEGORY_URLS)
+        results = await asyncio.gather(*(self.fetchAlbumsByCategory(c, limit, bulk=bulk) for c in categories))
+        return dict(zip(categories, results))
+
+    async def fetchAlbumDetails(self, album_url: str, bulk=False) -> Optional[Dict]:
+        """
+        Fetch tracks, covers and metadata of an album, see `KhinsiderAPI.fetchAlbumDetails`
+
+        Parameters
+        ----------
+        bulk: bool
+            whether the fetch is speculative background work, see `NetworkScheduler`
+
+        Returns
+        -------
+        details: Optional[Dict]
+            album details with keys: tracks, covers, cover, info,
+            or None if the page could not be fetched
+        """
+        try:
+            details = await self._fetchAlbumPage(album_url, KhinsiderAPI._parseAlbumDetails, bulk)
+            await self._run(albumIndex.addDetails, album_url, details)
+            return details
+        except Exception as e:
+            print(f"Error fetching album details from {album_url}: {e}")
+            return None
+
+    async def fetchManyAlbumDetails(self, album_urls: Iterable[str]) -> List[Optional[Dict]]:
+        """ Fetch the details of several albums concurrently, in the order of `album_urls` """
+        return list(await asyncio.gather(*(self.fetchAlbumDetails(url) for url in album_urls)))
+
+    async def fetchAlbumTracks(self, album_url: str) -> List[Dict]:
+        """ Fetch tracks from album page, see `KhinsiderAPI.fetchAlbumTracks` """
+        try:
+            return await self._fetchAlbumPage(album_url, KhinsiderAPI._parseAlbumTracks)
+        except Exception as e:
+            print(f"Error fetching tracks from {album_url}: {e}")
+            return []
+
+    async def fetchAlbumCovers(self, album_url: str) -> List[str]:
+        """ Fetch all album cover image URLs, see `KhinsiderAPI.fetchAlbumCovers` """
+        try:
+            return await self._fetchAlbumPage(album_url, KhinsiderAPI._parseAlbumCovers)
+        except Exception as e:
+            print(f"Error fetching album covers from {album_url}: {e}")
+            return []
+
+    async def fetchAlbumCover(self, album_url: str) -> Optional[str]:
+        """ Fetch album cover image URL, see `KhinsiderAPI.fetchAlbumCover` """
+        try:
+            return await self._fetchAlbumPage(album_url, KhinsiderAPI._parsePrimaryCover)
+        except Exception as e:
+            print(f"Error fetching album cover: {e}")
+            return None
+
+    async def close(self):
+        """ Close the connection pool of the current event loop and shut the executor down """
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    async def _fetchAlbumsFromUrl(self, url: str, limit=10, ttl=0, cursor=None,
+                                  raiseErrors=False, bulk=False) -> Tuple[List[Dict], Optional[Tuple[str, int]]]:
+        albums = []
+        cursor = cursor or (url, 0)
+
+        try:
+            for _ in range(KhinsiderAPI.MAX_PAGES):
+                content = await self._fetch(cursor[0], ttl, bulk=bulk)
+                page_albums, cursor = await self._run(
+                    KhinsiderAPI._parseCategoryPage, content, cursor[0], limit - len(albums), cursor[1])
+                albums.extend(page_albums)
+                await self._run(albumIndex.addAlbums, page_albums)
+
+                if len(albums) >= limit or not cursor:
+                    break
+
+            return albums, cursor
+
+        except Exception as e:
+            if raiseErrors:
+                raise
+
+            print(f"Error fetching albums from {url}: {e}")
+            return albums, cursor
+
+    async def _fetchAlbumPage(self, album_url: str, extract, bulk=False):
+        """ Fetch an album page, then parse it and extract from it in one executor call """
+        content = await self._fetch(album_url, KhinsiderAPI.ALBUM_TTL, verify=False, bulk=bulk)
+        return await self._run(self._extract, extract, content)
+
+    @staticmethod
+    def _extract(extract, content: bytes):
+        return extract(KhinsiderAPI._parseAlbumPage(content))
+
+    async def _run(self, func, *args):
+        """ Run a blocking function on the executor """
+        return await asyncio.get_running_loop().run_in_executor(self._executor(), partial(func, *args))
+
+    async def _acquire(self, url: str, bulk: bool):
+        """
+        Wait for a `networkScheduler` slot on the executor
+
+        A cancelled wait can not stop the executor thread, so a slot it
+        still gets afterwards is released right away instead of leaking.
+        """
+        future = self._executor().submit(networkScheduler.acquire, url, bulk)
+        try:
+            await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            future.add_done_callback(
+                lambda f: networkScheduler.release(url, bulk) if not f.cancelled() and f.exception() is None else None)
+            raise
+
+    def _executor(self) -> ThreadPoolExecutor:
+        """ Get the executor, created again after `close()` """
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(self.maxConcurrency, thread_name_prefix='khinsider')
+
+        return self.executor
+
+    def _bind(self):
+        """ Create the semaphore and pool for the running loop """
+        loop = asyncio.get_running_loop()
+        if loop is self._loop:
+            return
+
+        self._loop = loop
+        self._semaphore = asyncio.Semaphore(self.maxConcurrency)
+        self._session = None
+
+    async def _fetch(self, url: str, ttl: int, verify=True, bulk=False) -> bytes:
+        """ Get a page body through the response cache, raising on network errors """
+        self._bind()
+
+        async with self._semaphore:
+            if aiohttp is None:
+                # the executor thread can not be interrupted, so it is told to give up instead
+                cancelled = threading.Event()
+                try:
+                    return await self._run(partial(
+                        self.cache.fetch, url, ttl, bulk, headers=KhinsiderAPI.HEADERS, timeout=HttpSession.TIMEOUT,
+                        verify=verify, cancelled=cancelled))
+                except asyncio.CancelledError:
+                    networkScheduler.cancel(cancelled)
+                    raise
+
+            # the cache reads and writes files, which stays off the loop
+            content = await self._run(self.cache.cachedBody, url, ttl)
+            if content is not None:
+                return content
+
+            validators = await self._run(self.cache.validators, url)
+            try:
+                status, content, headers = await self._get(url, validators, verify, bulk)
+                if status == 304 and validators:
+                    content = await self._run(self.cache.notModified, url)
+                    if content is not None:
+                        return content
+
+                    # body vanished from disk, fetch it again without validators
+                    status, content, headers = await self._get(url, {}, verify, bulk)
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                content = await self._run(self.cache.staleBody, url)
+                if content is None:
+                    raise
+                return content
+
+            # the host still throttles after all retries, a stale page beats an error
+            if status in networkScheduler.THROTTLE_STATUS:
+                content = await self._run(self.cache.staleBody, url)
+                if content is not None:
+                    return content
+
+            if status >= 400:
+                raise aiohttp.ClientResponseError(None, (), status=status, message=f"HTTP {status} for {url}")
+
+            await self._run(self.cache.storeBody, url, content, headers)
+            return content
+
+    async def _get(self, url: str, headers: Dict[str, str], verify: bool, bulk: bool):
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                headers=KhinsiderAPI.HEADERS,
+                connector=aiohttp.TCPConnector(limit=self.maxConcurrency),
+                timeout=aiohttp.ClientTimeout(total=HttpSession.TIMEOUT)
+            )
+
+        # share connection limits, backoff and retries with the threaded code
+        proxy = (HttpSession.proxies() or {}).get('https')
+        for attempt in range(networkScheduler.MAX_ATTEMPTS):
+            await self._acquire(url, bulk)
+            try:
+                async with self._session.get(url, headers=headers, proxy=proxy, ssl=None if verify else False) as response:
+                    accepted = networkScheduler.report(url, response.status, response.headers)
+                    if accepted or attempt == networkScheduler.MAX_ATTEMPTS - 1:
+                        return response.status, await self._read(response, bulk), response.headers
+            finally:
+                networkScheduler.release(url, bulk)
+
+    async def _read(self, response, bulk: bool) -> bytes:
+        """ Read a response body, bulk bodies are paced by the bandwidth limit on the executor """
+        if not bulk:
+            return await response.read()
+
+        chunks = []
+        async for chunk in response.content.iter_chunked(networkScheduler.CHUNK_SIZE):
+            if networkScheduler.bucket.rate:
+                await self._run(networkScheduler.bucket.consume, len(chunk))
+            chunks.append(chunk)
+
+        return b''.join(chunks)
+
+
+asyncKhinsider = AsyncKhinsiderAPI()
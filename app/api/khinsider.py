@@ -1,20 +1,25 @@
 # coding:utf-8
-import requests
-import urllib3
 from bs4 import BeautifulSoup
-from typing import List, Dict, Optional
+import posixpath
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Iterator, Optional, Tuple
+from urllib.parse import quote_plus, urljoin, urlparse
 
-# Disable SSL warnings
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+from .parser import (parseHtml, TrackStreamParser, ALBUM_HEADER_RULES, ALBUM_PAGE_RULES,
+                     CATEGORY_PAGE_RULES, SONG_PAGE_RULES)
+from .session import HttpSession
+from .response_cache import responseCache
+from .scheduler import networkScheduler
+from .album_index import albumIndex
 
 
 class KhinsiderAPI:
     """ KHInsider API wrapper """
 
     BASE_URL = "https://downloads.khinsider.com"
-    HEADERS = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-    }
+    HEADERS = HttpSession.HEADERS
     
     CATEGORY_URLS = {
         'latest': '',
@@ -22,9 +27,46 @@ class KhinsiderAPI:
         'newly_added': '/game-soundtracks/browse/newly-added',
         'most_favorites': '/game-soundtracks/browse/most-favorites'
     }
+    
+    # seconds a cached page stays fresh before it is revalidated
+    CATEGORY_TTL = {
+        'latest': 5 * 60,
+        'top40': 30 * 60,
+        'newly_added': 10 * 60,
+        'most_favorites': 60 * 60
+    }
+    ALBUM_TTL = 7 * 24 * 60 * 60
+    SONG_TTL = 24 * 60 * 60
+    
+    # downloadable file formats, in order of preference when none is requested
+    AUDIO_FORMATS = ('mp3', 'flac', 'm4a', 'ogg')
+    
+    # safety limit when following "next page" links
+    MAX_PAGES = 50
+    
+    # texts of "next page" links without rel="next", compared whole and lower case
+    NEXT_LINK_TEXTS = ('next', 'next >', 'next »', 'next ›', 'next page', '>', '»', '›', '→')
+    
+    STREAM_CHUNK_SIZE = 16 * 1024
+    
+    # song pages resolved at once, below the session's keep-alive pool size
+    RESOLVE_WORKERS = 8
+    
+    _songFiles = {}     # type: Dict[str, Dict[str, str]]
+    _resolver = None    # type: Optional[ThreadPoolExecutor]
+    _resolverLock = threading.Lock()
+    
+    SEARCH_PATH = '/search?search='
+    SEARCH_TTL = 60 * 60
+    SEARCH_LIMIT = 100
+    MAX_CACHED_SEARCHES = 64
+    
+    # normalized query -> (limit, albums), most recently used last
+    _searches = OrderedDict()     # type: OrderedDict[str, Tuple[int, List[Dict]]]
+    _searchLock = threading.Lock()
 
     @classmethod
-    def fetchAlbumsByCategory(cls, category='latest', limit=10) -> List[Dict]:
+    def fetchAlbumsByCategory(cls, category='latest', limit=10, offset=0) -> List[Dict]:
         """
         Fetch albums by category
 
@@ -34,15 +76,136 @@ class KhinsiderAPI:
             category name: 'latest', 'top40', 'newly_added', 'most_favorites'
         limit: int
             number of albums to fetch
+        offset: int
+            number of albums to skip, used for incremental pagination
+
+        Returns
+        -------
+        albums: List[Dict]
+            list of album dictionaries with keys: title, platform, type, year, url, cover.
+            Fewer than `limit` albums means the end of the category was reached
+        """
+        return cls.fetchAlbumPage(category, limit, offset=offset)[0]
+
+    @classmethod
+    def fetchAlbumPage(cls, category='latest', limit=10, cursor=None, offset=0) -> Tuple[List[Dict], Optional[Tuple[str, int]]]:
+        """
+        Fetch the next albums of a category, continuing where an earlier call stopped
+
+        Parameters
+        ----------
+        category: str
+            category name, see `fetchAlbumsByCategory`
+        limit: int
+            number of albums to fetch
+        cursor: Tuple[str, int]
+            cursor returned by the previous call, the listing page it stopped on
+            and the albums already taken from it. None to start at the first page
+        offset: int
+            number of albums to skip from the first page, only used without cursor
 
         Returns
         -------
         albums: List[Dict]
             list of album dictionaries with keys: title, platform, type, year, url, cover
+        cursor: Optional[Tuple[str, int]]
+            cursor of the following albums, None if the category ends here
         """
-        url_path = cls.CATEGORY_URLS.get(category, '')
-        return cls._fetchAlbumsFromUrl(cls.BASE_URL + url_path, limit)
+        url = cls.BASE_URL + cls.CATEGORY_URLS.get(category, '')
+        ttl = cls.CATEGORY_TTL.get(category, 0)
+        return cls._fetchAlbumsFromUrl(url, limit, ttl, cursor or (url, offset))
 
+    @classmethod
+    def search(cls, query: str, limit=SEARCH_LIMIT) -> List[Dict]:
+        """
+        Search albums with the search page of the site
+
+        Parameters
+        ----------
+        query: str
+            search text
+        limit: int
+            maximum number of albums
+
+        Returns
+        -------
+        albums: List[Dict]
+            list of album dictionaries with keys: title, platform, type, year, url, cover
+        """
+        query = cls.normalizeQuery(query)
+        if not query:
+            return []
+        
+        albums = cls.cachedSearch(query, limit)
+        if albums is not None:
+            return albums
+        
+        # failed searches are not cached, a partial result would pass for a complete one
+        try:
+            albums, _ = cls._fetchAlbumsFromUrl(cls.searchUrl(query), limit, cls.SEARCH_TTL, raiseErrors=True)
+        except Exception as e:
+            print(f"Error searching albums for {query}: {e}")
+            return []
+        
+        cls.cacheSearch(query, limit, albums)
+        return albums
+    
+    @staticmethod
+    def normalizeQuery(query: str) -> str:
+        """ Normalize case and whitespace, queries differing only in those share results """
+        return ' '.join(query.lower().split())
+    
+    @classmethod
+    def searchUrl(cls, query: str) -> str:
+        return cls.BASE_URL + cls.SEARCH_PATH + quote_plus(query)
+    
+    @classmethod
+    def cachedSearch(cls, query: str, limit=SEARCH_LIMIT) -> Optional[List[Dict]]:
+        """ Get search results of the query without touching the network, None on cache miss """
+        query = cls.normalizeQuery(query)
+        
+        with cls._searchLock:
+            entry = cls._searches.get(query)
+            if entry is not None and (entry[0] >= limit or len(entry[1]) < entry[0]):
+                cls._searches.move_to_end(query)
+                return entry[1][:limit]
+        
+        return None
+    
+    @classmethod
+    def preliminarySearch(cls, query: str, limit=SEARCH_LIMIT) -> Optional[List[Dict]]:
+        """
+        Guess search results of a refined query from the cached results of a broader one
+
+        For example, `zelda ocarina` after `zelda` keeps the albums whose title
+        contains every word, if the results of `zelda` were complete. The site
+        also matches other fields, so the guess is only shown until the site
+        answers, and None is returned rather than an empty guess.
+        """
+        query = cls.normalizeQuery(query)
+        words = query.split()
+        
+        with cls._searchLock:
+            for cachedQuery, (cachedLimit, albums) in reversed(cls._searches.items()):
+                # fewer results than requested means the site had no more
+                if cachedQuery == query or len(albums) >= cachedLimit:
+                    continue
+                
+                if all(any(w in word for word in words) for w in cachedQuery.split()):
+                    matches = [a for a in albums if all(word in a['title'].lower() for word in words)]
+                    return matches[:limit] or None
+        
+        return None
+    
+    @classmethod
+    def cacheSearch(cls, query: str, limit: int, albums: List[Dict]):
+        """ Remember search results of a normalized query """
+        with cls._searchLock:
+            cls._searches[query] = (limit, albums)
+            cls._searches.move_to_end(query)
+            while len(cls._searches) > cls.MAX_CACHED_SEARCHES:
+                cls._searches.popitem(last=False)
+    
     @classmethod
     def fetchLatestAlbums(cls, limit=10) -> List[Dict]:
         """
@@ -61,84 +224,211 @@ class KhinsiderAPI:
         return cls.fetchAlbumsByCategory('latest', limit)
     
     @classmethod
-    def _fetchAlbumsFromUrl(cls, url: str, limit=10) -> List[Dict]:
+    def _fetchAlbumsFromUrl(cls, url: str, limit=10, ttl=0, cursor=None, raiseErrors=False) -> Tuple[List[Dict], Optional[Tuple[str, int]]]:
         """
         Internal method to fetch albums from a specific URL
 
+        Fetching starts at the page and row of `cursor`. Rows skipped on that
+        page are not extracted. When a page runs out of rows and links to a
+        next page, that page is followed.
+
         Parameters
         ----------
         url: str
-            URL to fetch albums from
+            URL of the first listing page, used in error messages
         limit: int
             number of albums to fetch
+        ttl: int
+            seconds a cached copy of a page is used without revalidation
+        cursor: Tuple[str, int]
+            page URL to start at and number of albums to skip from it, the first page by default
+        raiseErrors: bool
+            raise network and parse errors instead of returning the albums found so far
 
         Returns
         -------
         albums: List[Dict]
             list of album dictionaries
+        cursor: Optional[Tuple[str, int]]
+            where the next call continues, None if the listing ends here
         """
+        albums = []
+        cursor = cursor or (url, 0)
+        
         try:
-            response = requests.get(url, headers=cls.HEADERS, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            albums = []
+            for _ in range(cls.MAX_PAGES):
+                content = responseCache.fetch(cursor[0], ttl, headers=cls.HEADERS, timeout=10)
+                page_albums, cursor = cls._parseCategoryPage(content, cursor[0], limit - len(albums), cursor[1])
+                albums.extend(page_albums)
+                albumIndex.addAlbums(page_albums)
+                
+                if len(albums) >= limit or not cursor:
+                    break
             
-            # find album table
-            table = soup.find('table')
-            if not table:
-                return []
+            return albums, cursor
             
-            rows = table.find_all('tr')[1:]  # skip header
+        except Exception as e:
+            if raiseErrors:
+                raise
             
-            for row in rows[:limit]:
-                cols = row.find_all('td')
-                if len(cols) < 5:
-                    continue
-                
-                # extract cover image from column 0
-                cover_img = cols[0].find('img')
-                cover_url = None
-                if cover_img:
-                    cover_src = cover_img.get('src', '')
-                    if cover_src.startswith('/'):
-                        cover_url = cls.BASE_URL + cover_src
-                    elif cover_src.startswith('http'):
-                        cover_url = cover_src
-                
-                # extract title from column 1
-                album_link = cols[1].find('a')
-                if not album_link:
-                    continue
-                
-                title = album_link.text.strip()
-                album_url = cls.BASE_URL + album_link.get('href', '')
-                
-                # extract platform from column 2
-                platform_cell = cols[2]
-                platforms = [a.text.strip() for a in platform_cell.find_all('a')]
-                platform = ', '.join(platforms) if platforms else 'Unknown'
-                
-                # extract type from column 3
-                album_type = cols[3].text.strip() if len(cols) > 3 else 'Unknown'
-                
-                # extract year from column 4
-                year = cols[4].text.strip() if len(cols) > 4 else 'Unknown'
-                
-                albums.append({
-                    'title': title,
-                    'platform': platform,
-                    'type': album_type,
-                    'year': year,
-                    'url': album_url,
-                    'cover': cover_url
-                })
+            print(f"Error fetching albums from {url}: {e}")
+            return albums, cursor
+    
+    @classmethod
+    def _parseCategoryPage(cls, content: bytes, page_url: str, limit: int, skip=0) -> Tuple[List[Dict], Optional[Tuple[str, int]]]:
+        """
+        Extract albums from one page of a browse listing
+
+        Parameters
+        ----------
+        content: bytes
+            page HTML
+        page_url: str
+            URL of the page, used to resolve the next page link
+        limit: int
+            maximum number of albums to extract
+        skip: int
+            number of album rows to skip before extracting, rows missing
+            on this page are skipped on the following pages
+
+        Returns
+        -------
+        albums: List[Dict]
+            extracted albums
+        cursor: Optional[Tuple[str, int]]
+            this page and the albums taken from it if `limit` was reached before
+            its last row, else the next page and the rows still to skip there.
+            None if the listing ends here
+        """
+        albums = []
+        page_skip = skip
+        soup = parseHtml(content, CATEGORY_PAGE_RULES)
+        
+        # find album table
+        table = soup.find('table')
+        if not table:
+            return albums, None
+        
+        rows = table.find_all('tr')[1:]  # skip header
+        
+        for i, row in enumerate(rows):
+            if len(albums) >= limit:
+                # rows are left on this page, the next call starts from them
+                if any(cls._isAlbumRow(r) for r in rows[i:]):
+                    return albums, (page_url, page_skip + len(albums))
+                break
             
-            return albums
+            # skipped rows only need the cheap validity check, not full extraction
+            if skip > 0:
+                if cls._isAlbumRow(row):
+                    skip -= 1
+                continue
             
+            album = cls._parseAlbumRow(row)
+            if album:
+                albums.append(album)
+        
+        next_url = cls._parseNextPageUrl(soup, page_url)
+        return albums, ((next_url, skip) if next_url else None)
+    
+    @staticmethod
+    def _isAlbumRow(row) -> bool:
+        """ Check whether a row of a browse table holds an album """
+        cols = row.find_all('td', limit=5)
+        return len(cols) >= 5 and cols[1].find('a') is not None
+    
+    @classmethod
+    def _parseAlbumRow(cls, row) -> Optional[Dict]:
+        """ Extract an album from a row of a browse table, None for non-album rows """
+        if not cls._isAlbumRow(row):
+            return None
+        
+        cols = row.find_all('td')
+        
+        # extract title from column 1
+        album_link = cols[1].find('a')
+        title = album_link.text.strip()
+        album_url = cls.BASE_URL + album_link.get('href', '')
+        
+        # extract cover image from column 0
+        cover_img = cols[0].find('img')
+        cover_url = None
+        if cover_img:
+            cover_src = cover_img.get('src', '')
+            if cover_src.startswith('/'):
+                cover_url = cls.BASE_URL + cover_src
+            elif cover_src.startswith('http'):
+                cover_url = cover_src
+        
+        # extract platform from column 2
+        platform_cell = cols[2]
+        platforms = [a.text.strip() for a in platform_cell.find_all('a')]
+        platform = ', '.join(platforms) if platforms else 'Unknown'
+        
+        # extract type from column 3
+        album_type = cols[3].text.strip()
+        
+        # extract year from column 4
+        year = cols[4].text.strip()
+        
+        return {
+            'title': title,
+            'platform': platform,
+            'type': album_type,
+            'year': year,
+            'url': album_url,
+            'cover': cover_url
+        }
+    
+    @classmethod
+    def _parseNextPageUrl(cls, soup: BeautifulSoup, page_url: str) -> Optional[str]:
+        """ Find the link to the next page of a paginated listing """
+        link = soup.find('a', rel='next')
+        
+        # album titles may start with "Next" too, so only whole texts are compared,
+        # and without a pagination container, links of the album table are left out
+        if not link:
+            containers = soup.find_all(class_='pagination')
+            for container in containers or [soup]:
+                for a in container.find_all('a', href=True):
+                    text = ' '.join(a.text.split()).lower()
+                    if text in cls.NEXT_LINK_TEXTS and (containers or a.find_parent('table') is None):
+                        link = a
+                        break
+                
+                if link:
+                    break
+        
+        if not link or not link.get('href'):
+            return None
+        
+        next_url = urljoin(page_url, link['href'])
+        return next_url if next_url != page_url else None
+    
+    @classmethod
+    def fetchAlbumDetails(cls, album_url: str) -> Optional[Dict]:
+        """
+        Fetch tracks, covers and metadata with a single album page request
+
+        Parameters
+        ----------
+        album_url: str
+            album page URL
+
+        Returns
+        -------
+        details: Optional[Dict]
+            album details with keys: tracks, covers, cover, info,
+            or None if the page could not be fetched
+        """
+        try:
+            details = cls._parseAlbumDetails(cls._fetchAlbumPage(album_url))
         except Exception as e:
-            print(f"Error fetching albums from {url}: {e}")
-            return []
+            print(f"Error fetching album details from {album_url}: {e}")
+            return None
+        
+        albumIndex.addDetails(album_url, details)
+        return details
     
     @classmethod
     def fetchAlbumTracks(cls, album_url: str) -> List[Dict]:
@@ -153,50 +443,189 @@ class KhinsiderAPI:
         Returns
         -------
         tracks: List[Dict]
-            list of track dictionaries with keys: name, duration
+            list of track dictionaries with keys: name, duration, url (song page)
         """
         try:
-            response = requests.get(album_url, headers=cls.HEADERS, timeout=10, verify=False)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            tracks = []
-            
-            # find track table
-            table = soup.find('table', {'id': 'songlist'})
-            if not table:
-                return []
-            
-            rows = table.find_all('tr')[1:]  # skip header
-            
-            for row in rows:
-                cols = row.find_all('td')
-                if len(cols) < 3:
-                    continue
-                
-                # extract track name from third column (index 2)
-                track_link = cols[2].find('a')
-                if not track_link:
-                    continue
-                
-                track_name = track_link.text.strip()
-                
-                # extract duration from fourth column (index 3)
-                duration = ''
-                if len(cols) > 3:
-                    duration = cols[3].text.strip()
-                
-                tracks.append({
-                    'name': track_name,
-                    'duration': duration
-                })
-            
-            return tracks
-            
+            return cls._parseAlbumTracks(cls._fetchAlbumPage(album_url))
         except Exception as e:
             print(f"Error fetching tracks from {album_url}: {e}")
             return []
     
+    @classmethod
+    def iterAlbumPage(cls, album_url: str) -> Iterator[Tuple[str, object]]:
+        """
+        Stream an album page, yielding its parts while it downloads
+
+        Tracks are parsed row by row as the page arrives, so the first tracks of
+        a large soundtrack are available long before the page is complete.
+        The downloaded page is stored in the response cache.
+
+        Parameters
+        ----------
+        album_url: str
+            album page URL
+
+        Yields
+        ------
+        part: Tuple[str, object]
+            `('details', dict)` once, with keys covers, cover and info, as soon as
+            the part of the page before the track table arrived. Then
+            `('track', dict)` for every track, with keys name, duration.
+            Network errors are raised
+        """
+        parser = TrackStreamParser(cls.BASE_URL)
+        chunks = []
+        details = None
+        
+        for chunk in cls._iterAlbumPageChunks(album_url):
+            chunks.append(chunk)
+            parser.feed(chunk)
+            
+            if details is None and parser.hasTable:
+                details = cls._parseAlbumHeader(parseHtml(b''.join(chunks), ALBUM_HEADER_RULES))
+                albumIndex.addDetails(album_url, details)
+                yield 'details', details
+            
+            for track in parser.takeTracks():
+                yield 'track', track
+        
+        parser.close()
+        if details is None:
+            details = cls._parseAlbumHeader(parseHtml(b''.join(chunks), ALBUM_HEADER_RULES))
+            albumIndex.addDetails(album_url, details)
+            yield 'details', details
+        
+        for track in parser.takeTracks():
+            yield 'track', track
+    
+    @classmethod
+    def iterAlbumTracks(cls, album_url: str) -> Iterator[Dict]:
+        """ Yield the tracks of an album page while it downloads, see `iterAlbumPage` """
+        for kind, value in cls.iterAlbumPage(album_url):
+            if kind == 'track':
+                yield value
+    
+    @classmethod
+    def _iterAlbumPageChunks(cls, album_url: str) -> Iterator[bytes]:
+        """ Yield the album page from the response cache if fresh, else from the network """
+        content = responseCache.cachedBody(album_url, cls.ALBUM_TTL)
+        if content is not None:
+            for i in range(0, len(content), cls.STREAM_CHUNK_SIZE):
+                yield content[i:i + cls.STREAM_CHUNK_SIZE]
+            return
+        
+        chunks = []
+        with networkScheduler.stream(album_url, headers=cls.HEADERS, timeout=10, verify=False) as response:
+            response.raise_for_status()
+            for chunk in networkScheduler.iterContent(response, cls.STREAM_CHUNK_SIZE):
+                chunks.append(chunk)
+                yield chunk
+        
+        responseCache.storeBody(album_url, b''.join(chunks), response.headers)
+    
+    @classmethod
+    def fetchSongFiles(cls, song_url: str) -> Dict[str, str]:
+        """
+        Resolve a song page to its downloadable files
+
+        Parameters
+        ----------
+        song_url: str
+            song page URL, the `url` of a track
+
+        Returns
+        -------
+        files: Dict[str, str]
+            file URL of each available format, e.g. `{'mp3': ..., 'flac': ...}`,
+            empty if the page could not be fetched
+        """
+        files = cls._songFiles.get(song_url)
+        if files is not None:
+            return files
+        
+        try:
+            # song pages are only resolved for downloads, they yield to browsing
+            content = responseCache.fetch(song_url, cls.SONG_TTL, bulk=True, headers=cls.HEADERS, timeout=10, verify=False)
+            files = cls._parseSongFiles(parseHtml(content, SONG_PAGE_RULES), song_url)
+        except Exception as e:
+            print(f"Error fetching song files from {song_url}: {e}")
+            return {}
+        
+        # failures are not cached so the next attempt fetches the page again
+        if files:
+            cls._songFiles[song_url] = files
+        
+        return files
+    
+    @classmethod
+    def resolveSongPages(cls, song_urls: List[str]) -> Iterator[Tuple[str, Dict[str, str]]]:
+        """
+        Resolve many song pages concurrently
+
+        Parameters
+        ----------
+        song_urls: List[str]
+            song page URLs, e.g. the `url` of every track of an album
+
+        Yields
+        ------
+        song_url: str
+            song page URL
+        files: Dict[str, str]
+            file URL of each available format, see `fetchSongFiles()`
+
+        Results are yielded in order of completion, cached pages first. Pages
+        which were not started yet are dropped when the generator is closed.
+        """
+        pending = []
+        for url in dict.fromkeys(song_urls):
+            files = cls._songFiles.get(url)
+            if files is not None:
+                yield url, files
+            else:
+                pending.append(url)
+        
+        if not pending:
+            return
+        
+        executor = cls._resolverExecutor()
+        futures = {executor.submit(cls.fetchSongFiles, url): url for url in pending}
+        try:
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+    
+    @classmethod
+    def _resolverExecutor(cls) -> ThreadPoolExecutor:
+        """ Get the pool shared by all song page resolutions, so concurrent albums share the bound """
+        with cls._resolverLock:
+            if cls._resolver is None:
+                cls._resolver = ThreadPoolExecutor(cls.RESOLVE_WORKERS, thread_name_prefix='song-resolver')
+        
+        return cls._resolver
+    
+    @classmethod
+    def _parseSongFiles(cls, soup: BeautifulSoup, song_url: str) -> Dict[str, str]:
+        """ Extract file URLs by format from a parsed song page """
+        links = soup.find_all('a', href=True)
+        
+        # download links wrap a "Click here to download" span, fall back to audio files on other hosts
+        downloads = [a for a in links if a.find('span', class_='songDownloadLink')]
+        if not downloads:
+            host = urlparse(song_url).netloc
+            downloads = [a for a in links if urlparse(urljoin(song_url, a['href'])).netloc != host]
+        
+        files = {}
+        for a in downloads:
+            url = urljoin(song_url, a['href'])
+            ext = posixpath.splitext(urlparse(url).path)[1].lower().lstrip('.')
+            if ext in cls.AUDIO_FORMATS and ext not in files:
+                files[ext] = url
+        
+        return files
+    
     @classmethod
     def fetchAlbumCovers(cls, album_url: str) -> List[str]:
         """
@@ -213,28 +642,7 @@ class KhinsiderAPI:
             list of cover image URLs
         """
         try:
-            response = requests.get(album_url, headers=cls.HEADERS, timeout=10, verify=False)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            covers = []
-            
-            # find all album image divs (class="albumImage")
-            album_image_divs = soup.find_all('div', class_='albumImage')
-            
-            for div in album_image_divs:
-                # find <a> tag within div, href points to full-size image
-                link = div.find('a')
-                if link:
-                    cover_href = link.get('href', '')
-                    if cover_href:
-                        if cover_href.startswith('/'):
-                            covers.append(cls.BASE_URL + cover_href)
-                        elif cover_href.startswith('http'):
-                            covers.append(cover_href)
-            
-            return covers
-            
+            return cls._parseAlbumCovers(cls._fetchAlbumPage(album_url))
         except Exception as e:
             print(f"Error fetching album covers from {album_url}: {e}")
             return []
@@ -255,25 +663,157 @@ class KhinsiderAPI:
             cover image URL or None
         """
         try:
-            response = requests.get(album_url, headers=cls.HEADERS, timeout=10)
-            response.raise_for_status()
+            return cls._parsePrimaryCover(cls._fetchAlbumPage(album_url))
+        except Exception as e:
+            print(f"Error fetching album cover: {e}")
+            return None
+    
+    @classmethod
+    def _fetchAlbumPage(cls, album_url: str) -> BeautifulSoup:
+        """ Download and parse an album page, raising on network errors """
+        content = responseCache.fetch(album_url, cls.ALBUM_TTL, headers=cls.HEADERS, timeout=10, verify=False)
+        return cls._parseAlbumPage(content)
+    
+    @staticmethod
+    def _parseAlbumPage(content: bytes) -> BeautifulSoup:
+        """ Parse the subtrees of an album page the scrapers read """
+        return parseHtml(content, ALBUM_PAGE_RULES)
+    
+    @classmethod
+    def _parseAlbumDetails(cls, soup: BeautifulSoup) -> Dict:
+        """ Extract tracks, covers and metadata from a parsed album page """
+        details = cls._parseAlbumHeader(soup)
+        details['tracks'] = cls._parseAlbumTracks(soup)
+        return details
+    
+    @classmethod
+    def _parseAlbumHeader(cls, soup: BeautifulSoup) -> Dict:
+        """ Extract covers and metadata from a parsed album page """
+        covers = cls._parseAlbumCovers(soup)
+        cover = cls._parsePrimaryCover(soup) or (covers[0] if covers else None)
+        
+        return {
+            'covers': covers,
+            'cover': cover,
+            'info': cls._parseAlbumInfo(soup)
+        }
+    
+    @classmethod
+    def _parseAlbumTracks(cls, soup: BeautifulSoup) -> List[Dict]:
+        """ Extract tracks from a parsed album page """
+        tracks = []
+        
+        # find track table
+        table = soup.find('table', {'id': 'songlist'})
+        if not table:
+            return []
+        
+        rows = table.find_all('tr')[1:]  # skip header
+        
+        for row in rows:
+            cols = row.find_all('td')
+            if len(cols) < 3:
+                continue
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            # extract track name from third column (index 2)
+            track_link = cols[2].find('a')
+            if not track_link:
+                continue
             
-            # find cover image in album page
-            cover_div = soup.find('div', {'id': 'coverImage'})
-            if cover_div:
-                img = cover_div.find('img')
-                if img:
-                    cover_src = img.get('src', '')
-                    if cover_src.startswith('/'):
-                        return cls.BASE_URL + cover_src
-                    elif cover_src.startswith('http'):
-                        return cover_src
+            track_name = track_link.text.strip()
             
-            return None
+            # extract duration from fourth column (index 3)
+            duration = ''
+            if len(cols) > 3:
+                duration = cols[3].text.strip()
             
-        except Exception as e:
-            print(f"Error fetching album cover: {e}")
-            return None
+            # the link points to the song page holding the file links
+            href = track_link.get('href')
+            
+            tracks.append({
+                'name': track_name,
+                'duration': duration,
+                'url': urljoin(cls.BASE_URL, href) if href else None
+            })
+        
+        return tracks
+    
+    @classmethod
+    def _parseAlbumCovers(cls, soup: BeautifulSoup) -> List[str]:
+        """ Extract full-size cover URLs from a parsed album page """
+        covers = []
+        
+        # find all album image divs (class="albumImage")
+        album_image_divs = soup.find_all('div', class_='albumImage')
+        
+        for div in album_image_divs:
+            # find <a> tag within div, href points to full-size image
+            link = div.find('a')
+            if link:
+                cover_href = link.get('href', '')
+                if cover_href:
+                    if cover_href.startswith('/'):
+                        covers.append(cls.BASE_URL + cover_href)
+                    elif cover_href.startswith('http'):
+                        covers.append(cover_href)
+        
+        return covers
+    
+    @classmethod
+    def _parsePrimaryCover(cls, soup: BeautifulSoup) -> Optional[str]:
+        """ Extract the primary cover URL from a parsed album page """
+        cover_div = soup.find('div', {'id': 'coverImage'})
+        if cover_div:
+            img = cover_div.find('img')
+            if img:
+                cover_src = img.get('src', '')
+                if cover_src.startswith('/'):
+                    return cls.BASE_URL + cover_src
+                elif cover_src.startswith('http'):
+                    return cover_src
+        
+        return None
+    
+    @classmethod
+    def _parseAlbumInfo(cls, soup: BeautifulSoup) -> Dict[str, str]:
+        """
+        Extract album metadata from a parsed album page
 
+        The info block is a paragraph of `Key: value` lines separated by <br>,
+        keys are normalized to snake case, e.g. `Catalog Number` -> `catalog_number`
+        """
+        info = {}
+        
+        title = soup.find('h2')
+        if title:
+            info['title'] = title.text.strip()
+        
+        # the info paragraph is the left aligned one holding "Platforms:" etc.
+        block = None
+        for p in soup.find_all('p', {'align': 'left'}):
+            if ':' in p.text:
+                block = p
+                break
+        
+        if not block:
+            return info
+        
+        # split children into lines at <br> tags
+        lines, current = [], []
+        for child in block.children:
+            if getattr(child, 'name', None) == 'br':
+                lines.append(''.join(current))
+                current = []
+            else:
+                current.append(child.get_text() if hasattr(child, 'get_text') else str(child))
+        lines.append(''.join(current))
+        
+        for line in lines:
+            key, sep, value = line.partition(':')
+            key, value = key.strip(), ' '.join(value.split())
+            if not sep or not key or not value:
+                continue
+            
+            info['_'.join(key.lower().split())] = value
+        
+        return info
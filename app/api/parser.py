@@ -0,0 +1,255 @@
+# coding:utf-8
+import codecs
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+try:
+    # bs4 >= 4.13 lets a filter decide whether a tag is created at all
+    from bs4.filter import ElementFilter
+except ImportError:
+    ElementFilter = None
+
+
+# (tag name, required attributes) of the subtrees the scrapers read
+Rule = Tuple[str, Dict[str, str]]
+
+CATEGORY_PAGE_RULES = [
+    ('table', {}),
+    ('div', {'class': 'pagination'}),
+    ('ul', {'class': 'pagination'}),
+    ('nav', {'class': 'pagination'}),
+    ('a', {})   # pagination links outside a pagination container
+]
+
+ALBUM_PAGE_RULES = [
+    ('h2', {}),
+    ('p', {'align': 'left'}),
+    ('div', {'class': 'albumImage'}),
+    ('div', {'id': 'coverImage'}),
+    ('table', {'id': 'songlist'})
+]
+
+# the album page without its track table, which is streamed separately
+ALBUM_HEADER_RULES = [rule for rule in ALBUM_PAGE_RULES if rule[0] != 'table']
+
+SONG_PAGE_RULES = [
+    ('a', {})   # file links
+]
+
+
+def _detectBackends() -> List[str]:
+    backends = []
+    try:
+        import lxml     # noqa: F401
+        backends.append('lxml')
+    except ImportError:
+        pass
+
+    backends.append('html.parser')
+    return backends
+
+
+_backends = _detectBackends()
+_backend = _backends[0]
+
+
+def availableBackends() -> List[str]:
+    """ Get installed parser backends, fastest first """
+    return list(_backends)
+
+
+def backend() -> str:
+    """ Get the parser backend in use """
+    return _backend
+
+
+def setBackend(name: str):
+    """ Select the parser backend, must be one of `availableBackends()` """
+    global _backend
+    if name not in _backends:
+        raise ValueError(f"Parser backend `{name}` is not available")
+
+    _backend = name
+
+
+if ElementFilter is not None:
+    class RuleFilter(ElementFilter):
+        """ Keep only the subtrees whose root tag matches one of the rules """
+
+        def __init__(self, rules: List[Rule]):
+            super().__init__()
+            self.rules = rules
+
+        def allow_tag_creation(self, nsprefix, name, attrs) -> bool:
+            attrs = attrs or {}
+            for ruleName, ruleAttrs in self.rules:
+                if name == ruleName and all(self._attributeMatches(attrs.get(k), v) for k, v in ruleAttrs.items()):
+                    return True
+
+            return False
+
+        def allow_string_creation(self, string) -> bool:
+            return False
+
+        @staticmethod
+        def _attributeMatches(value, expected: str) -> bool:
+            if value is None:
+                return False
+            if isinstance(value, str):
+                value = value.split()
+
+            return expected in value
+else:
+    RuleFilter = None
+
+
+def parseHtml(content, rules: Optional[List[Rule]] = None) -> BeautifulSoup:
+    """
+    Parse HTML with the fastest available backend
+
+    Parameters
+    ----------
+    content: bytes | str
+        HTML document
+    rules: List[Rule]
+        if given, only subtrees whose root matches one of the `(name, attrs)`
+        rules are built, everything else is skipped while parsing.
+        The full document is parsed on bs4 versions without tag filters
+
+    Returns
+    -------
+    soup: BeautifulSoup
+        parsed document
+    """
+    if rules and RuleFilter is not None:
+        return BeautifulSoup(content, _backend, parse_only=RuleFilter(rules))
+
+    return BeautifulSoup(content, _backend)
+
+
+class TrackStreamParser(HTMLParser):
+    """
+    Incremental parser of the track table of an album page
+
+    Feed the page chunk by chunk as it downloads. Finished rows become available
+    from `takeTracks()` right away, with the same fields `KhinsiderAPI` extracts
+    from a fully parsed page. Like `table.find_all('tr')` there, rows of tables
+    nested in the song list count as rows too, and the cells of a row include
+    the cells of tables nested in it.
+    """
+
+    def __init__(self, baseUrl: str = '', encoding='utf-8'):
+        super().__init__(convert_charrefs=True)
+        self.baseUrl = baseUrl
+        self.hasTable = False
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+        self._tracks = []       # type: List[Dict[str, str]]
+        self._tableDepth = 0    # nesting depth inside table#songlist, 0 outside
+        self._rowCount = 0
+        self._rows = []         # rows in document order, until they and the rows before them are closed
+        self._openRows = []     # open rows, outermost first
+        self._openCells = []    # open td cells, outermost first
+
+    def feed(self, data):
+        if isinstance(data, bytes):
+            data = self._decoder.decode(data)
+
+        super().feed(data)
+
+    def close(self):
+        super().feed(self._decoder.decode(b'', final=True))
+        super().close()
+        self._closeRows(1)
+
+    def takeTracks(self) -> List[Dict[str, str]]:
+        """ Get the tracks parsed since the last call """
+        tracks, self._tracks = self._tracks, []
+        return tracks
+
+    def handle_starttag(self, tag, attrs):
+        depth = self._tableDepth
+        if tag == 'table':
+            if depth:
+                self._tableDepth += 1
+            elif dict(attrs).get('id') == 'songlist':
+                self._tableDepth = 1
+                self.hasTable = True
+            return
+
+        if not depth:
+            return
+
+        if tag == 'tr':
+            # an unclosed row of the same table ends where the next one starts
+            self._closeRows(depth)
+            row = {'depth': depth, 'cells': [], 'isClosed': False, 'isHeader': self._rowCount == 0}
+            self._rowCount += 1
+            self._rows.append(row)
+            self._openRows.append(row)
+        elif tag in ('td', 'th'):
+            self._closeCells(depth)
+            if tag == 'td' and self._openRows:
+                # only td cells count as columns, like `row.find_all('td')`
+                cell = {'depth': depth, 'text': [], 'link': None, 'href': None, 'inLink': False}
+                self._openCells.append(cell)
+                for row in self._openRows:
+                    row['cells'].append(cell)
+        elif tag == 'a':
+            # the first link of a cell, like `cell.find('a')`
+            for cell in self._openCells:
+                if cell['link'] is None:
+                    cell['link'] = []
+                    cell['href'] = dict(attrs).get('href')
+                    cell['inLink'] = True
+
+    def handle_endtag(self, tag):
+        depth = self._tableDepth
+        if not depth:
+            return
+
+        if tag == 'table':
+            self._closeRows(depth)
+            self._tableDepth -= 1
+        elif tag == 'tr':
+            self._closeRows(depth)
+        elif tag in ('td', 'th'):
+            self._closeCells(depth)
+        elif tag == 'a':
+            for cell in self._openCells:
+                cell['inLink'] = False
+
+    def handle_data(self, data):
+        # the text of a cell includes the text of tables nested in it
+        for cell in self._openCells:
+            cell['text'].append(data)
+            if cell['inLink']:
+                cell['link'].append(data)
+
+    def _closeCells(self, depth: int):
+        while self._openCells and self._openCells[-1]['depth'] >= depth:
+            self._openCells.pop()
+
+    def _closeRows(self, depth: int):
+        """ Close the rows and cells of tables at depth or deeper, and emit finished rows """
+        self._closeCells(depth)
+        while self._openRows and self._openRows[-1]['depth'] >= depth:
+            self._openRows.pop()['isClosed'] = True
+
+        # a nested row waits for the rows around it, so tracks keep the document order
+        while self._rows and self._rows[0]['isClosed']:
+            self._emitRow(self._rows.pop(0))
+
+    def _emitRow(self, row: Dict):
+        cells = row['cells']
+        if row['isHeader'] or len(cells) < 3 or cells[2]['link'] is None:
+            return
+
+        href = cells[2]['href']
+        self._tracks.append({
+            'name': ''.join(cells[2]['link']).strip(),
+            'duration': ''.join(cells[3]['text']).strip() if len(cells) > 3 else '',
+            'url': urljoin(self.baseUrl, href) if href else None
+        })
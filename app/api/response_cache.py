@@ -0,0 +1,280 @@
+# coding:utf-8
+import atexit
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Mapping, Optional
+
+import requests
+
+from .scheduler import networkScheduler
+from ..common.config import get_cache_dir
+
+
+class ResponseCache:
+    """ Disk-backed HTTP response cache with TTLs and conditional revalidation """
+
+    MAX_SIZE = 64 * 1024 * 1024
+    INDEX_NAME = 'index.json'
+
+    # seconds access times of cache hits stay in memory before the index is written
+    FLUSH_DELAY = 30
+
+    def __init__(self, directory: Path, maxSize: int = MAX_SIZE):
+        self.directory = Path(directory)
+        self.maxSize = maxSize
+        self._lock = threading.Lock()
+        self._index = None   # type: Optional[Dict[str, Dict]]
+        self._isDirty = False
+        self._flushTimer = None     # type: Optional[threading.Timer]
+        atexit.register(self.flush)
+
+    def fetch(self, url: str, ttl: int, bulk=False, **kwargs) -> bytes:
+        """
+        Get response body from cache or network
+
+        A fresh entry is returned without touching the network. A stale entry is
+        revalidated with `If-None-Match`/`If-Modified-Since`, so an unchanged page
+        only costs a 304. If revalidation fails, the stale body is returned.
+
+        Parameters
+        ----------
+        url: str
+            request URL
+        ttl: int
+            seconds a stored response stays fresh, 0 to always revalidate
+        bulk: bool
+            whether the request is background work, see `NetworkScheduler`
+        **kwargs:
+            extra keyword arguments passed to `NetworkScheduler.get`
+
+        Returns
+        -------
+        content: bytes
+            response body
+        """
+        content = self.cachedBody(url, ttl)
+        if content is not None:
+            return content
+
+        isStored = self._entry(self._key(url)) is not None
+        headers = dict(kwargs.pop('headers', None) or {})
+        validators = self.validators(url)
+        headers.update(validators)
+
+        try:
+            response = networkScheduler.get(url, bulk, headers=headers, **kwargs)
+        except requests.RequestException:
+            content = self.staleBody(url) if isStored else None
+            if content is None:
+                raise
+            return content
+
+        # the host still throttles after all retries, a stale page beats an error
+        if response.status_code in networkScheduler.THROTTLE_STATUS and isStored:
+            content = self.staleBody(url)
+            if content is not None:
+                return content
+
+        if response.status_code == 304 and validators:
+            content = self.notModified(url)
+            if content is not None:
+                return content
+
+            # body vanished from disk, fetch it again without validators
+            for name in validators:
+                headers.pop(name, None)
+            response = networkScheduler.get(url, bulk, headers=headers, **kwargs)
+
+        response.raise_for_status()
+        self.storeBody(url, response.content, response.headers)
+        return response.content
+
+    def cachedBody(self, url: str, ttl: int) -> Optional[bytes]:
+        """ Get the stored body of url if it is younger than ttl seconds """
+        key = self._key(url)
+        entry = self._entry(key)
+        if not entry or time.time() - entry['storedAt'] >= ttl:
+            return None
+
+        content = self._readBody(key)
+        if content is not None:
+            self._touch(key)
+
+        return content
+
+    def validators(self, url: str) -> Dict[str, str]:
+        """ Get the conditional request headers revalidating the stored response of url """
+        entry = self._entry(self._key(url))
+        if not entry:
+            return {}
+
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('lastModified'):
+            headers['If-Modified-Since'] = entry['lastModified']
+
+        return headers
+
+    def staleBody(self, url: str) -> Optional[bytes]:
+        """ Get the stored body of url regardless of its age """
+        return self._readBody(self._key(url))
+
+    def notModified(self, url: str) -> Optional[bytes]:
+        """ Mark the stored response of url fresh after a 304 and get its body """
+        key = self._key(url)
+        content = self._readBody(key)
+        if content is not None:
+            self._touch(key, revalidated=True)
+
+        return content
+
+    def storeBody(self, url: str, content: bytes, headers: Mapping[str, str]):
+        """ Store a response body with the validators from its headers """
+        if len(content) > self.maxSize:
+            return
+
+        key = self._key(url)
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+            # write body atomically so readers never see a partial file
+            path = self._bodyPath(key)
+            tmpPath = path.with_suffix('.tmp')
+            try:
+                tmpPath.write_bytes(content)
+                os.replace(tmpPath, path)
+            except OSError:
+                return
+
+            now = time.time()
+            self._loadIndex()[key] = {
+                'url': url,
+                'etag': headers.get('ETag'),
+                'lastModified': headers.get('Last-Modified'),
+                'storedAt': now,
+                'accessedAt': now,
+                'size': len(content)
+            }
+            self._evict()
+            self._saveIndex()
+
+    def invalidate(self, url: str):
+        """ Remove the cached response of url """
+        key = self._key(url)
+        with self._lock:
+            index = self._loadIndex()
+            if index.pop(key, None) is not None:
+                self._removeBody(key)
+                self._saveIndex()
+
+    def clear(self):
+        """ Remove all cached responses """
+        with self._lock:
+            for key in list(self._loadIndex()):
+                self._removeBody(key)
+
+            self._index = {}
+            self._saveIndex()
+
+    def flush(self):
+        """ Write access times updated by cache hits to the index """
+        with self._lock:
+            if self._flushTimer is not None:
+                self._flushTimer.cancel()
+                self._flushTimer = None
+
+            if self._isDirty:
+                self._saveIndex()
+
+    def size(self) -> int:
+        """ Get total size of cached bodies in bytes """
+        with self._lock:
+            return sum(e['size'] for e in self._loadIndex().values())
+
+    def _entry(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._loadIndex().get(key)
+            return dict(entry) if entry else None
+
+    def _touch(self, key: str, revalidated=False):
+        """ Update access time, and the stored time after a 304, the index is written later """
+        with self._lock:
+            entry = self._loadIndex().get(key)
+            if not entry:
+                return
+
+            now = time.time()
+            entry['accessedAt'] = now
+            if revalidated:
+                entry['storedAt'] = now
+
+            self._isDirty = True
+            if self._flushTimer is None:
+                self._flushTimer = threading.Timer(self.FLUSH_DELAY, self.flush)
+                self._flushTimer.daemon = True
+                self._flushTimer.start()
+
+    def _evict(self):
+        """ Drop least recently used entries until the cache fits its budget """
+        index = self._loadIndex()
+        total = sum(e['size'] for e in index.values())
+        if total <= self.maxSize:
+            return
+
+        for key in sorted(index, key=lambda k: index[k]['accessedAt']):
+            total -= index.pop(key)['size']
+            self._removeBody(key)
+            if total <= self.maxSize:
+                break
+
+    def _readBody(self, key: str) -> Optional[bytes]:
+        try:
+            return self._bodyPath(key).read_bytes()
+        except OSError:
+            return None
+
+    def _removeBody(self, key: str):
+        try:
+            self._bodyPath(key).unlink()
+        except OSError:
+            pass
+
+    def _loadIndex(self) -> Dict[str, Dict]:
+        if self._index is not None:
+            return self._index
+
+        try:
+            with open(self.directory / self.INDEX_NAME, encoding='utf-8') as f:
+                self._index = json.load(f)
+        except (OSError, ValueError):
+            self._index = {}
+
+        return self._index
+
+    def _saveIndex(self):
+        self._isDirty = False
+        path = self.directory / self.INDEX_NAME
+        tmpPath = path.with_suffix('.tmp')
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(tmpPath, 'w', encoding='utf-8') as f:
+                json.dump(self._index, f)
+
+            os.replace(tmpPath, path)
+        except OSError:
+            pass
+
+    def _bodyPath(self, key: str) -> Path:
+        return self.directory / f"{key}.bin"
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+
+responseCache = ResponseCache(get_cache_dir() / 'http')
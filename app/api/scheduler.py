@@ -0,0 +1,277 @@
+# coding:utf-8
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Dict, Iterator, Mapping, Optional
+from urllib.parse import urlparse
+
+import requests
+
+from ..common.config import cfg
+from .session import HttpSession
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket limiting throughput in bytes per second
+
+    Bulk consumers wait for tokens, interactive ones take them without waiting
+    and may push the bucket into debt, which bulk consumers then pay off.
+    """
+
+    # burst size in seconds of the rate
+    BURST = 0.5
+    MIN_CAPACITY = 64 * 1024
+
+    def __init__(self, rate: int = 0):
+        self._lock = threading.Lock()
+        self._tokens = 0.0
+        self._last = time.monotonic()
+        self.setRate(rate)
+
+    def setRate(self, rate: int):
+        """ Set the rate in bytes per second, 0 to disable the limit """
+        with self._lock:
+            self.rate = max(0, rate)
+            self.capacity = max(self.MIN_CAPACITY, self.rate * self.BURST)
+            self._tokens = min(self._tokens, self.capacity)
+
+    def consume(self, size: int, wait=True):
+        """ Take size tokens, waiting until the bucket is out of debt if wait is True """
+        while True:
+            with self._lock:
+                if not self.rate:
+                    return
+
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+
+                if not wait or self._tokens > 0:
+                    self._tokens -= size
+                    return
+
+                delay = -self._tokens / self.rate + 0.001
+
+            time.sleep(delay)
+
+
+class RequestCancelled(Exception):
+    """ Raised when the caller gave up on a request before it finished """
+
+
+class _HostState:
+    """ Connection bookkeeping of one host """
+
+    def __init__(self, limit: int):
+        self.active = 0
+        self.bulk = 0
+        self.limit = limit          # lowered while the host throttles us
+        self.strikes = 0
+        self.blockedUntil = 0.0
+        self.interactiveWaiting = 0
+
+
+class NetworkScheduler:
+    """
+    Admission control for all HTTP traffic
+
+    Every request holds a connection slot while it runs. Slots are limited
+    globally and per host, and bulk work (downloads, song page resolution)
+    may not take the last `RESERVED_INTERACTIVE` slots, so album pages and
+    covers are never queued behind a saturating download. A 429 or 503 reply
+    blocks the host for its `Retry-After` or an exponential backoff, halves
+    its connection limit and retries the request; the limit grows back one
+    slot per successful request. Bulk transfers are additionally paced by a
+    token bucket whose rate is `cfg.bandwidthLimit`.
+
+    A request may carry a `cancelled` event, set through `cancel()`, which
+    stops it while it waits for a slot or backs off, and before its body
+    is read, so an abandoned request does not keep a slot busy.
+    """
+
+    MAX_CONNECTIONS = 12
+    MAX_PER_HOST = 6
+    RESERVED_INTERACTIVE = 2
+
+    THROTTLE_STATUS = (429, 503)
+    MAX_ATTEMPTS = 4
+    BACKOFF_BASE = 1.0
+    BACKOFF_MAX = 60.0
+
+    # bulk bodies read by `get()` are paced in chunks of this size
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._hosts = {}    # type: Dict[str, _HostState]
+        self._active = 0
+        self._bulk = 0
+
+        self.bucket = TokenBucket(cfg.get(cfg.bandwidthLimit) * 1024)
+        cfg.bandwidthLimit.valueChanged.connect(lambda v: self.bucket.setRate(v * 1024))
+
+    def get(self, url: str, bulk=False, cancelled: threading.Event = None, **kwargs) -> requests.Response:
+        """
+        Send a GET request once a slot is free and read the whole body
+
+        Parameters
+        ----------
+        url: str
+            request URL
+        bulk: bool
+            whether the request is background work which yields to interactive requests
+        cancelled: threading.Event
+            event set by `cancel()` when the caller gives up, `RequestCancelled` is raised then
+        **kwargs:
+            extra keyword arguments passed to `HttpSession.get`
+
+        Returns
+        -------
+        response: requests.Response
+            response with its body loaded, a throttled response if every attempt was throttled
+        """
+        with self.stream(url, bulk, cancelled, **kwargs) as response:
+            self._checkCancelled(cancelled)
+            if bulk:
+                response._content = b''.join(self.iterContent(response, self.CHUNK_SIZE, bulk=True))
+
+            response.content
+            return response
+
+    @contextmanager
+    def stream(self, url: str, bulk=False, cancelled: threading.Event = None, **kwargs) -> Iterator[requests.Response]:
+        """
+        Send a streaming GET request, the slot is held until the context exits
+
+        Read the body with `iterContent()` so bulk transfers respect the bandwidth limit.
+        """
+        kwargs['stream'] = True
+
+        for attempt in range(self.MAX_ATTEMPTS):
+            self.acquire(url, bulk, cancelled)
+            try:
+                response = HttpSession.get(url, **kwargs)
+                with response:
+                    throttled = not self.report(url, response.status_code, response.headers)
+                    if not throttled or attempt == self.MAX_ATTEMPTS - 1:
+                        yield response
+                        return
+            finally:
+                self.release(url, bulk)
+
+    def iterContent(self, response: requests.Response, chunkSize: int, bulk=False) -> Iterator[bytes]:
+        """ Iterate a streaming response body, pacing it by the bandwidth limit """
+        for chunk in response.iter_content(chunkSize):
+            self.bucket.consume(len(chunk), wait=bulk)
+            yield chunk
+
+    def acquire(self, url: str, bulk=False, cancelled: threading.Event = None):
+        """ Wait for a connection slot to the host of url, pair with `release()` """
+        host = urlparse(url).netloc
+        with self._condition:
+            state = self._hosts.setdefault(host, _HostState(self.MAX_PER_HOST))
+            if not bulk:
+                state.interactiveWaiting += 1
+
+            try:
+                while True:
+                    self._checkCancelled(cancelled)
+                    delay = state.blockedUntil - time.monotonic()
+                    if delay <= 0 and self._hasCapacity(state, bulk):
+                        break
+
+                    self._condition.wait(delay if delay > 0 else None)
+            finally:
+                if not bulk:
+                    state.interactiveWaiting -= 1
+
+            state.active += 1
+            self._active += 1
+            if bulk:
+                state.bulk += 1
+                self._bulk += 1
+
+    def cancel(self, cancelled: threading.Event):
+        """ Give up the requests carrying the event, waiting ones stop at once """
+        with self._condition:
+            cancelled.set()
+            self._condition.notify_all()
+
+    @staticmethod
+    def _checkCancelled(cancelled: Optional[threading.Event]):
+        if cancelled is not None and cancelled.is_set():
+            raise RequestCancelled
+
+    def _hasCapacity(self, state: _HostState, bulk: bool) -> bool:
+        if self._active >= self.MAX_CONNECTIONS or state.active >= state.limit:
+            return False
+
+        if not bulk:
+            return True
+
+        # interactive requests go first, and some slots are always left for them
+        return (not state.interactiveWaiting
+                and self._bulk < self.MAX_CONNECTIONS - self.RESERVED_INTERACTIVE
+                and state.bulk < max(1, state.limit - self.RESERVED_INTERACTIVE))
+
+    def release(self, url: str, bulk=False):
+        with self._condition:
+            state = self._hosts[urlparse(url).netloc]
+            state.active -= 1
+            self._active -= 1
+            if bulk:
+                state.bulk -= 1
+                self._bulk -= 1
+
+            self._condition.notify_all()
+
+    def report(self, url: str, status: int, headers: Mapping[str, str]) -> bool:
+        """
+        Adapt the limits of a host to a reply it sent
+
+        Returns
+        -------
+        accepted: bool
+            False if the host throttled the request, it may be sent again after `acquire()`
+        """
+        host = urlparse(url).netloc
+        throttled = status in self.THROTTLE_STATUS
+        retryAfter = self._retryAfter(headers) if throttled else None
+
+        with self._condition:
+            state = self._hosts.setdefault(host, _HostState(self.MAX_PER_HOST))
+            if not throttled:
+                state.strikes = 0
+                state.limit = min(self.MAX_PER_HOST, state.limit + 1)
+                return True
+
+            state.strikes += 1
+            state.limit = max(1, state.limit // 2)
+            if retryAfter is None:
+                retryAfter = min(self.BACKOFF_MAX, self.BACKOFF_BASE * 2 ** (state.strikes - 1))
+
+            state.blockedUntil = max(state.blockedUntil, time.monotonic() + retryAfter)
+            print(f"Throttled by {host}, backing off for {retryAfter:.1f}s")
+
+        return False
+
+    def _retryAfter(self, headers: Mapping[str, str]) -> Optional[float]:
+        """ Parse the `Retry-After` header, which is either seconds or an HTTP date """
+        value = headers.get('Retry-After')
+        if not value:
+            return None
+
+        try:
+            delay = float(value)
+        except ValueError:
+            try:
+                delay = parsedate_to_datetime(value).timestamp() - time.time()
+            except (TypeError, ValueError):
+                return None
+
+        return min(self.BACKOFF_MAX, max(0.0, delay))
+
+
+networkScheduler = NetworkScheduler()
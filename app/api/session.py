@@ -0,0 +1,211 @@
+# coding:utf-8
+import threading
+from typing import Dict, Optional
+
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+from ..common.config import cfg
+
+# Disable SSL warnings
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+
+class PoolStats:
+    """ Thread-safe connection pool statistics """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def record(self, **deltas):
+        """ Increase counters by the given deltas """
+        with self._lock:
+            for key, value in deltas.items():
+                self._counters[key] = self._counters.get(key, 0) + value
+
+    def reset(self):
+        """ Reset all counters """
+        with self._lock:
+            self._counters = {
+                'requests': 0,
+                'checkouts': 0,
+                'newConnections': 0,
+                'retries': 0,
+                'failures': 0
+            }
+
+    def snapshot(self) -> Dict[str, int]:
+        """
+        Get a copy of the counters
+
+        Returns
+        -------
+        stats: Dict[str, int]
+            counters with keys: requests, checkouts, newConnections, hits, retries, failures
+        """
+        with self._lock:
+            stats = dict(self._counters)
+
+        # every checkout that did not open a new socket reused a kept-alive one
+        stats['hits'] = max(0, stats['checkouts'] - stats['newConnections'])
+        return stats
+
+
+class _CountingPoolMixin:
+    """ Connection pool mixin which reports checkouts and new connections """
+
+    stats = None    # type: PoolStats
+
+    def _get_conn(self, timeout=None):
+        self.stats.record(checkouts=1)
+        return super()._get_conn(timeout)
+
+    def _new_conn(self):
+        self.stats.record(newConnections=1)
+        return super()._new_conn()
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """ HTTP adapter with keep-alive connection pools and statistics """
+
+    def __init__(self, stats: PoolStats, **kwargs):
+        self.stats = stats
+        self._poolClasses = {
+            'http': type('CountingHTTPConnectionPool', (_CountingPoolMixin, HTTPConnectionPool), {'stats': stats}),
+            'https': type('CountingHTTPSConnectionPool', (_CountingPoolMixin, HTTPSConnectionPool), {'stats': stats})
+        }
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = self._poolClasses
+
+    def proxy_manager_for(self, proxy, **proxy_kwargs):
+        manager = super().proxy_manager_for(proxy, **proxy_kwargs)
+        manager.pool_classes_by_scheme = self._poolClasses
+        return manager
+
+    def send(self, request, **kwargs):
+        try:
+            response = super().send(request, **kwargs)
+        except Exception:
+            self.stats.record(requests=1, failures=1)
+            raise
+
+        retries = getattr(response.raw, 'retries', None)
+        history = len(retries.history) if retries is not None else 0
+        self.stats.record(requests=1, retries=history)
+        return response
+
+
+class HttpSession:
+    """ Process-wide pooled HTTP session shared by all network code """
+
+    HEADERS = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+    }
+
+    # number of hosts to keep pools for, and keep-alive connections per host
+    POOL_CONNECTIONS = 4
+    POOL_MAXSIZE = 16
+    TIMEOUT = 10
+
+    stats = PoolStats()
+
+    _session = None     # type: Optional[requests.Session]
+    _lock = threading.Lock()
+
+    @staticmethod
+    def createRetry() -> Retry:
+        """ Create the retry and backoff policy used for all requests """
+        return Retry(
+            total=2,
+            read=2,
+            connect=2,
+            backoff_factor=0.3,
+            status_forcelist=(500, 502, 504),
+            # 429 and 503 are left to NetworkScheduler, which backs off the whole host
+            respect_retry_after_header=False
+        )
+
+    @classmethod
+    def session(cls) -> requests.Session:
+        """ Get the shared session, creating it on first use """
+        if cls._session is not None:
+            return cls._session
+
+        with cls._lock:
+            if cls._session is None:
+                session = requests.Session()
+                session.headers.update(cls.HEADERS)
+
+                adapter = PooledHTTPAdapter(
+                    cls.stats,
+                    pool_connections=cls.POOL_CONNECTIONS,
+                    pool_maxsize=cls.POOL_MAXSIZE,
+                    max_retries=cls.createRetry()
+                )
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                cls._session = session
+
+        return cls._session
+
+    @classmethod
+    def proxies(cls) -> Optional[Dict[str, str]]:
+        """ Get proxy mapping from config, or None if proxy is disabled """
+        if not cfg.get(cfg.proxyEnabled):
+            return None
+
+        host = cfg.get(cfg.proxyHost).strip()
+        port = cfg.get(cfg.proxyPort).strip()
+        if not host:
+            return None
+
+        if '://' not in host:
+            host = 'http://' + host
+
+        proxy = f"{host}:{port}" if port else host
+        return {'http': proxy, 'https': proxy}
+
+    @classmethod
+    def get(cls, url: str, **kwargs) -> requests.Response:
+        """
+        Send a GET request through the shared session
+
+        Parameters
+        ----------
+        url: str
+            request URL
+        **kwargs:
+            extra keyword arguments passed to `requests.Session.get`
+
+        Returns
+        -------
+        response: requests.Response
+            response object
+        """
+        kwargs.setdefault('timeout', cls.TIMEOUT)
+
+        proxies = cls.proxies()
+        if proxies:
+            kwargs.setdefault('proxies', proxies)
+
+        return cls.session().get(url, **kwargs)
+
+    @classmethod
+    def poolStats(cls) -> Dict[str, int]:
+        """ Get connection pool statistics """
+        return cls.stats.snapshot()
+
+    @classmethod
+    def close(cls):
+        """ Close the shared session and all pooled connections """
+        with cls._lock:
+            if cls._session is not None:
+                cls._session.close()
+                cls._session = None
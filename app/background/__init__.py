@@ -1,5 +1,5 @@
 # coding:utf-8
-from .background_manager import BackgroundManager
-
-__all__ = ['BackgroundManager']
+from .background_manager import BackgroundManager, BackgroundRenderer
+from .blur import blurImage
 
+__all__ = ['BackgroundManager', 'BackgroundRenderer', 'blurImage']
@@ -1,144 +1,296 @@
 # coding:utf-8
+import math
 import os
+from collections import OrderedDict
 from typing import Optional
-from PyQt5.QtCore import QSize, Qt
-from PyQt5.QtGui import QPixmap, QImage, QPainter
+from PyQt5.QtCore import QObject, QRunnable, QSize, Qt, QThreadPool, QTimer, pyqtSignal
+from PyQt5.QtGui import QGuiApplication, QPixmap, QImage, QImageReader, QPainter
 from ..common.config import cfg
+from ..common.signal_bus import signalBus
+from . import blur
+from .blur import BLUR_FORMAT, blurImage
 
 
-class BackgroundManager:
-    """ Background image manager with blur effects and caching """
-    
-    def __init__(self):
-        self._cache = {}
-        self._cache_key = None
-    
+class BackgroundRenderer:
+    """
+    Renders background frames, only used from the render thread
+
+    The decoded source image stays in memory, along with a few blurred
+    masters: the whole source scaled to cover the window at some size and
+    blurred. A frame is the center of a master with the opacity applied, so
+    changing the opacity or going back to an earlier window size or blur
+    radius does not blur again.
+
+    Live previews, asked for while a slider is dragged, are blurred from a
+    small copy of the source and stretched over the window by the painter.
+    Sources larger than the biggest screen are decoded at reduced size.
+    """
+
+    # masters kept, e.g. for a couple of window sizes and blur radii
+    MAX_MASTERS = 4
+
+    # live previews have at most this many pixels, fewer for the slow blur backend
+    PREVIEW_PIXELS = {'numpy': 160 * 1024, 'python': 24 * 1024}
+
+    def __init__(self, max_source_size: QSize = QSize()):
+        self.max_source_size = QSize(max_source_size)
+        self._source = None         # type: Optional[QImage]
+        self._source_key = None
+        self._decode_size = None    # size the source was reduced to cover, None if it was not
+        self._masters = OrderedDict()   # (radius, scale) -> QImage
+        self._preview_base = None   # (frame size, source scaled to it)
+
+    def render(self, spec: tuple) -> Optional[QImage]:
+        """
+        Render a frame
+
+        Parameters
+        ----------
+        spec: tuple
+            image path, window width, window height, blur radius, opacity (0-100)
+            and whether a live preview is enough
+
+        Returns
+        -------
+        frame: Optional[QImage]
+            frame in premultiplied ARGB32 format, smaller than the window for a
+            preview, or None if the image can not be loaded
+        """
+        image_path, width, height, radius, opacity, preview = spec
+        source = self._load_source(image_path, QSize(width, height))
+        if source is None:
+            return None
+
+        scale = max(width / source.width(), height / source.height())
+        master_key = (radius, round(scale, 4))
+        master = self._masters.get(master_key)
+        if master is None and preview:
+            return self._fade(self._render_preview(source, width, height, radius), opacity)
+
+        if master is None:
+            size = QSize(math.ceil(source.width() * scale), math.ceil(source.height() * scale))
+            master = source.scaled(size, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+            master = blurImage(master, radius)
+            self._masters[master_key] = master
+
+        self._masters.move_to_end(master_key)
+        while len(self._masters) > self.MAX_MASTERS:
+            self._masters.popitem(last=False)
+
+        return self._fade(self._crop(master, QSize(width, height)), opacity)
+
+    def _render_preview(self, source: QImage, width: int, height: int, radius: int) -> QImage:
+        """ Blur a small copy of the source, the radius is scaled along """
+        factor = min(1.0, math.sqrt(self.PREVIEW_PIXELS[blur.backend()] / (width * height)))
+        size = QSize(max(1, round(width * factor)), max(1, round(height * factor)))
+        if self._preview_base is None or self._preview_base[0] != size:
+            base = source.scaled(size, Qt.KeepAspectRatioByExpanding, Qt.SmoothTransformation)
+            self._preview_base = (size, self._crop(base, size))
+
+        return blurImage(self._preview_base[1], radius * factor)
+
+    @staticmethod
+    def _crop(image: QImage, size: QSize) -> QImage:
+        """ Crop the center of an image which covers size """
+        x = (image.width() - size.width()) // 2
+        y = (image.height() - size.height()) // 2
+        return image.copy(x, y, size.width(), size.height())
+
+    @staticmethod
+    def _fade(frame: QImage, opacity: int) -> QImage:
+        """ Apply the opacity once here instead of in every paint event """
+        if opacity >= 100:
+            return frame
+
+        faded = QImage(frame.size(), BLUR_FORMAT)
+        faded.fill(Qt.transparent)
+        painter = QPainter(faded)
+        painter.setOpacity(opacity / 100)
+        painter.drawImage(0, 0, frame)
+        painter.end()
+        return faded
+
+    def _load_source(self, image_path: str, window_size: QSize) -> Optional[QImage]:
+        """ Decode the background image, again if the file changed or the window outgrew a reduced decode """
+        try:
+            source_key = (image_path, os.path.getmtime(image_path))
+        except (OSError, TypeError):
+            return None
+
+        decode_size = self._decode_size
+        if source_key == self._source_key and (decode_size is None or (
+                window_size.width() <= decode_size.width() and window_size.height() <= decode_size.height())):
+            return self._source
+
+        self._masters.clear()
+        self._preview_base = None
+        self._decode_size = None
+
+        # JPEG decoders scale while decoding, which makes huge wallpapers cheap
+        reader = QImageReader(image_path)
+        size = reader.size()
+        decode_size = self.max_source_size.expandedTo(window_size)
+        if size.isValid() and not self.max_source_size.isEmpty():
+            scaled_size = size.scaled(decode_size, Qt.KeepAspectRatioByExpanding)
+            if scaled_size.width() < size.width():
+                reader.setScaledSize(scaled_size)
+                self._decode_size = decode_size
+
+        image = reader.read()
+        if image.isNull():
+            print(f"Error loading background image: {image_path}: {reader.errorString()}")
+            image = None
+
+        self._source_key = source_key
+        self._source = image
+        return image
+
+
+class _RenderTask(QRunnable):
+    """ Task rendering one background frame """
+
+    def __init__(self, manager: 'BackgroundManager', spec: tuple):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.manager = manager
+        self.spec = spec
+
+    def run(self):
+        try:
+            image = self.manager.renderer.render(self.spec)
+        except Exception as e:
+            print(f"Error rendering background: {e}")
+            image = None
+
+        self.manager._taskFinished.emit(self, image)
+
+
+class BackgroundManager(QObject):
+    """
+    Background image manager with blur effects and caching
+
+    Frames are rendered on a worker thread whenever the window size or a
+    background setting changes, and handed out through
+    `signalBus.backgroundChanged`, so painting never decodes, scales or blurs.
+    Only the latest request is kept while the worker is busy. A resize is
+    rendered once the size has not changed for `RESIZE_DELAY` milliseconds.
+    While `signalBus.backgroundPreviewChanged` reports a dragged slider,
+    frames are live previews, and a full render follows the release.
+    """
+
+    RESIZE_DELAY = 150
+
+    _taskFinished = pyqtSignal(object, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent=parent)
+        screens = QGuiApplication.screens()
+        screen_size = max((s.size() for s in screens), key=lambda s: s.width() * s.height(), default=QSize())
+        self.renderer = BackgroundRenderer(screen_size)
+        self._window_size = QSize()
+        self._preview = False
+        self._frame_spec = None     # spec of the frame on screen
+        self._pending = None        # type: Optional[_RenderTask]
+
+        self.threadPool = QThreadPool(self)
+        self.threadPool.setMaxThreadCount(1)
+
+        self._render_timer = QTimer(self)
+        self._render_timer.setSingleShot(True)
+        self._render_timer.timeout.connect(self._render)
+
+        self._taskFinished.connect(self._on_task_finished)
+        for item in (cfg.backgroundImageEnabled, cfg.backgroundImagePath,
+                     cfg.backgroundOpacity, cfg.backgroundBlurRadius):
+            item.valueChanged.connect(self._render)
+
+        signalBus.backgroundPreviewChanged.connect(self.set_preview_enabled)
+
     def is_background_enabled(self) -> bool:
         """ Check if background image is enabled """
         return cfg.get(cfg.backgroundImageEnabled)
-    
+
     def get_background_path(self) -> str:
         """ Get background image path """
         return cfg.get(cfg.backgroundImagePath)
-    
+
     def get_background_opacity(self) -> int:
         """ Get background opacity (0-100) """
         return cfg.get(cfg.backgroundOpacity)
-    
+
     def get_background_blur_radius(self) -> int:
         """ Get background blur radius (0-50) """
         return cfg.get(cfg.backgroundBlurRadius)
-    
-    def get_background_pixmap(self, window_size: QSize) -> Optional[QPixmap]:
+
+    def set_window_size(self, window_size: QSize):
         """
-        Get processed background pixmap
+        Render the background for a new window size
 
         Parameters
         ----------
         window_size: QSize
-            target window size for scaling
-
-        Returns
-        -------
-        pixmap: Optional[QPixmap]
-            processed background pixmap or None
+            window size, the frame covers it and is cropped to it
         """
-        if not self.is_background_enabled():
-            return None
-        
+        if window_size == self._window_size:
+            return
+
+        self._window_size = QSize(window_size)
+        if self._frame_spec is None:
+            self._render()
+        else:
+            self._render_timer.start(self.RESIZE_DELAY)
+
+    def set_preview_enabled(self, enabled: bool):
+        """ Set whether setting changes only need a live preview, e.g. while a slider is dragged """
+        self._preview = enabled
+        if not enabled:
+            self._render()
+
+    def _spec(self) -> Optional[tuple]:
+        """ Get the frame the settings and window size ask for, None for no background """
         image_path = self.get_background_path()
-        if not image_path or not os.path.exists(image_path):
+        if not self.is_background_enabled() or not image_path or self._window_size.isEmpty():
             return None
-        
-        # generate cache key
-        blur_radius = self.get_background_blur_radius()
-        cache_key = (image_path, window_size.width(), window_size.height(), blur_radius)
-        
-        # return from cache if available
-        if cache_key == self._cache_key and cache_key in self._cache:
-            return self._cache[cache_key]
-        
-        # load and process image
-        pixmap = QPixmap(image_path)
-        if pixmap.isNull():
-            return None
-        
-        # scale to window size maintaining aspect ratio
-        pixmap = pixmap.scaled(
-            window_size,
-            Qt.KeepAspectRatioByExpanding,
-            Qt.SmoothTransformation
-        )
-        
-        # crop to exact size
-        if pixmap.width() > window_size.width() or pixmap.height() > window_size.height():
-            x = (pixmap.width() - window_size.width()) // 2
-            y = (pixmap.height() - window_size.height()) // 2
-            pixmap = pixmap.copy(x, y, window_size.width(), window_size.height())
-        
-        # apply blur effect
-        if blur_radius > 0:
-            pixmap = self._apply_efficient_blur(pixmap, blur_radius)
-        
-        # update cache
-        self._clear_cache()
-        self._cache[cache_key] = pixmap
-        self._cache_key = cache_key
-        
-        return pixmap
-    
-    def _apply_efficient_blur(self, pixmap: QPixmap, radius: int) -> QPixmap:
-        """
-        Apply efficient blur using scale-down/scale-up technique
 
-        Parameters
-        ----------
-        pixmap: QPixmap
-            source pixmap
-        radius: int
-            blur radius (0-50)
+        return (image_path, self._window_size.width(), self._window_size.height(),
+                self.get_background_blur_radius(), self.get_background_opacity(), self._preview)
+
+    def _render(self):
+        """ Render the current frame on the worker thread, replacing a waiting request """
+        self._render_timer.stop()
+        spec = self._spec()
+        if self._pending is not None:
+            if self._pending.spec == spec:
+                return
+
+            self.threadPool.tryTake(self._pending)
+            self._pending = None
+
+        if spec == self._frame_spec:
+            return
+
+        if spec is None:
+            self._frame_spec = None
+            signalBus.backgroundChanged.emit(QPixmap())
+            return
+
+        self._pending = _RenderTask(self, spec)
+        self.threadPool.start(self._pending)
+
+    def _on_task_finished(self, task: _RenderTask, image: Optional[QImage]):
+        """ Show a rendered frame """
+        if task is self._pending:
+            self._pending = None
+
+        # a frame for settings which were changed since is still closer than the shown one
+        self._frame_spec = task.spec
+        pixmap = QPixmap.fromImage(image) if image is not None else QPixmap()
+        signalBus.backgroundChanged.emit(pixmap)
+
+        # the settings went back to a frame which was replaced while this one rendered
+        if self._pending is None and not self._render_timer.isActive() and task.spec != self._spec():
+            self._render()
 
-        Returns
-        -------
-        blurred: QPixmap
-            blurred pixmap
-        """
-        if radius <= 0:
-            return pixmap
-        
-        # calculate scale factor for optimization
-        scale_factor = max(0.25, 1.0 - (radius / 100.0))
-        
-        # scale down
-        small_size = QSize(
-            int(pixmap.width() * scale_factor),
-            int(pixmap.height() * scale_factor)
-        )
-        
-        # prevent too small size
-        if small_size.width() < 10 or small_size.height() < 10:
-            return pixmap
-        
-        small_pixmap = pixmap.scaled(
-            small_size,
-            Qt.KeepAspectRatio,
-            Qt.SmoothTransformation
-        )
-        
-        # scale back up
-        blurred = small_pixmap.scaled(
-            pixmap.size(),
-            Qt.KeepAspectRatio,
-            Qt.SmoothTransformation
-        )
-        
-        return blurred
-    
-    def _clear_cache(self):
-        """ Clear cache """
-        self._cache.clear()
-        self._cache_key = None
-    
     @staticmethod
     def validate_image_path(path: str) -> bool:
         """
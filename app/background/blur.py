@@ -0,0 +1,233 @@
+# coding:utf-8
+"""
+Gaussian blur approximated by three successive box blurs
+
+Each box blur is computed from running sums, so its cost depends on the
+number of pixels only, not on the radius. The work runs on NumPy arrays when
+NumPy is installed, otherwise on Python integer lists built and summed by C
+level helpers (`itertools.accumulate`, `map`, `zip`). The latter is about 20
+times slower, so it always works on a proxy of limited size, which makes
+weak blurs of large images approximate.
+"""
+import math
+import operator
+from itertools import accumulate
+from typing import List, Tuple
+
+from PyQt5.QtCore import QSize, Qt
+from PyQt5.QtGui import QImage
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+BLUR_FORMAT = QImage.Format_ARGB32_Premultiplied
+
+# number of box passes per axis, three are within 3% of a true Gaussian
+PASSES = 3
+
+# stronger blurs run on a downscaled proxy where sigma is this many pixels
+PROXY_SIGMA = 4
+
+# the pure Python backend blurs a proxy of at most this many pixels
+PYTHON_MAX_PIXELS = 160 * 1024
+
+
+def _detectBackends() -> List[str]:
+    return (['numpy'] if np is not None else []) + ['python']
+
+
+_backends = _detectBackends()
+_backend = _backends[0]
+
+
+def availableBackends() -> List[str]:
+    """ Get installed blur backends, fastest first """
+    return list(_backends)
+
+
+def backend() -> str:
+    """ Get the blur backend in use """
+    return _backend
+
+
+def setBackend(name: str):
+    """ Select the blur backend, e.g. to compare them in benchmarks """
+    global _backend
+    if name not in _backends:
+        raise ValueError(f"Blur backend {name} is not available, use one of {_backends}")
+
+    _backend = name
+
+
+def sigmaForRadius(radius: float) -> float:
+    """ Standard deviation of the Gaussian for a blur radius, the kernel fades out near 2 * radius """
+    return radius / 2
+
+
+def boxSizes(sigma: float, passes: int = PASSES) -> List[int]:
+    """
+    Get odd box widths whose successive application approximates a Gaussian
+
+    Parameters
+    ----------
+    sigma: float
+        standard deviation of the Gaussian
+    passes: int
+        number of boxes
+
+    Returns
+    -------
+    sizes: List[int]
+        box widths, the variance of the boxes sums up to about sigma squared
+    """
+    ideal = math.sqrt(12 * sigma * sigma / passes + 1)
+    lower = int(ideal)
+    if lower % 2 == 0:
+        lower -= 1
+
+    upper = lower + 2
+    count = round((12 * sigma * sigma - passes * lower * lower - 4 * passes * lower - 3 * passes) / (-4 * lower - 4))
+    return [lower if i < count else upper for i in range(passes)]
+
+
+def blurImage(image: QImage, radius: float) -> QImage:
+    """
+    Blur an image, safe to call from worker threads
+
+    Parameters
+    ----------
+    image: QImage
+        source image, it is not modified
+    radius: float
+        blur radius in pixels, 0 returns a copy
+
+    Returns
+    -------
+    blurred: QImage
+        blurred image in premultiplied ARGB32 format, which keeps
+        transparent edges from bleeding dark fringes
+    """
+    image = image.convertToFormat(BLUR_FORMAT)
+    if radius <= 0 or image.isNull():
+        return image.copy()
+
+    # a strong blur leaves no detail a smaller image could not hold, so it runs
+    # on a downscaled proxy with a proportionally smaller sigma
+    sigma = sigmaForRadius(radius)
+    scale = min(1.0, PROXY_SIGMA / sigma)
+    if _backend == 'python':
+        pixels = image.width() * image.height()
+        scale = min(scale, math.sqrt(PYTHON_MAX_PIXELS / pixels))
+
+    if scale >= 1:
+        return _blur(image, sigma)
+
+    size = image.size()
+    proxySize = QSize(max(1, round(size.width() * scale)), max(1, round(size.height() * scale)))
+    proxy = image.scaled(proxySize, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+    scale = proxySize.width() / size.width()
+    blurred = _blur(proxy, sigma * scale)
+    return blurred.scaled(size, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+
+
+def _blur(image: QImage, sigma: float) -> QImage:
+    """ Blur a premultiplied image at full resolution """
+    # the smallest blur still mixes neighbouring pixels
+    radii = [(size - 1) // 2 for size in boxSizes(sigma)]
+    radii = [r for r in radii if r > 0] or [1]
+
+    if _backend == 'numpy':
+        return _blurNumpy(image, radii)
+
+    return _blurPython(image, radii)
+
+
+def _imageArray(image: QImage):
+    """ View the pixels of an ARGB32 image as a (height, width, 4) uint8 array """
+    bits = image.constBits()
+    bits.setsize(image.sizeInBytes())
+    rows = np.frombuffer(bits, np.uint8).reshape(image.height(), image.bytesPerLine())
+    return rows[:, :image.width() * 4].reshape(image.height(), image.width(), 4)
+
+
+def _boxBlurNumpy(array, radius: int):
+    """ Box blur along the first axis with clamped edges, O(pixels) for any radius """
+    # a window sum slid line by line costs two vector operations per line,
+    # several times faster than numpy.cumsum along the same axis
+    length = array.shape[0]
+    last = length - 1
+    blurred = np.empty_like(array)
+
+    window = array[0] * (radius + 1)
+    for i in range(1, radius + 1):
+        window += array[min(i, last)]
+
+    blurred[0] = window
+    for i in range(1, length):
+        window += array[min(i + radius, last)]
+        window -= array[max(i - radius - 1, 0)]
+        blurred[i] = window
+
+    blurred *= 1 / (2 * radius + 1)
+    return blurred
+
+
+def _blurNumpy(image: QImage, radii: List[int]) -> QImage:
+    # columns first, then the transposed rows, so every pass runs along the first axis
+    array = _imageArray(image).astype(np.float32)
+    for radius in radii:
+        array = _boxBlurNumpy(array, radius)
+
+    array = np.ascontiguousarray(array.transpose(1, 0, 2))
+    for radius in radii:
+        array = _boxBlurNumpy(array, radius)
+
+    np.rint(array, out=array)
+    np.clip(array, 0, 255, out=array)
+    pixels = np.ascontiguousarray(array.astype(np.uint8).transpose(1, 0, 2))
+    height, width = pixels.shape[:2]
+    return QImage(pixels.data, width, height, width * 4, BLUR_FORMAT).copy()
+
+
+def _boxBlurLines(lines: List[Tuple[int, ...]], radius: int) -> List[List[int]]:
+    """ Box sums of every line with clamped edges, the caller divides by the box widths """
+    width = 2 * radius + 1
+    blurred = []
+    for line in lines:
+        sums = [0, *accumulate([line[0]] * (radius + 1) + list(line[1:]) + [line[-1]] * radius)]
+        blurred.append(list(map(operator.sub, sums[width:], sums[:-width])))
+
+    return blurred
+
+
+def _blurPython(image: QImage, radii: List[int]) -> QImage:
+    width, height = image.width(), image.height()
+    bits = image.constBits()
+    bits.setsize(image.sizeInBytes())
+    data = bytes(bits)
+    stride = image.bytesPerLine()
+
+    # sums are kept as integers across all passes and divided once at the end
+    divisor = 1
+    for radius in radii:
+        divisor *= (2 * radius + 1) ** 2
+
+    half = divisor // 2
+    output = bytearray(width * height * 4)
+    for channel in range(4):
+        lines = [data[y * stride + channel:y * stride + width * 4:4] for y in range(height)]
+        for radius in radii:
+            lines = _boxBlurLines(lines, radius)
+
+        lines = list(zip(*lines))
+        for radius in radii:
+            lines = _boxBlurLines(lines, radius)
+
+        # columns back to rows, rounded to the nearest integer
+        pixels = [(value + half) // divisor for row in zip(*lines) for value in row]
+        output[channel::4] = bytes(pixels)
+
+    return QImage(bytes(output), width, height, width * 4, BLUR_FORMAT).copy()
@@ -38,6 +38,12 @@ class LanguageSerializer(ConfigSerializer):
         return Language(QLocale(value)) if value != "Auto" else Language.AUTO
 
 
+def defaultDownloadFolder():
+    """ Get default download folder in the user's music directory """
+    music = QStandardPaths.writableLocation(QStandardPaths.MusicLocation) or str(Path.home())
+    return str(Path(music) / "KhiTune")
+
+
 def isWin11():
     """ Check if system is Windows 11 """
     return sys.platform == 'win32' and sys.getwindowsversion().build >= 22000
@@ -59,6 +65,20 @@ class Config(QConfig):
     backgroundOpacity = RangeConfigItem("Background", "Opacity", 80, RangeValidator(0, 100))
     backgroundBlurRadius = RangeConfigItem("Background", "BlurRadius", 0, RangeValidator(0, 50))
     
+    # album list
+    virtualAlbumList = ConfigItem("AlbumList", "Virtualized", False, BoolValidator(), restart=True)
+    prefetchCategories = ConfigItem("AlbumList", "PrefetchCategories", True, BoolValidator())
+    
+    # download
+    # created on first download, not when the config loads
+    downloadFolder = ConfigItem("Download", "Folder", defaultDownloadFolder())
+    downloadConcurrency = RangeConfigItem("Download", "Concurrency", 3, RangeValidator(1, 8))
+    downloadFormat = OptionsConfigItem("Download", "Format", "mp3", OptionsValidator(["mp3", "flac"]))
+    
+    # network, bandwidth limit of downloads in KB/s, 0 for unlimited
+    bandwidthLimit = OptionsConfigItem(
+        "Network", "BandwidthLimit", 0, OptionsValidator([0, 256, 512, 1024, 2048, 5120, 10240]))
+    
     # proxy
     proxyEnabled = ConfigItem("Proxy", "Enabled", False, BoolValidator())
     proxyHost = ConfigItem("Proxy", "Host", "", ProxyValidator())
@@ -90,7 +110,18 @@ def get_config_path():
     return config_dir / 'config.json'
 
 
+def get_cache_dir():
+    """ Get application cache directory path next to the config file """
+    cache_dir = get_config_path().parent / 'cache'
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return cache_dir
+
+
+def loadConfig():
+    """ Load the config file into cfg, called once at startup before settings are read """
+    qconfig.load(str(get_config_path()), cfg)
+
+
 cfg = Config()
 cfg.themeMode.value = Theme.AUTO
-qconfig.load(str(get_config_path()), cfg)
 
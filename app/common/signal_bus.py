@@ -1,5 +1,6 @@
 # coding:utf-8
 from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtGui import QPixmap
 
 
 class SignalBus(QObject):
@@ -7,7 +8,8 @@ class SignalBus(QObject):
 
     micaEnableChanged = pyqtSignal(bool)
     themeChanged = pyqtSignal()
-    backgroundChanged = pyqtSignal()
+    backgroundChanged = pyqtSignal(QPixmap)   # rendered background, null if disabled
+    backgroundPreviewChanged = pyqtSignal(bool)   # a background slider is dragged
 
 
 signalBus = SignalBus()
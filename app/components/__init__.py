@@ -1,6 +1,9 @@
 # coding:utf-8
 from .album_card import AlbumCard
 from .album_detail_dialog import AlbumDetailDialog
+from .album_list_view import AlbumListModel, AlbumCardDelegate, AlbumListView
+from .track_list_view import TrackListModel, TrackListView
+from .download_item_card import DownloadItemCard
 
-__all__ = ['AlbumCard', 'AlbumDetailDialog']
-
+__all__ = ['AlbumCard', 'AlbumDetailDialog', 'AlbumListModel', 'AlbumCardDelegate', 'AlbumListView',
+           'TrackListModel', 'TrackListView', 'DownloadItemCard']
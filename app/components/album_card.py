@@ -1,16 +1,19 @@
 # coding:utf-8
-from PyQt5.QtCore import Qt, QUrl, QRectF, QSize
-from PyQt5.QtGui import QDesktopServices, QPixmap, QFont, QPainter, QPainterPath, QBrush
+from PyQt5.QtCore import Qt, QUrl, QSize
+from PyQt5.QtGui import QDesktopServices, QPixmap
 from PyQt5.QtWidgets import QWidget, QLabel, QVBoxLayout, QHBoxLayout
 
 from qfluentwidgets import (CardWidget, IconWidget, FluentIcon, BodyLabel, CaptionLabel, 
                             TransparentToolButton, ToolTipFilter, ToolTipPosition)
 
-from ..utils import ImageLoader
+from ..utils import imageService, thumbnailCache, detailPrefetcher
 
 
 class AlbumCard(CardWidget):
     """ Album card with cover image following WinUI design """
+    
+    COVER_SIZE = QSize(64, 64)
+    COVER_RADIUS = 4
 
     def __init__(self, title: str, platform: str, albumType: str, year: str, 
                  url: str, coverUrl: str = None, parent=None):
@@ -39,7 +42,7 @@ class AlbumCard(CardWidget):
         self.hBoxLayout = QHBoxLayout(self)
         self.vBoxLayout = QVBoxLayout()
         
-        self.imageLoader = None
+        self.imageRequest = None
         
         self.__initWidget()
         self.__loadCover()
@@ -108,57 +111,34 @@ class AlbumCard(CardWidget):
     def __loadCover(self):
         """ Load cover image """
         if self.coverUrl:
-            self.imageLoader = ImageLoader(self.coverUrl, self)
-            self.imageLoader.finished.connect(self.__onCoverLoaded)
-            self.imageLoader.failed.connect(self.__onCoverFailed)
-            self.imageLoader.start()
+            thumbnail = thumbnailCache.get(self.coverUrl, self.COVER_SIZE, self.COVER_RADIUS)
+            if thumbnail is not None:
+                self.coverLabel.setPixmap(thumbnail)
+                return
+            
+            self.imageRequest = imageService.request(
+                self.coverUrl,
+                thumbnailSize=self.COVER_SIZE,
+                radius=self.COVER_RADIUS,
+                owner=self
+            )
+            self.imageRequest.finished.connect(self.__onCoverLoaded)
+            self.imageRequest.failed.connect(self.__onCoverFailed)
         else:
             self.__onCoverFailed()
     
+    def setCoverPriority(self, priority: int):
+        """ Change the download priority of the cover if it is still queued """
+        if self.imageRequest:
+            self.imageRequest.setPriority(priority)
+    
     def __onCoverLoaded(self, pixmap: QPixmap):
-        """ Handle cover loaded """
+        """ Handle cover loaded, the pixmap is already scaled and rounded """
         if not pixmap.isNull():
-            # scale pixmap to fit
-            scaled = pixmap.scaled(
-                64, 64, 
-                Qt.KeepAspectRatioByExpanding, 
-                Qt.SmoothTransformation
-            )
-            # crop to center
-            if scaled.width() > 64 or scaled.height() > 64:
-                x = (scaled.width() - 64) // 2
-                y = (scaled.height() - 64) // 2
-                scaled = scaled.copy(x, y, 64, 64)
-            
-            # apply rounded corners
-            rounded = self.__createRoundedPixmap(scaled, 4)
-            self.coverLabel.setPixmap(rounded)
+            self.coverLabel.setPixmap(pixmap)
         else:
             self.__onCoverFailed()
     
-    def __createRoundedPixmap(self, pixmap: QPixmap, radius: int) -> QPixmap:
-        """ Create pixmap with rounded corners """
-        # create a new pixmap with transparency
-        rounded = QPixmap(pixmap.size())
-        rounded.fill(Qt.transparent)
-        
-        # create painter
-        painter = QPainter(rounded)
-        painter.setRenderHint(QPainter.Antialiasing)
-        painter.setRenderHint(QPainter.SmoothPixmapTransform)
-        
-        # create rounded rectangle path
-        path = QPainterPath()
-        rect = QRectF(0, 0, pixmap.width(), pixmap.height())
-        path.addRoundedRect(rect, radius, radius)
-        
-        # clip to rounded rectangle and draw pixmap
-        painter.setClipPath(path)
-        painter.drawPixmap(0, 0, pixmap)
-        painter.end()
-        
-        return rounded
-    
     def __onCoverFailed(self):
         """ Handle cover load failed """
         self.coverLabel.hide()
@@ -168,6 +148,11 @@ class AlbumCard(CardWidget):
         """ Handle more button clicked """
         QDesktopServices.openUrl(self.url)
     
+    def enterEvent(self, e):
+        """ Warm the album details while the pointer rests on the card """
+        super().enterEvent(e)
+        detailPrefetcher.prefetch(self.albumData['url'])
+    
     def mouseReleaseEvent(self, e):
         """ Handle card click to show detail dialog """
         super().mouseReleaseEvent(e)
@@ -178,40 +163,7 @@ class AlbumCard(CardWidget):
     def __showDetailDialog(self):
         """ Show album detail dialog """
         from .album_detail_dialog import AlbumDetailDialog
-        from ..api import KhinsiderAPI
-        from PyQt5.QtCore import QThread, pyqtSignal
         
-        # create dialog
         dialog = AlbumDetailDialog(self.albumData, self.window())
-        
-        # create thread to fetch tracks and covers
-        class FetchAlbumDataThread(QThread):
-            tracksFinished = pyqtSignal(list)
-            coversFinished = pyqtSignal(list)
-            error = pyqtSignal(str)
-            
-            def __init__(self, url, parent=None):
-                super().__init__(parent)
-                self.url = url
-            
-            def run(self):
-                try:
-                    # fetch tracks and covers in parallel
-                    tracks = KhinsiderAPI.fetchAlbumTracks(self.url)
-                    covers = KhinsiderAPI.fetchAlbumCovers(self.url)
-                    
-                    self.coversFinished.emit(covers)
-                    self.tracksFinished.emit(tracks)
-                except Exception as e:
-                    self.error.emit(str(e))
-        
-        # start fetching album data
-        thread = FetchAlbumDataThread(self.albumData['url'])
-        thread.tracksFinished.connect(dialog.setTracks)
-        thread.coversFinished.connect(dialog.setCovers)
-        thread.error.connect(lambda msg: dialog.setError(dialog.tr('Failed to load album data')))
-        thread.start()
-        
-        # show dialog
+        dialog.loadDetails()
         dialog.exec()
-
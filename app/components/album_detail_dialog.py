@@ -1,23 +1,79 @@
 # coding:utf-8
-from PyQt5.QtCore import Qt, QUrl, QEvent, QRectF, QSize
-from PyQt5.QtGui import QDesktopServices, QPixmap, QPainter, QPainterPath
+import time
+
+from PyQt5.QtCore import Qt, QUrl, QEvent, QSize, QThread, pyqtSignal
+from PyQt5.QtGui import QDesktopServices, QPixmap
 from PyQt5.QtWidgets import QVBoxLayout, QHBoxLayout, QWidget, QLabel
 
 from qfluentwidgets import (MessageBoxBase, SubtitleLabel, BodyLabel, CaptionLabel, 
-                            ScrollArea, SingleDirectionScrollArea, PrimaryPushButton, 
-                            TransparentPushButton, IndeterminateProgressRing, FluentIcon, isDarkTheme)
+                            ScrollArea, SingleDirectionScrollArea, PrimaryPushButton, PushButton,
+                            TransparentPushButton, IndeterminateProgressRing, FluentIcon, isDarkTheme,
+                            InfoBar, InfoBarPosition)
 from qfluentwidgets.common.color import FluentSystemColor
 
+from ..api import KhinsiderAPI
+from ..download import downloadManager
+from ..utils import detailPrefetcher
+from .track_list_view import TrackListView
+
+
+class StreamAlbumThread(QThread):
+    """ Thread streaming an album page, tracks are emitted in batches while it downloads """
+    
+    BATCH_INTERVAL = 0.05   # seconds between track batches
+    
+    detailsFound = pyqtSignal(dict)
+    tracksFound = pyqtSignal(list)
+    streamFinished = pyqtSignal()
+    error = pyqtSignal(str)
+    
+    def __init__(self, url: str, parent=None):
+        super().__init__(parent)
+        self.url = url
+    
+    def run(self):
+        batch = []
+        lastEmit = time.monotonic()
+        
+        try:
+            for kind, value in KhinsiderAPI.iterAlbumPage(self.url):
+                if self.isInterruptionRequested():
+                    return
+                
+                if kind == 'details':
+                    self.detailsFound.emit(value)
+                    continue
+                
+                batch.append(value)
+                if time.monotonic() - lastEmit >= self.BATCH_INTERVAL:
+                    self.tracksFound.emit(batch)
+                    batch = []
+                    lastEmit = time.monotonic()
+        except Exception as e:
+            print(f"Error streaming album page {self.url}: {e}")
+            self.error.emit(str(e))
+            return
+        
+        if batch:
+            self.tracksFound.emit(batch)
+        
+        self.streamFinished.emit()
+
 
 class AlbumDetailDialog(MessageBoxBase):
     """ Album detail dialog """
     
+    COVER_SIZE = QSize(150, 150)
+    COVER_RADIUS = 8
+    
     def __init__(self, albumData: dict, parent=None):
         super().__init__(parent)
         self.albumData = albumData
         self.tracks = []
         self.coverLabels = []
-        self.imageLoaders = []
+        self.imageRequests = []
+        self.header = {}
+        self.streamThread = None
         
         self.titleLabel = SubtitleLabel(albumData.get('title', 'Unknown Album'))
         self.metaLabel = CaptionLabel()
@@ -33,11 +89,9 @@ class AlbumDetailDialog(MessageBoxBase):
         self.loadingRing = IndeterminateProgressRing()
         self.loadingLabel = BodyLabel(self.tr('Loading tracks...'))
         
-        # track scroll area
-        self.scrollArea = ScrollArea()
-        self.contentWidget = QWidget()
-        self.contentLayout = QVBoxLayout(self.contentWidget)
-        self.trackLabel = BodyLabel()
+        # track list
+        self.trackListView = TrackListView()
+        self.emptyLabel = BodyLabel(self.tr('No tracks found or failed to load.'))
         
         self.__initWidget()
     
@@ -81,44 +135,10 @@ class AlbumDetailDialog(MessageBoxBase):
         self.coverLayout.setSpacing(12)
         self.coverLayout.setAlignment(Qt.AlignLeft)
         
-        # setup scroll area
-        self.scrollArea.setWidget(self.contentWidget)
-        self.scrollArea.setWidgetResizable(True)
-        self.scrollArea.setMinimumHeight(100)
-        self.scrollArea.setMaximumHeight(100)  # allow dynamic height up to 350px
-        self.scrollArea.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        self.scrollArea.setObjectName('albumScrollArea')
-        
-        # setup content widget with transparent background
-        self.contentWidget.setObjectName('contentWidget')
-        
-        # apply styles for both light and dark themes
-        self.scrollArea.setStyleSheet("""
-            QScrollArea {
-                background-color: transparent;
-                border: none;
-            }
-            QScrollArea > QWidget > QWidget {
-                background-color: transparent;
-            }
-            #contentWidget {
-                background-color: transparent;
-            }
-        """)
-        
-        # ensure viewport is also transparent
-        if self.scrollArea.viewport():
-            self.scrollArea.viewport().setStyleSheet("background-color: transparent;")
-        
-        # setup content layout
-        self.contentLayout.setContentsMargins(12, 12, 12, 12)
-        self.contentLayout.setAlignment(Qt.AlignTop)
-        
-        # setup track label
-        self.trackLabel.setWordWrap(True)
-        self.trackLabel.setTextInteractionFlags(Qt.TextSelectableByMouse)
-        self.trackLabel.setText(self.tr('Loading album information...'))
-        self.contentLayout.addWidget(self.trackLabel)
+        # setup track list
+        self.trackListView.setMinimumHeight(100)
+        self.trackListView.setMaximumHeight(300)
+        self.emptyLabel.setAlignment(Qt.AlignCenter)
         
         # setup loading widget
         self.loadingRing.setFixedSize(40, 40)
@@ -140,15 +160,101 @@ class AlbumDetailDialog(MessageBoxBase):
         self.viewLayout.addWidget(self.coverScrollArea)
         self.viewLayout.addSpacing(12)
         self.viewLayout.addWidget(self.loadingWidget)
-        self.viewLayout.addWidget(self.scrollArea)
-        self.scrollArea.hide()  # hide until loaded
+        self.viewLayout.addWidget(self.trackListView)
+        self.viewLayout.addWidget(self.emptyLabel)
+        self.trackListView.hide()  # hide until loaded
+        self.emptyLabel.hide()
         
         # customize buttons
         self.yesButton.setText(self.tr('Open in Browser'))
         self.yesButton.setIcon(FluentIcon.LINK)
         self.cancelButton.setText(self.tr('Close'))
         
+        # tracks can only be downloaded once the whole list is known
+        self.downloadButton = PushButton(FluentIcon.DOWNLOAD, self.tr('Download'), self.buttonGroup)
+        self.downloadButton.setEnabled(False)
+        self.buttonLayout.insertWidget(1, self.downloadButton, 1, Qt.AlignVCenter)
+        
         self.yesButton.clicked.connect(self.__onOpenInBrowser)
+        self.downloadButton.clicked.connect(self.__onDownload)
+    
+    def loadDetails(self):
+        """ Fill the dialog from prefetched album details, an in-flight prefetch, or stream the album page """
+        url = self.albumData['url']
+        
+        # the open album must stay cached while the dialog is shown
+        detailPrefetcher.pin(url)
+        self.finished.connect(lambda: detailPrefetcher.unpin(url))
+        
+        details = detailPrefetcher.details(url)
+        if details is not None:
+            self.setDetails(details)
+            return
+        
+        # a prefetch already downloading the page is taken over, streaming it as well would download it twice
+        if detailPrefetcher.isFetching(url):
+            request = detailPrefetcher.request(url, self)
+            request.finished.connect(self.setDetails)
+            request.failed.connect(lambda: self.setError(self.tr('Failed to load album data')))
+            return
+        
+        # a queued prefetch would parse the whole page before anything can be shown, streaming shows the first tracks early
+        detailPrefetcher.cancelPrefetch(url)
+        
+        self.streamThread = StreamAlbumThread(url, self)
+        self.streamThread.detailsFound.connect(self.__setHeader)
+        self.streamThread.tracksFound.connect(self.appendTracks)
+        self.streamThread.streamFinished.connect(self.__onStreamFinished)
+        self.streamThread.error.connect(self.__onStreamError)
+        self.finished.connect(self.streamThread.requestInterruption)
+        self.streamThread.start()
+    
+    def setDetails(self, details: dict):
+        """ Set album details fetched from the album page """
+        self.__setHeader(details)
+        self.setTracks(details.get('tracks', []))
+        self.downloadButton.setEnabled(bool(self.tracks))
+    
+    def __setHeader(self, details: dict):
+        """ Set meta info and covers, available before the track list """
+        self.header = details
+        self.__updateMeta(details.get('info', {}))
+        
+        covers = details.get('covers') or []
+        if not covers and details.get('cover'):
+            covers = [details['cover']]
+        
+        self.setCovers(covers)
+    
+    def __onStreamFinished(self):
+        """ Show empty state if needed and cache the complete details """
+        if not self.tracks:
+            self.setTracks([])
+        
+        details = dict(self.header, tracks=list(self.tracks))
+        detailPrefetcher.put(self.albumData['url'], details)
+        self.downloadButton.setEnabled(bool(self.tracks))
+    
+    def __onStreamError(self, error: str):
+        """ Keep the tracks streamed so far, report the error if there are none """
+        if not self.tracks:
+            self.setError(self.tr('Failed to load album data'))
+    
+    def __updateMeta(self, info: dict):
+        """ Fill unknown meta fields from album page info """
+        fields = {
+            'platform': info.get('platforms'),
+            'type': info.get('album_type'),
+            'year': info.get('year')
+        }
+        for key, value in fields.items():
+            if value and self.albumData.get(key, 'Unknown') in ('', 'Unknown'):
+                self.albumData[key] = value
+        
+        platform = self.albumData.get('platform', 'Unknown')
+        albumType = self.albumData.get('type', 'Unknown')
+        year = self.albumData.get('year', 'Unknown')
+        self.metaLabel.setText(f"{platform} • {albumType} • {year}")
     
     def setCovers(self, coverUrls: list):
         """ Set album cover images """
@@ -173,29 +279,24 @@ class AlbumDetailDialog(MessageBoxBase):
     
     def setTracks(self, tracks: list):
         """ Set album tracks """
-        self.tracks = tracks
-        self.loadingWidget.hide()  # hide loading widget
-        self.scrollArea.show()
-        
-        # re-apply transparent background after showing
-        if self.scrollArea.viewport():
-            self.scrollArea.viewport().setStyleSheet("background-color: transparent;")
+        self.appendTracks(tracks)
         
+        if not self.tracks:
+            self.loadingWidget.hide()
+            self.trackListView.hide()
+            self.emptyLabel.show()
+    
+    def appendTracks(self, tracks: list):
+        """ Append a batch of album tracks """
         if not tracks:
-            self.trackLabel.setText(self.tr('No tracks found or failed to load.'))
             return
         
-        # build track list text
-        trackText = ""
-        for i, track in enumerate(tracks, 1):
-            trackName = track.get('name', 'Unknown')
-            duration = track.get('duration', '')
-            if duration:
-                trackText += f"{i}. {trackName} - {duration}\n"
-            else:
-                trackText += f"{i}. {trackName}\n"
-        
-        self.trackLabel.setText(trackText.strip())
+        if not self.tracks:
+            self.loadingWidget.hide()
+            self.trackListView.show()
+        
+        self.tracks.extend(tracks)
+        self.trackListView.appendTracks(tracks)
     
     def setError(self, errorMsg: str):
         """ Set error message """
@@ -213,38 +314,43 @@ class AlbumDetailDialog(MessageBoxBase):
             QDesktopServices.openUrl(QUrl(url))
         self.accept()
     
+    def __onDownload(self):
+        """ Queue all tracks of the album for download """
+        title = self.albumData.get('title', 'Unknown')
+        downloadManager.downloadAlbum(title, self.tracks)
+        
+        InfoBar.success(
+            title=self.tr('Download started'),
+            content=self.tr('{0} tracks of {1} were queued').format(len(self.tracks), title),
+            duration=3000,
+            position=InfoBarPosition.TOP,
+            parent=self.parent()
+        )
+        self.accept()
+    
     def __loadCoverImage(self, coverUrl: str, targetLabel: QLabel):
         """ Load single cover image """
-        from ..utils import ImageLoader
+        from ..utils import imageService
         
         if coverUrl:
-            imageLoader = ImageLoader(coverUrl, self)
-            imageLoader.finished.connect(lambda pixmap: self.__onCoverLoaded(pixmap, targetLabel))
-            imageLoader.failed.connect(lambda: self.__onCoverFailed(targetLabel))
-            imageLoader.start()
-            self.imageLoaders.append(imageLoader)
+            # covers of the open dialog are what the user is looking at
+            imageRequest = imageService.request(
+                coverUrl,
+                imageService.PRIORITY_HIGH,
+                thumbnailSize=self.COVER_SIZE,
+                radius=self.COVER_RADIUS,
+                owner=targetLabel
+            )
+            imageRequest.finished.connect(lambda pixmap: self.__onCoverLoaded(pixmap, targetLabel))
+            imageRequest.failed.connect(lambda: self.__onCoverFailed(targetLabel))
+            self.imageRequests.append(imageRequest)
         else:
             self.__onCoverFailed(targetLabel)
     
     def __onCoverLoaded(self, pixmap: QPixmap, targetLabel: QLabel):
-        """ Handle cover loaded """
+        """ Handle cover loaded, the pixmap is already scaled and rounded """
         if not pixmap.isNull():
-            # scale and create rounded pixmap
-            scaled = pixmap.scaled(
-                150, 150,
-                Qt.KeepAspectRatioByExpanding,
-                Qt.SmoothTransformation
-            )
-            
-            # crop to center
-            if scaled.width() > 150 or scaled.height() > 150:
-                x = (scaled.width() - 150) // 2
-                y = (scaled.height() - 150) // 2
-                scaled = scaled.copy(x, y, 150, 150)
-            
-            # apply rounded corners
-            rounded = self.__createRoundedPixmap(scaled, 8)
-            targetLabel.setPixmap(rounded)
+            targetLabel.setPixmap(pixmap)
             targetLabel.setStyleSheet("background-color: transparent;")
         else:
             self.__onCoverFailed(targetLabel)
@@ -301,23 +407,3 @@ class AlbumDetailDialog(MessageBoxBase):
             """)
         self.coverLabels.append(coverLabel)
         self.coverLayout.addWidget(coverLabel, 0, Qt.AlignLeft)
-    
-    def __createRoundedPixmap(self, pixmap: QPixmap, radius: int) -> QPixmap:
-        """ Create pixmap with rounded corners """
-        rounded = QPixmap(pixmap.size())
-        rounded.fill(Qt.transparent)
-        
-        painter = QPainter(rounded)
-        painter.setRenderHint(QPainter.Antialiasing)
-        painter.setRenderHint(QPainter.SmoothPixmapTransform)
-        
-        path = QPainterPath()
-        rect = QRectF(0, 0, pixmap.width(), pixmap.height())
-        path.addRoundedRect(rect, radius, radius)
-        
-        painter.setClipPath(path)
-        painter.drawPixmap(0, 0, pixmap)
-        painter.end()
-        
-        return rounded
-
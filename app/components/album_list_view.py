@@ -0,0 +1,273 @@
+# coding:utf-8
+from typing import Dict, List
+
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QPoint, QRect, QRectF, QSize, QUrl, pyqtSignal
+from PyQt5.QtGui import QColor, QDesktopServices, QFont, QPainter
+from PyQt5.QtWidgets import QListView, QStyle, QStyledItemDelegate, QStyleOptionViewItem
+
+from qfluentwidgets import FluentIcon, SmoothScrollDelegate, isDarkTheme, getFont
+
+from ..utils import imageService, thumbnailCache, detailPrefetcher
+
+
+class AlbumListModel(QAbstractListModel):
+    """ List model of album records """
+
+    AlbumRole = Qt.UserRole + 1
+
+    def __init__(self, parent=None):
+        super().__init__(parent=parent)
+        self.albums = []    # type: List[Dict]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.albums)
+
+    def data(self, index: QModelIndex, role=Qt.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < len(self.albums):
+            return None
+
+        album = self.albums[index.row()]
+        if role == Qt.DisplayRole:
+            return album['title']
+        if role == Qt.ToolTipRole:
+            return album['title']
+        if role == self.AlbumRole:
+            return album
+
+        return None
+
+    def appendAlbums(self, albums: List[Dict]):
+        """ Append album records """
+        if not albums:
+            return
+
+        first = len(self.albums)
+        self.beginInsertRows(QModelIndex(), first, first + len(albums) - 1)
+        self.albums.extend(albums)
+        self.endInsertRows()
+
+    def clear(self):
+        """ Remove all album records """
+        self.beginResetModel()
+        self.albums.clear()
+        self.endResetModel()
+
+    def setAlbums(self, albums: List[Dict]):
+        """ Replace all album records """
+        self.beginResetModel()
+        self.albums = list(albums)
+        self.endResetModel()
+
+
+class AlbumCardDelegate(QStyledItemDelegate):
+    """ Item delegate which paints an album record with the album card look """
+
+    ROW_HEIGHT = 96
+    SPACING = 12
+    COVER_SIZE = QSize(64, 64)
+    COVER_RADIUS = 4
+    MORE_BUTTON_SIZE = 32
+
+    coverLoaded = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.imageRequests = {}
+        self.failedCovers = set()
+
+        # same fonts as the labels of AlbumCard
+        self.titleFont = getFont(14, QFont.Bold)
+        self.titleFont.setPointSize(13)
+        self.captionFont = getFont(12)
+
+    def sizeHint(self, option: QStyleOptionViewItem, index: QModelIndex) -> QSize:
+        return QSize(option.rect.width(), self.ROW_HEIGHT + self.SPACING)
+
+    def moreButtonRect(self, itemRect: QRect) -> QRect:
+        """ Get the rect of the "view on KHInsider" button inside an item """
+        card = self._cardRect(itemRect)
+        size = self.MORE_BUTTON_SIZE
+        return QRect(card.right() - 16 - size, card.center().y() - size // 2, size, size)
+
+    def paint(self, painter: QPainter, option: QStyleOptionViewItem, index: QModelIndex):
+        album = index.data(AlbumListModel.AlbumRole)
+        if not album:
+            return
+
+        painter.save()
+        painter.setRenderHints(QPainter.Antialiasing | QPainter.TextAntialiasing | QPainter.SmoothPixmapTransform)
+
+        isDark = isDarkTheme()
+        isHover = bool(option.state & QStyle.State_MouseOver)
+        card = self._cardRect(option.rect)
+
+        # card background and border
+        if isHover:
+            painter.setBrush(QColor(255, 255, 255, 21 if isDark else 64))
+        else:
+            painter.setBrush(QColor(255, 255, 255, 13 if isDark else 170))
+
+        painter.setPen(QColor(0, 0, 0, 48) if isDark else QColor(0, 0, 0, 15))
+        painter.drawRoundedRect(QRectF(card).adjusted(0.5, 0.5, -0.5, -0.5), 5, 5)
+
+        # cover, or the music icon while it is missing
+        coverRect = QRect(card.left() + 12, card.top() + 16, self.COVER_SIZE.width(), self.COVER_SIZE.height())
+        pixmap = self._cover(album.get('cover'))
+        if pixmap is not None:
+            painter.drawPixmap(coverRect, pixmap)
+        else:
+            FluentIcon.MUSIC.render(painter, QRectF(coverRect).adjusted(16, 16, -16, -16))
+
+        # text
+        moreRect = self.moreButtonRect(option.rect)
+        textLeft = coverRect.right() + 13
+        textWidth = moreRect.left() - 12 - textLeft
+        lines = [
+            (self.titleFont, QColor(255, 255, 255) if isDark else QColor(0, 0, 0), album['title'], 22),
+            (self.captionFont, QColor('#d2d2d2') if isDark else QColor('#606060'), album['platform'], 19),
+            (self.captionFont, QColor('#a0a0a0') if isDark else QColor('#909090'),
+             f"{album['type']} • {album['year']}", 19)
+        ]
+
+        y = card.top() + 16
+        for font, color, text, height in lines:
+            painter.setFont(font)
+            painter.setPen(color)
+            text = painter.fontMetrics().elidedText(text, Qt.ElideRight, textWidth)
+            painter.drawText(QRect(textLeft, y, textWidth, height), Qt.AlignLeft | Qt.AlignVCenter, text)
+            y += height
+
+        # more button icon
+        FluentIcon.MORE.render(painter, QRectF(moreRect).adjusted(8, 8, -8, -8))
+
+        painter.restore()
+
+    def _cardRect(self, itemRect: QRect) -> QRect:
+        return QRect(itemRect.left(), itemRect.top(), itemRect.width(), self.ROW_HEIGHT)
+
+    def _cover(self, url: str):
+        """ Get the cover pixmap, requesting it if this is the first time the row is painted """
+        if not url or url in self.failedCovers:
+            return None
+
+        pixmap = thumbnailCache.get(url, self.COVER_SIZE, self.COVER_RADIUS)
+        if pixmap is not None or url in self.imageRequests:
+            return pixmap
+
+        # only painted rows request their covers, so they go first in the queue,
+        # requests of rows scrolled away are cancelled by `releaseCovers()`
+        request = imageService.request(
+            url,
+            imageService.PRIORITY_HIGH,
+            thumbnailSize=self.COVER_SIZE,
+            radius=self.COVER_RADIUS,
+            owner=self.parent()
+        )
+        request.finished.connect(lambda p, u=url: self._onCoverFinished(u))
+        request.failed.connect(lambda u=url: self._onCoverFailed(u))
+        self.imageRequests[url] = request
+        return None
+
+    def releaseCovers(self, urls):
+        """ Cancel the cover requests of rows not in urls, e.g. rows scrolled out of view """
+        for url in set(self.imageRequests).difference(urls):
+            self.imageRequests.pop(url).cancel()
+
+    def _onCoverFinished(self, url: str):
+        self.imageRequests.pop(url, None)
+        self.coverLoaded.emit(url)
+
+    def _onCoverFailed(self, url: str):
+        self.imageRequests.pop(url, None)
+        self.failedCovers.add(url)
+
+
+class AlbumListView(QListView):
+    """ Virtualized album list, only visible rows are painted and load covers """
+
+    def __init__(self, parent=None):
+        super().__init__(parent=parent)
+        self.albumModel = AlbumListModel(self)
+        self.delegate = AlbumCardDelegate(self)
+        self.scrollDelegate = SmoothScrollDelegate(self)
+
+        self.setModel(self.albumModel)
+        self.setItemDelegate(self.delegate)
+        self.setUniformItemSizes(True)
+        self.setMouseTracking(True)
+        self.setSelectionMode(QListView.NoSelection)
+        self.setVerticalScrollMode(QListView.ScrollPerPixel)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setFocusPolicy(Qt.NoFocus)
+        self.setCursor(Qt.PointingHandCursor)
+        self.setStyleSheet("QListView { background-color: transparent; border: none; }")
+        self.viewport().setAutoFillBackground(False)
+
+        self.delegate.coverLoaded.connect(lambda url: self.viewport().update())
+        self.verticalScrollBar().valueChanged.connect(self.__releaseHiddenCovers)
+        self.entered.connect(self.__onItemEntered)
+
+    def appendAlbums(self, albums: List[Dict]):
+        """ Append album records """
+        self.albumModel.appendAlbums(albums)
+
+    def setAlbums(self, albums: List[Dict]):
+        """ Replace album records and scroll back to the top """
+        self.albumModel.setAlbums(albums)
+        self.scrollToTop()
+
+        # covers of replaced rows are no longer painted, visible rows request theirs again
+        self.delegate.releaseCovers(())
+
+    def hideEvent(self, e):
+        super().hideEvent(e)
+        self.delegate.releaseCovers(())
+
+    def visibleAlbums(self) -> List[Dict]:
+        """ Get album records of the rows inside the viewport """
+        top = self.indexAt(QPoint(0, 0)).row()
+        if top < 0:
+            return []
+
+        rowHeight = self.delegate.ROW_HEIGHT + self.delegate.SPACING
+        count = self.viewport().height() // rowHeight + 2
+        return self.albumModel.albums[top:top + count]
+
+    def contentHeight(self) -> int:
+        """ Get the height of all rows, available before the view relayouts """
+        rowHeight = self.delegate.ROW_HEIGHT + self.delegate.SPACING
+        return self.albumModel.rowCount() * rowHeight
+
+    def mouseReleaseEvent(self, e):
+        super().mouseReleaseEvent(e)
+        if e.button() != Qt.LeftButton:
+            return
+
+        index = self.indexAt(e.pos())
+        album = index.data(AlbumListModel.AlbumRole)
+        if not album:
+            return
+
+        if self.delegate.moreButtonRect(self.visualRect(index)).contains(e.pos()):
+            QDesktopServices.openUrl(QUrl(album['url']))
+        else:
+            self.__showDetailDialog(album)
+
+    def __releaseHiddenCovers(self):
+        """ Drop cover requests of rows which left the viewport, so a fast scroll
+        does not queue covers of rows which were only painted in passing """
+        self.delegate.releaseCovers(album.get('cover') for album in self.visibleAlbums())
+
+    def __onItemEntered(self, index: QModelIndex):
+        """ Warm the album details while the pointer rests on a row """
+        album = index.data(AlbumListModel.AlbumRole)
+        if album:
+            detailPrefetcher.prefetch(album['url'])
+
+    def __showDetailDialog(self, album: Dict):
+        """ Show album detail dialog """
+        from .album_detail_dialog import AlbumDetailDialog
+
+        dialog = AlbumDetailDialog(dict(album), self.window())
+        dialog.loadDetails()
+        dialog.exec()
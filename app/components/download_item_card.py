@@ -0,0 +1,103 @@
+# coding:utf-8
+from PyQt5.QtCore import Qt, QUrl
+from PyQt5.QtGui import QDesktopServices
+from PyQt5.QtWidgets import QHBoxLayout, QVBoxLayout
+
+from qfluentwidgets import (CardWidget, BodyLabel, CaptionLabel, ProgressBar, TransparentToolButton,
+                            FluentIcon, ToolTipFilter, ToolTipPosition)
+
+from ..download import DownloadTask
+
+
+def formatSize(size: float) -> str:
+    """ Format a byte count with a binary unit """
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+
+        size /= 1024
+
+
+class DownloadItemCard(CardWidget):
+    """ Card showing the progress of one track download """
+
+    def __init__(self, task: DownloadTask, parent=None):
+        super().__init__(parent=parent)
+        self.task = task
+
+        self.titleLabel = BodyLabel(task.name, self)
+        self.albumLabel = CaptionLabel(task.album, self)
+        self.statusLabel = CaptionLabel(self)
+        self.progressBar = ProgressBar(self)
+        self.actionButton = TransparentToolButton(FluentIcon.CLOSE, self)
+
+        self.hBoxLayout = QHBoxLayout(self)
+        self.vBoxLayout = QVBoxLayout()
+
+        self.__initWidget()
+        self.__onTaskChanged()
+
+    def __initWidget(self):
+        """ Initialize widget """
+        self.setFixedHeight(96)
+        self.albumLabel.setTextColor("#606060", "#d2d2d2")
+        self.statusLabel.setTextColor("#909090", "#a0a0a0")
+        self.progressBar.setRange(0, 1000)
+
+        self.actionButton.setFixedSize(32, 32)
+        self.actionButton.installEventFilter(ToolTipFilter(self.actionButton, 500, ToolTipPosition.TOP))
+        self.actionButton.clicked.connect(self.__onActionClicked)
+
+        self.hBoxLayout.setContentsMargins(20, 12, 16, 12)
+        self.hBoxLayout.setSpacing(16)
+        self.vBoxLayout.setContentsMargins(0, 0, 0, 0)
+        self.vBoxLayout.setSpacing(4)
+
+        self.vBoxLayout.addWidget(self.titleLabel)
+        self.vBoxLayout.addWidget(self.albumLabel)
+        self.vBoxLayout.addWidget(self.progressBar)
+        self.vBoxLayout.addWidget(self.statusLabel)
+        self.hBoxLayout.addLayout(self.vBoxLayout, 1)
+        self.hBoxLayout.addWidget(self.actionButton, 0, Qt.AlignVCenter)
+
+        self.task.changed.connect(self.__onTaskChanged)
+
+    def __onTaskChanged(self):
+        """ Update progress and status from the task """
+        task = self.task
+        self.progressBar.setValue(int(task.progress() * 1000))
+
+        if task.state == DownloadTask.WAITING:
+            status = self.tr('Waiting')
+        elif task.state == DownloadTask.RESOLVING:
+            status = self.tr('Resolving')
+        elif task.state == DownloadTask.DOWNLOADING:
+            status = f"{formatSize(task.received)} / {formatSize(task.total)}" if task.total else formatSize(task.received)
+            if task.speed:
+                status += f" • {formatSize(task.speed)}/s"
+        elif task.state == DownloadTask.FINISHED:
+            status = self.tr('Finished') + f" • {formatSize(task.total)}"
+            self.progressBar.setValue(1000)
+        elif task.state == DownloadTask.FAILED:
+            status = self.tr('Failed') + (f" • {task.error}" if task.error else '')
+            self.progressBar.error()
+        else:
+            status = self.tr('Cancelled')
+            self.progressBar.pause()
+
+        self.statusLabel.setText(status)
+
+        if task.state == DownloadTask.FINISHED:
+            self.actionButton.setIcon(FluentIcon.FOLDER)
+            self.actionButton.setToolTip(self.tr('Show in folder'))
+        elif task.isActive():
+            self.actionButton.setIcon(FluentIcon.CLOSE)
+            self.actionButton.setToolTip(self.tr('Cancel'))
+        else:
+            self.actionButton.hide()
+
+    def __onActionClicked(self):
+        if self.task.state == DownloadTask.FINISHED:
+            QDesktopServices.openUrl(QUrl.fromLocalFile(str(self.task.folder)))
+        else:
+            self.task.cancel()
@@ -0,0 +1,68 @@
+# coding:utf-8
+from typing import Dict, List
+
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex
+from PyQt5.QtWidgets import QAbstractItemView
+
+from qfluentwidgets import ListView
+
+
+class TrackListModel(QAbstractListModel):
+    """ List model of album tracks """
+
+    TrackRole = Qt.UserRole + 1
+
+    def __init__(self, parent=None):
+        super().__init__(parent=parent)
+        self.tracks = []    # type: List[Dict]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.tracks)
+
+    def data(self, index: QModelIndex, role=Qt.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < len(self.tracks):
+            return None
+
+        track = self.tracks[index.row()]
+        if role in (Qt.DisplayRole, Qt.ToolTipRole):
+            name = track.get('name', 'Unknown')
+            duration = track.get('duration', '')
+            text = f"{index.row() + 1}. {name}"
+            return f"{text} - {duration}" if duration else text
+        if role == self.TrackRole:
+            return track
+
+        return None
+
+    def appendTracks(self, tracks: List[Dict]):
+        """ Append a batch of tracks """
+        if not tracks:
+            return
+
+        first = len(self.tracks)
+        self.beginInsertRows(QModelIndex(), first, first + len(tracks) - 1)
+        self.tracks.extend(tracks)
+        self.endInsertRows()
+
+
+class TrackListView(ListView):
+    """ Virtualized track list, only visible rows are laid out and painted """
+
+    def __init__(self, parent=None):
+        super().__init__(parent=parent)
+        self.trackModel = TrackListModel(self)
+        self.setModel(self.trackModel)
+
+        # every row has the same height, so large albums need no per-row layout
+        self.setUniformItemSizes(True)
+        self.setSelectionMode(QAbstractItemView.NoSelection)
+        self.setFocusPolicy(Qt.NoFocus)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setTextElideMode(Qt.ElideRight)
+
+    def appendTracks(self, tracks: List[Dict]):
+        """ Append a batch of tracks """
+        self.trackModel.appendTracks(tracks)
+
+    def count(self) -> int:
+        return self.trackModel.rowCount()
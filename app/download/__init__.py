@@ -0,0 +1,4 @@
+# coding:utf-8
+from .download_manager import DownloadTask, DownloadManager, downloadManager, sanitizeFileName
+
+__all__ = ['DownloadTask', 'DownloadManager', 'downloadManager', 'sanitizeFileName']
@@ -0,0 +1,359 @@
+# coding:utf-8
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import unquote, urlparse
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from ..api import KhinsiderAPI
+from ..api.scheduler import networkScheduler
+from ..api.session import HttpSession
+from ..common.config import cfg
+
+
+def sanitizeFileName(name: str) -> str:
+    """ Replace characters which are invalid in file names on any platform """
+    name = re.sub(r'[<>:"/\\|?*\x00-\x1f]', '_', name).strip().rstrip('.')
+    return name or '_'
+
+
+class DownloadTask(QObject):
+    """ Download of one track, its fields are only updated on the GUI thread """
+
+    WAITING = 0
+    RESOLVING = 1
+    DOWNLOADING = 2
+    FINISHED = 3
+    FAILED = 4
+    CANCELLED = 5
+
+    changed = pyqtSignal()
+
+    def __init__(self, manager: 'DownloadManager', album: str, track: Dict, folder: Path, fileFormat: str):
+        super().__init__()
+        self.manager = manager
+        self.album = album
+        self.name = track.get('name', 'Unknown')
+        self.songUrl = track.get('url')
+        self.folder = folder
+        self.format = fileFormat
+
+        self.state = self.WAITING
+        self.fileUrl = None     # type: Optional[str]
+        self.path = None        # type: Optional[Path]
+        self.received = 0
+        self.total = 0
+        self.speed = 0.0        # bytes per second
+        self.error = ''
+        self.cancelled = threading.Event()
+
+    def isActive(self) -> bool:
+        return self.state in (self.WAITING, self.RESOLVING, self.DOWNLOADING)
+
+    def progress(self) -> float:
+        """ Get progress in [0, 1], 0 while the size is unknown """
+        return self.received / self.total if self.total else 0
+
+    def cancel(self):
+        """ Stop the download, the partial file is kept so it can be resumed """
+        if self.isActive():
+            self.manager._cancel(self)
+
+    def _update(self, fields: Dict):
+        for key, value in fields.items():
+            setattr(self, key, value)
+
+        self.changed.emit()
+
+
+class _ResolveRunner(QRunnable):
+    """ Worker task which resolves the song pages of an album while downloads already run """
+
+    def __init__(self, manager: 'DownloadManager', tasks: List[DownloadTask]):
+        super().__init__()
+        self.manager = manager
+        self.tasks = {}     # type: Dict[str, List[DownloadTask]]
+        for task in tasks:
+            self.tasks.setdefault(task.songUrl, []).append(task)
+
+    def run(self):
+        pages = KhinsiderAPI.resolveSongPages(list(self.tasks))
+        try:
+            for url, files in pages:
+                for task in self.tasks[url]:
+                    self.manager._taskResolved.emit(task, files)
+
+                # stop resolving once the user cancelled every track of the album
+                if all(task.cancelled.is_set() for tasks in self.tasks.values() for task in tasks):
+                    break
+        except Exception as e:
+            print(f"Error resolving song pages: {e}")
+        finally:
+            pages.close()
+
+
+class _DownloadRunner(QRunnable):
+    """ Worker task which transfers the file of a resolved track """
+
+    CHUNK_SIZE = 64 * 1024
+    REPORT_INTERVAL = 0.25
+
+    def __init__(self, manager: 'DownloadManager', task: DownloadTask):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.manager = manager
+        self.task = task
+        self.cancelled = task.cancelled
+
+    def run(self):
+        if self.cancelled.is_set():
+            return
+
+        try:
+            self._download(self.task.fileUrl)
+        except Exception as e:
+            print(f"Error downloading {self.task.fileUrl}: {e}")
+            self._report(state=DownloadTask.FAILED, speed=0.0, error=str(e))
+
+    def _download(self, fileUrl: str):
+        name = sanitizeFileName(unquote(os.path.basename(urlparse(fileUrl).path)))
+        path = self.task.folder / name
+        self._report(state=DownloadTask.DOWNLOADING, fileUrl=fileUrl, path=path)
+
+        if path.exists():
+            size = path.stat().st_size
+            self._report(state=DownloadTask.FINISHED, received=size, total=size)
+            return
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if self._transfer(fileUrl, path):
+            self._report(state=DownloadTask.FINISHED, speed=0.0)
+
+    def _transfer(self, url: str, path: Path, resume=True) -> bool:
+        """ Download url to a `.part` file next to path, resuming it if present, then move it in place """
+        partPath = path.with_name(path.name + '.part')
+        validatorPath = path.with_name(path.name + '.part.validator')
+        validator = self._readValidator(validatorPath) if resume and partPath.exists() else None
+        offset = partPath.stat().st_size if validator else 0
+
+        headers = dict(HttpSession.HEADERS)
+        if offset:
+            # a remote file changed since the part was written is sent whole instead of stitched on
+            headers['Range'] = f"bytes={offset}-"
+            headers['If-Range'] = validator
+
+        with networkScheduler.stream(url, bulk=True, headers=headers, timeout=30, verify=False) as response:
+            isStale = response.status_code == 416 and offset
+            if not isStale:
+                result = self._receive(response, partPath, validatorPath, offset)
+
+        if isStale:
+            # the part file does not match the remote file any more, start over. The slot of
+            # this request is released first, the retry could wait for it forever otherwise
+            self._removePart(partPath, validatorPath)
+            return self._transfer(url, path, resume=False)
+
+        if result is None:
+            return False
+
+        received, total = result
+        if total and received != total:
+            raise IOError(f"Incomplete download, got {received} of {total} bytes")
+
+        os.replace(partPath, path)
+        self._removePart(validatorPath)
+        self._report(received=received, total=total or received)
+        return True
+
+    def _receive(self, response, partPath: Path, validatorPath: Path, offset: int) -> Optional[tuple]:
+        """ Write a response body to the part file, returns received and total bytes, None if cancelled """
+        response.raise_for_status()
+        length = int(response.headers.get('Content-Length') or 0)
+
+        if response.status_code == 206:
+            mode = 'ab'
+            total = offset + length if length else 0
+        else:
+            # the server ignored the range or the file changed, the body is the whole file
+            mode, offset = 'wb', 0
+            total = length
+            self._writeValidator(validatorPath, response.headers)
+
+        received = offset
+        speed = 0.0
+        lastTime, lastReceived = time.monotonic(), received
+        self._report(received=received, total=total)
+
+        with open(partPath, mode) as f:
+            for chunk in networkScheduler.iterContent(response, self.CHUNK_SIZE, bulk=True):
+                if self.cancelled.is_set():
+                    return None
+
+                f.write(chunk)
+                received += len(chunk)
+
+                now = time.monotonic()
+                if now - lastTime >= self.REPORT_INTERVAL:
+                    # smooth the rate so the display does not jitter
+                    rate = (received - lastReceived) / (now - lastTime)
+                    speed = rate if not speed else 0.7 * speed + 0.3 * rate
+                    lastTime, lastReceived = now, received
+                    self._report(received=received, speed=speed)
+
+        return received, total
+
+    @staticmethod
+    def _readValidator(validatorPath: Path) -> Optional[str]:
+        """ Get the `If-Range` value of a part file, None if it can not be resumed safely """
+        try:
+            return validatorPath.read_text(encoding='utf-8').strip() or None
+        except OSError:
+            return None
+
+    @staticmethod
+    def _writeValidator(validatorPath: Path, headers):
+        """ Remember the strong ETag or the Last-Modified date of the file a part belongs to """
+        etag = headers.get('ETag')
+        validator = etag if etag and not etag.startswith('W/') else headers.get('Last-Modified')
+        try:
+            if validator:
+                validatorPath.write_text(validator, encoding='utf-8')
+            elif validatorPath.exists():
+                validatorPath.unlink()
+        except OSError:
+            pass
+
+    @staticmethod
+    def _removePart(*paths: Path):
+        for filePath in paths:
+            try:
+                filePath.unlink()
+            except OSError:
+                pass
+
+    def _report(self, **fields):
+        self.manager._taskUpdated.emit(self.task, fields)
+
+
+class DownloadManager(QObject):
+    """
+    Download manager with a resolver stage feeding a bounded pool of parallel transfers
+
+    The song pages of an album are resolved concurrently by `KhinsiderAPI.resolveSongPages()`
+    and each track is queued for transfer as soon as its page is resolved.
+    """
+
+    # albums whose song pages are resolved at once
+    MAX_RESOLVING_ALBUMS = 2
+
+    taskAdded = pyqtSignal(object)
+
+    _taskUpdated = pyqtSignal(object, dict)
+    _taskResolved = pyqtSignal(object, dict)
+
+    def __init__(self, parent=None):
+        super().__init__(parent=parent)
+        self.tasks = []     # type: List[DownloadTask]
+        self._runners = {}  # type: Dict[DownloadTask, _DownloadRunner]
+
+        self.threadPool = QThreadPool(self)
+        self.threadPool.setMaxThreadCount(cfg.get(cfg.downloadConcurrency))
+        cfg.downloadConcurrency.valueChanged.connect(self.threadPool.setMaxThreadCount)
+
+        self.resolvePool = QThreadPool(self)
+        self.resolvePool.setMaxThreadCount(self.MAX_RESOLVING_ALBUMS)
+
+        self._taskUpdated.connect(self._onTaskUpdated)
+        self._taskResolved.connect(self._onTaskResolved)
+
+    def downloadAlbum(self, album: str, tracks: List[Dict], fileFormat: str = None) -> List[DownloadTask]:
+        """
+        Download the tracks of an album
+
+        Parameters
+        ----------
+        album: str
+            album title, the tracks are saved to a folder of this name
+        tracks: List[Dict]
+            tracks with a `url` key pointing to their song page
+        fileFormat: str
+            preferred file format, `cfg.downloadFormat` by default
+
+        Returns
+        -------
+        tasks: List[DownloadTask]
+            one task per track
+        """
+        folder = Path(cfg.get(cfg.downloadFolder)) / sanitizeFileName(album)
+        fileFormat = fileFormat or cfg.get(cfg.downloadFormat)
+
+        tasks = []
+        for track in tracks:
+            task = DownloadTask(self, album, track, folder, fileFormat)
+            self.tasks.append(task)
+            tasks.append(task)
+
+            if task.songUrl:
+                task.state = DownloadTask.RESOLVING
+            else:
+                task._update({'state': DownloadTask.FAILED, 'error': 'No song page'})
+
+            self.taskAdded.emit(task)
+
+        resolving = [task for task in tasks if task.state == DownloadTask.RESOLVING]
+        if resolving:
+            self.resolvePool.start(_ResolveRunner(self, resolving))
+
+        return tasks
+
+    def activeCount(self) -> int:
+        return sum(task.isActive() for task in self.tasks)
+
+    def throughput(self) -> float:
+        """ Get the aggregate download speed in bytes per second """
+        return sum(task.speed for task in self.tasks if task.state == DownloadTask.DOWNLOADING)
+
+    def clearFinished(self) -> List[DownloadTask]:
+        """ Forget tasks which are not active any more, returns them """
+        removed = [task for task in self.tasks if not task.isActive()]
+        self.tasks = [task for task in self.tasks if task.isActive()]
+        return removed
+
+    def _cancel(self, task: DownloadTask):
+        task.cancelled.set()
+        runner = self._runners.pop(task, None)
+        if runner is not None:
+            self.threadPool.tryTake(runner)
+
+        task._update({'state': DownloadTask.CANCELLED, 'speed': 0.0})
+
+    def _onTaskResolved(self, task: DownloadTask, files: Dict):
+        """ Queue the transfer of a resolved track, in the requested format if it exists """
+        if task.state != DownloadTask.RESOLVING:
+            return
+
+        fileUrl = files.get(task.format) or next(iter(files.values()), None)
+        if not fileUrl:
+            task._update({'state': DownloadTask.FAILED, 'error': 'No downloadable file'})
+            return
+
+        task._update({'state': DownloadTask.WAITING, 'fileUrl': fileUrl})
+        runner = _DownloadRunner(self, task)
+        self._runners[task] = runner
+        self.threadPool.start(runner)
+
+    def _onTaskUpdated(self, task: DownloadTask, fields: Dict):
+        # late reports of a cancelled task must not revive it
+        if task.state == DownloadTask.CANCELLED:
+            return
+
+        task._update(fields)
+        if not task.isActive():
+            self._runners.pop(task, None)
+
+
+downloadManager = DownloadManager()
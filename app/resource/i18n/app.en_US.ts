@@ -64,6 +64,14 @@
         <source>Settings</source>
         <translation>Settings</translation>
     </message>
+    <message>
+        <source>Downloads</source>
+        <translation>Downloads</translation>
+    </message>
+    <message>
+        <source>Search</source>
+        <translation>Search</translation>
+    </message>
 </context>
 <context>
     <name>SettingInterface</name>
@@ -231,6 +239,62 @@
         <source>Selected</source>
         <translation>Selected</translation>
     </message>
+    <message>
+        <source>Virtualized album list</source>
+        <translation>Virtualized album list</translation>
+    </message>
+    <message>
+        <source>Draw album lists with a lightweight view, recommended for browsing long lists</source>
+        <translation>Draw album lists with a lightweight view, recommended for browsing long lists</translation>
+    </message>
+    <message>
+        <source>Prefetch categories</source>
+        <translation>Prefetch categories</translation>
+    </message>
+    <message>
+        <source>Load all soundtrack categories in background after startup, so switching tabs is instant</source>
+        <translation>Load all soundtrack categories in background after startup, so switching tabs is instant</translation>
+    </message>
+    <message>
+        <source>Download</source>
+        <translation>Download</translation>
+    </message>
+    <message>
+        <source>Choose folder</source>
+        <translation>Choose folder</translation>
+    </message>
+    <message>
+        <source>Download directory</source>
+        <translation>Download directory</translation>
+    </message>
+    <message>
+        <source>Parallel downloads</source>
+        <translation>Parallel downloads</translation>
+    </message>
+    <message>
+        <source>Number of tracks downloaded at the same time</source>
+        <translation>Number of tracks downloaded at the same time</translation>
+    </message>
+    <message>
+        <source>Preferred format</source>
+        <translation>Preferred format</translation>
+    </message>
+    <message>
+        <source>Tracks without this format are downloaded in another one</source>
+        <translation>Tracks without this format are downloaded in another one</translation>
+    </message>
+    <message>
+        <source>Download bandwidth</source>
+        <translation>Download bandwidth</translation>
+    </message>
+    <message>
+        <source>Limit download speed, browsing stays responsive while downloads run</source>
+        <translation>Limit download speed, browsing stays responsive while downloads run</translation>
+    </message>
+    <message>
+        <source>Unlimited</source>
+        <translation>Unlimited</translation>
+    </message>
 </context>
 <context>
     <name>ProxyHostCard</name>
@@ -284,6 +348,22 @@
         <source>Failed to load tracks</source>
         <translation>Failed to load tracks</translation>
     </message>
+    <message>
+        <source>Failed to load album data</source>
+        <translation>Failed to load album data</translation>
+    </message>
+    <message>
+        <source>Download</source>
+        <translation>Download</translation>
+    </message>
+    <message>
+        <source>Download started</source>
+        <translation>Download started</translation>
+    </message>
+    <message>
+        <source>{0} tracks of {1} were queued</source>
+        <translation>{0} tracks of {1} were queued</translation>
+    </message>
 </context>
 <context>
     <name>Translator</name>
@@ -296,5 +376,86 @@
         <translation>Settings</translation>
     </message>
 </context>
+<context>
+    <name>DownloadItemCard</name>
+    <message>
+        <source>Waiting</source>
+        <translation>Waiting</translation>
+    </message>
+    <message>
+        <source>Resolving</source>
+        <translation>Resolving</translation>
+    </message>
+    <message>
+        <source>Finished</source>
+        <translation>Finished</translation>
+    </message>
+    <message>
+        <source>Failed</source>
+        <translation>Failed</translation>
+    </message>
+    <message>
+        <source>Cancelled</source>
+        <translation>Cancelled</translation>
+    </message>
+    <message>
+        <source>Show in folder</source>
+        <translation>Show in folder</translation>
+    </message>
+    <message>
+        <source>Cancel</source>
+        <translation>Cancel</translation>
+    </message>
+</context>
+<context>
+    <name>DownloadInterface</name>
+    <message>
+        <source>Downloads</source>
+        <translation>Downloads</translation>
+    </message>
+    <message>
+        <source>Clear finished</source>
+        <translation>Clear finished</translation>
+    </message>
+    <message>
+        <source>No downloads yet. Open an album and click Download.</source>
+        <translation>No downloads yet. Open an album and click Download.</translation>
+    </message>
+    <message>
+        <source>No active downloads</source>
+        <translation>No active downloads</translation>
+    </message>
+    <message>
+        <source>{0} active • {1}/s</source>
+        <translation>{0} active • {1}/s</translation>
+    </message>
+</context>
+<context>
+    <name>SearchInterface</name>
+    <message>
+        <source>Search</source>
+        <translation>Search</translation>
+    </message>
+    <message>
+        <source>No albums found</source>
+        <translation>No albums found</translation>
+    </message>
+    <message>
+        <source>Search albums by title, platform or year</source>
+        <translation>Search albums by title, platform or year</translation>
+    </message>
+    <message>
+        <source>{0} albums indexed, albums are added while you browse</source>
+        <translation>{0} albums indexed, albums are added while you browse</translation>
+    </message>
+    <message>
+        <source>{0} albums</source>
+        <translation>{0} albums</translation>
+    </message>
+    <message>
+        <source>{0} albums, searching KHInsider...</source>
+        <translation>{0} albums, searching KHInsider...</translation>
+    </message>
+</context>
 </TS>
 
@@ -64,6 +64,14 @@
         <source>Settings</source>
         <translation>设置</translation>
     </message>
+    <message>
+        <source>Downloads</source>
+        <translation>下载</translation>
+    </message>
+    <message>
+        <source>Search</source>
+        <translation>搜索</translation>
+    </message>
 </context>
 <context>
     <name>SettingInterface</name>
@@ -231,6 +239,62 @@
         <source>Selected</source>
         <translation>已选择</translation>
     </message>
+    <message>
+        <source>Virtualized album list</source>
+        <translation>虚拟化专辑列表</translation>
+    </message>
+    <message>
+        <source>Draw album lists with a lightweight view, recommended for browsing long lists</source>
+        <translation>使用轻量视图绘制专辑列表，推荐在浏览长列表时使用</translation>
+    </message>
+    <message>
+        <source>Prefetch categories</source>
+        <translation>预加载分类</translation>
+    </message>
+    <message>
+        <source>Load all soundtrack categories in background after startup, so switching tabs is instant</source>
+        <translation>启动后在后台加载所有原声分类，切换标签无需等待</translation>
+    </message>
+    <message>
+        <source>Download</source>
+        <translation>下载</translation>
+    </message>
+    <message>
+        <source>Choose folder</source>
+        <translation>选择文件夹</translation>
+    </message>
+    <message>
+        <source>Download directory</source>
+        <translation>下载目录</translation>
+    </message>
+    <message>
+        <source>Parallel downloads</source>
+        <translation>同时下载数</translation>
+    </message>
+    <message>
+        <source>Number of tracks downloaded at the same time</source>
+        <translation>同时下载的曲目数量</translation>
+    </message>
+    <message>
+        <source>Preferred format</source>
+        <translation>首选格式</translation>
+    </message>
+    <message>
+        <source>Tracks without this format are downloaded in another one</source>
+        <translation>没有该格式的曲目将以其他格式下载</translation>
+    </message>
+    <message>
+        <source>Download bandwidth</source>
+        <translation>下载带宽</translation>
+    </message>
+    <message>
+        <source>Limit download speed, browsing stays responsive while downloads run</source>
+        <translation>限制下载速度，下载时浏览依然流畅</translation>
+    </message>
+    <message>
+        <source>Unlimited</source>
+        <translation>不限制</translation>
+    </message>
 </context>
 <context>
     <name>ProxyHostCard</name>
@@ -284,6 +348,22 @@
         <source>Failed to load tracks</source>
         <translation>加载曲目失败</translation>
     </message>
+    <message>
+        <source>Failed to load album data</source>
+        <translation>加载专辑数据失败</translation>
+    </message>
+    <message>
+        <source>Download</source>
+        <translation>下载</translation>
+    </message>
+    <message>
+        <source>Download started</source>
+        <translation>已开始下载</translation>
+    </message>
+    <message>
+        <source>{0} tracks of {1} were queued</source>
+        <translation>已将 {1} 的 {0} 首曲目加入队列</translation>
+    </message>
 </context>
 <context>
     <name>Translator</name>
@@ -296,5 +376,86 @@
         <translation>设置</translation>
     </message>
 </context>
+<context>
+    <name>DownloadItemCard</name>
+    <message>
+        <source>Waiting</source>
+        <translation>等待中</translation>
+    </message>
+    <message>
+        <source>Resolving</source>
+        <translation>解析中</translation>
+    </message>
+    <message>
+        <source>Finished</source>
+        <translation>已完成</translation>
+    </message>
+    <message>
+        <source>Failed</source>
+        <translation>失败</translation>
+    </message>
+    <message>
+        <source>Cancelled</source>
+        <translation>已取消</translation>
+    </message>
+    <message>
+        <source>Show in folder</source>
+        <translation>在文件夹中显示</translation>
+    </message>
+    <message>
+        <source>Cancel</source>
+        <translation>取消</translation>
+    </message>
+</context>
+<context>
+    <name>DownloadInterface</name>
+    <message>
+        <source>Downloads</source>
+        <translation>下载</translation>
+    </message>
+    <message>
+        <source>Clear finished</source>
+        <translation>清除已结束</translation>
+    </message>
+    <message>
+        <source>No downloads yet. Open an album and click Download.</source>
+        <translation>暂无下载，打开专辑并点击下载。</translation>
+    </message>
+    <message>
+        <source>No active downloads</source>
+        <translation>没有进行中的下载</translation>
+    </message>
+    <message>
+        <source>{0} active • {1}/s</source>
+        <translation>{0} 个进行中 • {1}/s</translation>
+    </message>
+</context>
+<context>
+    <name>SearchInterface</name>
+    <message>
+        <source>Search</source>
+        <translation>搜索</translation>
+    </message>
+    <message>
+        <source>No albums found</source>
+        <translation>未找到专辑</translation>
+    </message>
+    <message>
+        <source>Search albums by title, platform or year</source>
+        <translation>按标题、平台或年份搜索专辑</translation>
+    </message>
+    <message>
+        <source>{0} albums indexed, albums are added while you browse</source>
+        <translation>已索引 {0} 张专辑，浏览时会自动添加专辑</translation>
+    </message>
+    <message>
+        <source>{0} albums</source>
+        <translation>{0} 张专辑</translation>
+    </message>
+    <message>
+        <source>{0} albums, searching KHInsider...</source>
+        <translation>{0} 张专辑，正在搜索 KHInsider...</translation>
+    </message>
+</context>
 </TS>
 
@@ -1,5 +1,37 @@
 # coding:utf-8
-from .image_loader import ImageLoader
+"""
+Application services
 
-__all__ = ['ImageLoader']
+The image service and the detail prefetcher pull in the network layer, so
+like `app.api`, a submodule is imported when one of its names is first used.
+"""
+from importlib import import_module
 
+_EXPORTS = {
+    'ThumbnailCache': 'thumbnail_cache',
+    'thumbnailCache': 'thumbnail_cache',
+    'ImageService': 'image_service',
+    'ImageRequest': 'image_service',
+    'imageService': 'image_service',
+    'AsyncRunner': 'async_runner',
+    'AsyncTask': 'async_runner',
+    'asyncRunner': 'async_runner',
+    'DetailPrefetcher': 'detail_prefetcher',
+    'DetailRequest': 'detail_prefetcher',
+    'detailPrefetcher': 'detail_prefetcher',
+    'CategoryWarmer': 'category_warmer',
+    'categoryWarmer': 'category_warmer',
+    'StartupProfiler': 'startup_profiler',
+    'startupProfiler': 'startup_profiler'
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,126 @@
+# coding:utf-8
+import asyncio
+import concurrent.futures
+import threading
+from typing import Awaitable, Callable, List
+
+from PyQt5.QtCore import QCoreApplication, QObject, QThread, pyqtSignal
+
+
+class AsyncTask(QObject):
+    """ Handle of a coroutine running on the async runner """
+
+    finished = pyqtSignal(object)
+    error = pyqtSignal(str)
+
+    def __init__(self, future: concurrent.futures.Future):
+        super().__init__()
+        self.future = future
+
+    def cancel(self):
+        """ Cancel the coroutine, no signal is emitted afterwards """
+        self.future.cancel()
+
+    def isDone(self) -> bool:
+        return self.future.done()
+
+    def _onDone(self, future: concurrent.futures.Future):
+        # called on the loop thread, the signals are queued to the GUI thread
+        if future.cancelled():
+            return
+
+        e = future.exception()
+        if e is not None:
+            self.error.emit(str(e))
+        else:
+            self.finished.emit(future.result())
+
+
+class AsyncRunner(QThread):
+    """ Thread running the single asyncio event loop shared by the application """
+
+    def __init__(self, parent=None):
+        super().__init__(parent=parent)
+        self.loop = None    # type: asyncio.AbstractEventLoop
+        self._ready = threading.Event()
+        self._shutdownHooks = []    # type: List[Callable[[], Awaitable]]
+
+    def submit(self, coro: Awaitable, owner: QObject = None) -> AsyncTask:
+        """
+        Schedule a coroutine on the event loop
+
+        Parameters
+        ----------
+        coro: Awaitable
+            coroutine to run
+        owner: QObject
+            the coroutine is cancelled when owner is destroyed
+
+        Returns
+        -------
+        task: AsyncTask
+            task handle, its signals are delivered on the GUI thread
+        """
+        self._ensureRunning()
+
+        task = AsyncTask(asyncio.run_coroutine_threadsafe(coro, self.loop))
+        task.future.add_done_callback(task._onDone)
+
+        if owner is not None:
+            owner.destroyed.connect(task.cancel)
+
+        return task
+
+    def addShutdownHook(self, hook: Callable[[], Awaitable]):
+        """ Register a coroutine function awaited on the loop before it stops """
+        self._shutdownHooks.append(hook)
+
+    def stop(self):
+        """ Run the shutdown hooks and stop the event loop """
+        if not self.isRunning():
+            return
+
+        try:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self.loop).result(5)
+        except Exception as e:
+            print(f"Error shutting down async runner: {e}")
+
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.wait()
+
+    def run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self._ready.set()
+
+        try:
+            self.loop.run_forever()
+
+            tasks = asyncio.all_tasks(self.loop)
+            for task in tasks:
+                task.cancel()
+
+            self.loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            self.loop.run_until_complete(self.loop.shutdown_asyncgens())
+        finally:
+            self.loop.close()
+
+    def _ensureRunning(self):
+        if self.isRunning():
+            return
+
+        self._ready.clear()
+        self.start()
+        self._ready.wait()
+
+        # the thread must not outlive the application
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.stop)
+
+    async def _shutdown(self):
+        for hook in self._shutdownHooks:
+            await hook()
+
+
+asyncRunner = AsyncRunner()
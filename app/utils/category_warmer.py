@@ -0,0 +1,89 @@
+# coding:utf-8
+import time
+from importlib import import_module
+from typing import Dict, List, Optional
+
+from PyQt5.QtCore import QObject, QThread, pyqtSignal
+
+from .async_runner import asyncRunner
+
+
+class _ImportThread(QThread):
+    """ Thread importing the network modules, so the GUI thread does not wait for them """
+
+    def run(self):
+        import_module('..api.async_khinsider', __package__)
+
+
+class CategoryWarmer(QObject):
+    """
+    Background fetch of the first page of every category after startup
+
+    The Latest interface is only built when it is first opened, so its albums
+    are fetched here once the window is shown. The network modules are imported
+    on a worker thread, then the categories are fetched concurrently as bulk
+    requests on the async runner. The interface takes the albums when it is built.
+    """
+
+    finished = pyqtSignal(dict)     # albums of each category
+
+    # seconds warmed albums stay fresh enough to be shown
+    MAX_AGE = 600
+
+    def __init__(self, parent=None):
+        super().__init__(parent=parent)
+        self.limit = 0
+        self.thread = None      # type: Optional[_ImportThread]
+        self.task = None
+        self._albums = None     # type: Optional[Dict[str, List[Dict]]]
+        self._fetchedAt = 0.0
+
+    def start(self, limit: int):
+        """
+        Start fetching the categories, ignored if they are being fetched
+
+        Parameters
+        ----------
+        limit: int
+            number of albums to fetch per category
+        """
+        if self.isRunning():
+            return
+
+        self.limit = limit
+        self.thread = _ImportThread(self)
+        self.thread.finished.connect(self.__fetch)
+        self.thread.start()
+
+    def isRunning(self) -> bool:
+        return self.thread is not None or self.task is not None
+
+    def takeAlbums(self) -> Optional[Dict[str, List[Dict]]]:
+        """ Take the warmed albums of each category, None if there are none or they are too old """
+        albums, self._albums = self._albums, None
+        if albums is None or time.monotonic() - self._fetchedAt > self.MAX_AGE:
+            return None
+
+        return albums
+
+    def __fetch(self):
+        self.thread = None
+
+        # already imported by the worker thread
+        from ..api import asyncKhinsider
+        self.task = asyncRunner.submit(asyncKhinsider.fetchCategories(limit=self.limit, bulk=True), self)
+        self.task.finished.connect(self.__onFinished)
+        self.task.error.connect(self.__onFailed)
+
+    def __onFinished(self, albums: dict):
+        self.task = None
+        self._albums = albums
+        self._fetchedAt = time.monotonic()
+        self.finished.emit(albums)
+
+    def __onFailed(self, error: str):
+        self.task = None
+        print(f"Error warming up categories: {error}")
+
+
+categoryWarmer = CategoryWarmer()
@@ -0,0 +1,214 @@
+# coding:utf-8
+from collections import OrderedDict, deque
+from typing import Dict, List, Optional
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from ..api import asyncKhinsider
+from .async_runner import AsyncTask, asyncRunner
+
+
+class DetailRequest(QObject):
+    """ Handle of a pending album details request """
+
+    finished = pyqtSignal(dict)
+    failed = pyqtSignal()
+
+    def __init__(self, prefetcher: 'DetailPrefetcher', url: str):
+        super().__init__()
+        self.prefetcher = prefetcher
+        self.url = url
+        self.isCancelled = False
+
+    def cancel(self):
+        """ Cancel request, the fetch is dropped if nobody else waits for it """
+        if not self.isCancelled:
+            self.isCancelled = True
+            self.prefetcher._cancel(self)
+
+
+class _DetailJob:
+    """ Bookkeeping of one in-flight album page """
+
+    def __init__(self, task: AsyncTask, isSpeculative: bool):
+        self.task = task
+        self.isSpeculative = isSpeculative
+        self.requests = []     # type: List[DetailRequest]
+
+
+class DetailPrefetcher(QObject):
+    """
+    Speculative fetcher and LRU cache of parsed album details
+
+    Albums the user hovers or scrolls to are queued with `prefetch()`. The most
+    recent hint is fetched first and at most `MAX_CONCURRENT` speculative fetches
+    run at once, as bulk requests which yield to pages the user is waiting for.
+    `request()` is for albums the user opened: it skips the queue and the cap,
+    and takes over a prefetch already in flight. Pinned albums, e.g. the one
+    shown in a detail dialog, are never evicted.
+    """
+
+    MAX_ENTRIES = 48
+    MAX_CONCURRENT = 2
+    MAX_QUEUED = 16
+
+    def __init__(self, parent=None):
+        super().__init__(parent=parent)
+        self._cache = OrderedDict()     # type: OrderedDict[str, Dict]
+        self._pinned = {}               # type: Dict[str, int]
+        self._queue = deque()           # type: deque[str]
+        self._jobs = {}                 # type: Dict[str, _DetailJob]
+
+    def details(self, url: str) -> Optional[Dict]:
+        """ Get cached details of an album, None on cache miss """
+        details = self._cache.get(url)
+        if details is not None:
+            self._cache.move_to_end(url)
+
+        return details
+
+    def put(self, url: str, details: Dict):
+        """ Cache album details fetched elsewhere """
+        self._cache[url] = details
+        self._cache.move_to_end(url)
+        self._evict()
+
+    def prefetch(self, url: str):
+        """ Queue a speculative fetch of an album, the newest hint goes first """
+        if not url or url in self._cache or url in self._jobs:
+            return
+
+        if url in self._queue:
+            self._queue.remove(url)
+
+        self._queue.appendleft(url)
+        while len(self._queue) > self.MAX_QUEUED:
+            self._queue.pop()
+
+        self._pump()
+
+    def isFetching(self, url: str) -> bool:
+        """ Whether the page of an album is being downloaded, queued prefetches do not count """
+        return url in self._jobs
+
+    def cancelPrefetch(self, url: str):
+        """ Drop a speculative fetch nobody waits for, e.g. when its card scrolled away """
+        if url in self._queue:
+            self._queue.remove(url)
+            return
+
+        job = self._jobs.get(url)
+        if job is not None and job.isSpeculative and not job.requests:
+            job.task.cancel()
+            self._jobs.pop(url)
+            self._pump()
+
+    def request(self, url: str, owner: QObject = None) -> DetailRequest:
+        """
+        Request album details the user is waiting for
+
+        Parameters
+        ----------
+        url: str
+            album page URL
+        owner: QObject
+            the request is cancelled when owner is destroyed
+
+        Returns
+        -------
+        request: DetailRequest
+            request handle, a cache hit is delivered on the next event loop iteration
+        """
+        request = DetailRequest(self, url)
+        if owner is not None:
+            owner.destroyed.connect(request.cancel)
+
+        details = self.details(url)
+        if details is not None:
+            QTimer.singleShot(0, lambda: request.isCancelled or request.finished.emit(details))
+            return request
+
+        if url in self._queue:
+            self._queue.remove(url)
+
+        job = self._jobs.get(url)
+        if job is None:
+            job = self._start(url, isSpeculative=False)
+        elif job.isSpeculative:
+            # the prefetch became what the user is waiting for, free its slot
+            job.isSpeculative = False
+            self._pump()
+
+        job.requests.append(request)
+        return request
+
+    def pin(self, url: str):
+        """ Keep the details of an album in cache until `unpin()` """
+        self._pinned[url] = self._pinned.get(url, 0) + 1
+
+    def unpin(self, url: str):
+        count = self._pinned.get(url, 0) - 1
+        if count > 0:
+            self._pinned[url] = count
+        else:
+            self._pinned.pop(url, None)
+            self._evict()
+
+    def _start(self, url: str, isSpeculative: bool) -> _DetailJob:
+        task = asyncRunner.submit(asyncKhinsider.fetchAlbumDetails(url, bulk=isSpeculative))
+        job = _DetailJob(task, isSpeculative)
+        self._jobs[url] = job
+
+        task.finished.connect(lambda details: self._onJobFinished(url, task, details))
+        task.error.connect(lambda e: self._onJobFinished(url, task, None))
+        return job
+
+    def _pump(self):
+        """ Start queued prefetches while speculative slots are free """
+        running = sum(job.isSpeculative for job in self._jobs.values())
+        while self._queue and running < self.MAX_CONCURRENT:
+            url = self._queue.popleft()
+            if url in self._cache or url in self._jobs:
+                continue
+
+            self._start(url, isSpeculative=True)
+            running += 1
+
+    def _cancel(self, request: DetailRequest):
+        job = self._jobs.get(request.url)
+        if job is None or request not in job.requests:
+            return
+
+        # let the page finish anyway, the user may open the album again
+        job.requests.remove(request)
+
+    def _onJobFinished(self, url: str, task: AsyncTask, details: Optional[Dict]):
+        job = self._jobs.get(url)
+        if job is None or job.task is not task:
+            return
+
+        self._jobs.pop(url)
+        if details is not None:
+            self.put(url, details)
+
+        for request in job.requests:
+            if details is None:
+                request.failed.emit()
+            else:
+                request.finished.emit(details)
+
+        self._pump()
+
+    def _evict(self):
+        """ Drop least recently used unpinned entries until the cache fits """
+        excess = len(self._cache) - self.MAX_ENTRIES
+        for url in list(self._cache):
+            if excess <= 0:
+                break
+
+            if url not in self._pinned:
+                del self._cache[url]
+                excess -= 1
+
+
+detailPrefetcher = DetailPrefetcher()
@@ -0,0 +1,110 @@
+# coding:utf-8
+import math
+from typing import Optional, Union
+
+from PyQt5.QtCore import Qt, QBuffer, QByteArray, QIODevice, QRectF, QSize
+from PyQt5.QtGui import QImage, QImageReader, QPainter, QPainterPath
+
+# QImage and QPainter on QImage are safe to use outside the GUI thread,
+# so everything here runs on image service workers.
+
+
+def decodeImage(data: Union[bytes, QByteArray], size: QSize = None) -> Optional[QImage]:
+    """
+    Decode image data, returns None if the data is not a valid image
+
+    Parameters
+    ----------
+    data: bytes | QByteArray
+        encoded image data
+    size: QSize
+        if given, the image is downscaled while decoding to the smallest size
+        which still covers `size`. JPEG uses DCT scaling, so a multi-megapixel
+        scan is never materialized at full resolution
+    """
+    buffer = QBuffer()
+    buffer.setData(QByteArray(data))
+    buffer.open(QIODevice.ReadOnly)
+
+    reader = QImageReader(buffer)
+    reader.setAutoTransform(True)
+
+    if size is not None:
+        scaledSize = coverDecodeSize(reader.size(), size)
+        if scaledSize is not None:
+            reader.setScaledSize(scaledSize)
+
+    image = reader.read()
+    return None if image.isNull() else image
+
+
+def coverDecodeSize(source: QSize, target: QSize) -> Optional[QSize]:
+    """ Get the smallest size keeping aspect ratio of source which covers target """
+    if not source.isValid() or source.isEmpty():
+        return None
+
+    factor = max(target.width() / source.width(), target.height() / source.height())
+    if factor >= 1:
+        return None
+
+    return QSize(
+        max(target.width(), math.ceil(source.width() * factor)),
+        max(target.height(), math.ceil(source.height() * factor))
+    )
+
+
+def scaleAndCrop(image: QImage, size: QSize) -> QImage:
+    """ Scale image to cover size and crop the center """
+    scaled = image.scaled(size, Qt.KeepAspectRatioByExpanding, Qt.SmoothTransformation)
+
+    if scaled.width() > size.width() or scaled.height() > size.height():
+        x = (scaled.width() - size.width()) // 2
+        y = (scaled.height() - size.height()) // 2
+        scaled = scaled.copy(x, y, size.width(), size.height())
+
+    return scaled
+
+
+def roundCorners(image: QImage, radius: int) -> QImage:
+    """ Clip image to a rounded rectangle """
+    rounded = QImage(image.size(), QImage.Format_ARGB32_Premultiplied)
+    rounded.fill(Qt.transparent)
+
+    painter = QPainter(rounded)
+    painter.setRenderHint(QPainter.Antialiasing)
+    painter.setRenderHint(QPainter.SmoothPixmapTransform)
+
+    path = QPainterPath()
+    path.addRoundedRect(QRectF(0, 0, image.width(), image.height()), radius, radius)
+
+    painter.setClipPath(path)
+    painter.drawImage(0, 0, image)
+    painter.end()
+
+    return rounded
+
+
+def createThumbnail(data: Union[bytes, QByteArray], size: QSize, radius: int = 0) -> Optional[QImage]:
+    """
+    Decode, downscale, crop and round a cover image
+
+    Parameters
+    ----------
+    data: bytes | QByteArray
+        encoded image data
+    size: QSize
+        thumbnail size
+    radius: int
+        corner radius, 0 for square corners
+
+    Returns
+    -------
+    thumbnail: Optional[QImage]
+        processed thumbnail or None if decoding failed
+    """
+    image = decodeImage(data, size)
+    if image is None:
+        return None
+
+    image = scaleAndCrop(image, size)
+    return roundCorners(image, radius) if radius > 0 else image
@@ -0,0 +1,233 @@
+# coding:utf-8
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import requests
+from PyQt5.QtCore import QByteArray, QObject, QRunnable, QSize, QThreadPool, pyqtSignal
+from PyQt5.QtGui import QImage, QPixmap
+
+from ..api.scheduler import networkScheduler
+from .image_processing import createThumbnail, decodeImage
+from .thumbnail_cache import thumbnailCache
+
+
+class ImageRequest(QObject):
+    """ Handle of a pending image request """
+
+    finished = pyqtSignal(QPixmap)
+    failed = pyqtSignal()
+
+    def __init__(self, service: 'ImageService', key: Tuple, priority: int):
+        super().__init__()
+        self.service = service
+        self.key = key
+        self.priority = priority
+        self.isCancelled = False
+
+    def cancel(self):
+        """ Cancel request, the download is dropped if nobody else waits for it """
+        if not self.isCancelled:
+            self.isCancelled = True
+            self.service._cancel(self)
+
+    def setPriority(self, priority: int):
+        """ Change the priority of the request if it is still queued """
+        if not self.isCancelled and priority != self.priority:
+            self.priority = priority
+            self.service._reprioritize(self.key)
+
+
+class _ImageTask(QRunnable):
+    """ Worker task which fetches, decodes and processes one image """
+
+    CHUNK_SIZE = 64 * 1024
+    MAX_IMAGE_BYTES = 32 * 1024 * 1024
+
+    def __init__(self, service: 'ImageService', key: Tuple, url: str, size: Optional[QSize], radius: int):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.service = service
+        self.key = key
+        self.url = url
+        self.size = size
+        self.radius = radius
+        self.cancelled = threading.Event()
+
+    def run(self):
+        if self.cancelled.is_set():
+            return
+
+        try:
+            image = self._load()
+        except Exception:
+            image = None
+
+        self.service._taskFinished.emit(self, image)
+
+    def _load(self) -> Optional[QImage]:
+        # skip both the network and the full-size decode on a disk cache hit
+        if self.size is not None:
+            image = thumbnailCache.loadFromDisk(self.url, self.size, self.radius)
+            if image is not None:
+                return image
+
+        try:
+            data = self._download()
+        except requests.exceptions.SSLError:
+            # retry without SSL verification if SSL error occurs
+            data = self._download(verify=False)
+
+        if data is None or self.cancelled.is_set():
+            return None
+
+        if self.size is None:
+            return decodeImage(data)
+
+        image = createThumbnail(data, self.size, self.radius)
+        if image is not None:
+            thumbnailCache.saveToDisk(self.url, self.size, self.radius, image)
+
+        return image
+
+    def _download(self, verify=True) -> Optional[QByteArray]:
+        """ Stream the encoded image into one buffer, None if cancelled meanwhile """
+        with networkScheduler.stream(self.url, timeout=15, verify=verify) as response:
+            response.raise_for_status()
+
+            data = QByteArray()
+            for chunk in networkScheduler.iterContent(response, self.CHUNK_SIZE):
+                if self.cancelled.is_set():
+                    return None
+
+                data.append(chunk)
+                if data.size() > self.MAX_IMAGE_BYTES:
+                    raise ValueError(f"Image is larger than {self.MAX_IMAGE_BYTES} bytes")
+
+            return data
+
+
+class _ImageJob:
+    """ Bookkeeping of one in-flight image, shared by coalesced requests """
+
+    def __init__(self, task: _ImageTask, priority: int):
+        self.task = task
+        self.priority = priority
+        self.requests = []     # type: List[ImageRequest]
+
+
+class ImageService(QObject):
+    """ Image fetch service with a bounded worker pool and request coalescing """
+
+    PRIORITY_LOW = 0
+    PRIORITY_NORMAL = 1
+    PRIORITY_HIGH = 2
+
+    MAX_WORKERS = 6
+
+    _taskFinished = pyqtSignal(object, object)
+
+    def __init__(self, maxWorkers: int = MAX_WORKERS, parent=None):
+        super().__init__(parent=parent)
+        self.threadPool = QThreadPool(self)
+        self.threadPool.setMaxThreadCount(maxWorkers)
+        self._jobs = {}     # type: Dict[Tuple, _ImageJob]
+        self._taskFinished.connect(self._onTaskFinished)
+
+    def request(self, url: str, priority: int = PRIORITY_NORMAL, thumbnailSize: QSize = None,
+                radius: int = 0, owner: QObject = None) -> ImageRequest:
+        """
+        Request an image
+
+        Parameters
+        ----------
+        url: str
+            image URL
+        priority: int
+            queue priority, higher runs first
+        thumbnailSize: QSize
+            scale and crop the image to this size and cache the result,
+            None to deliver the image at its original size
+        radius: int
+            corner radius of the thumbnail
+        owner: QObject
+            the request is cancelled when owner is destroyed
+
+        Returns
+        -------
+        request: ImageRequest
+            request handle, its signals are emitted on the GUI thread with
+            a ready-to-paint pixmap
+        """
+        size = QSize(thumbnailSize) if thumbnailSize is not None else None
+        key = (url, size.width(), size.height(), radius) if size is not None else (url, )
+        request = ImageRequest(self, key, priority)
+
+        if owner is not None:
+            owner.destroyed.connect(request.cancel)
+
+        job = self._jobs.get(key)
+        if job is None:
+            job = _ImageJob(_ImageTask(self, key, url, size, radius), priority)
+            self._jobs[key] = job
+            self.threadPool.start(job.task, priority)
+
+        job.requests.append(request)
+        self._reprioritize(key)
+        return request
+
+    def pendingCount(self) -> int:
+        """ Get number of in-flight images """
+        return len(self._jobs)
+
+    def _cancel(self, request: ImageRequest):
+        job = self._jobs.get(request.key)
+        if job is None or request not in job.requests:
+            return
+
+        job.requests.remove(request)
+        if job.requests:
+            self._reprioritize(request.key)
+            return
+
+        # nobody waits for the image any more, drop it from the queue
+        job.task.cancelled.set()
+        self.threadPool.tryTake(job.task)
+        self._jobs.pop(request.key, None)
+
+    def _reprioritize(self, key: Tuple):
+        """ Queue the image with the highest priority of the requests waiting for it """
+        job = self._jobs.get(key)
+        if job is None or not job.requests:
+            return
+
+        priority = max(request.priority for request in job.requests)
+        if job.priority == priority:
+            return
+
+        # only tasks still waiting in the queue can be moved
+        if self.threadPool.tryTake(job.task):
+            job.priority = priority
+            self.threadPool.start(job.task, priority)
+
+    def _onTaskFinished(self, task: _ImageTask, image: Optional[QImage]):
+        job = self._jobs.get(task.key)
+        if job is None or job.task is not task or task.cancelled.is_set():
+            return
+
+        self._jobs.pop(task.key)
+
+        if image is None:
+            for request in job.requests:
+                request.failed.emit()
+            return
+
+        # only the upload to a pixmap happens on the GUI thread
+        pixmap = QPixmap.fromImage(image)
+        if task.size is not None:
+            thumbnailCache.put(task.url, task.size, task.radius, pixmap, persist=False)
+
+        for request in job.requests:
+            request.finished.emit(pixmap)
+
+
+imageService = ImageService()
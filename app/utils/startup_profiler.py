@@ -0,0 +1,69 @@
+# coding:utf-8
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import List, Tuple
+
+
+class StartupProfiler:
+    """
+    Timings of the startup phases, printed once the first frame is shown
+
+    Enabled by the `--profile-startup` command line option or the
+    `KHITUNE_PROFILE_STARTUP=1` environment variable, otherwise every
+    call returns immediately. Phases measured after the report, like
+    interfaces built on first navigation, are printed as they finish.
+    """
+
+    OPTION = '--profile-startup'
+    ENV_NAME = 'KHITUNE_PROFILE_STARTUP'
+
+    def __init__(self):
+        self.enabled = self.OPTION in sys.argv or os.environ.get(self.ENV_NAME) == '1'
+        self.isReported = False
+        self._start = self._last = time.perf_counter()
+        self._phases = []   # type: List[Tuple[str, float]]
+
+    def mark(self, phase: str):
+        """ End a phase, it lasted since the previous mark """
+        if not self.enabled:
+            return
+
+        now = time.perf_counter()
+        self._record(phase, now - self._last)
+        self._last = now
+
+    @contextmanager
+    def measure(self, phase: str):
+        """ Time a block which does not follow the previous mark, e.g. a lazily built interface """
+        if not self.enabled:
+            yield
+            return
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(phase, time.perf_counter() - start)
+
+    def report(self):
+        """ Print the phases measured so far and the total startup time """
+        if not self.enabled or self.isReported:
+            return
+
+        self.isReported = True
+        width = max((len(phase) for phase, _ in self._phases), default=0)
+        print("Startup profile:")
+        for phase, duration in self._phases:
+            print(f"  {phase:<{width}}  {duration * 1000:8.1f} ms")
+
+        print(f"  {'total':<{width}}  {(self._last - self._start) * 1000:8.1f} ms")
+
+    def _record(self, phase: str, duration: float):
+        self._phases.append((phase, duration))
+        if self.isReported:
+            print(f"Startup profile: {phase} {duration * 1000:.1f} ms")
+
+
+startupProfiler = StartupProfiler()
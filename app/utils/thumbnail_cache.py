@@ -0,0 +1,202 @@
+# coding:utf-8
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+from PyQt5.QtCore import QSize
+from PyQt5.QtGui import QImage, QPixmap
+
+from ..common.config import get_cache_dir
+
+
+class ThumbnailCache:
+    """ Two-tier cache of processed cover thumbnails (memory LRU + disk LRU) """
+
+    MEMORY_BUDGET = 32 * 1024 * 1024
+    DISK_BUDGET = 128 * 1024 * 1024
+
+    def __init__(self, directory: Path, memoryBudget: int = MEMORY_BUDGET, diskBudget: int = DISK_BUDGET):
+        self.directory = Path(directory)
+        self.memoryBudget = memoryBudget
+        self.diskBudget = diskBudget
+        self._memory = OrderedDict()
+        self._memoryBytes = 0
+        self._disk = None       # type: Optional[OrderedDict[str, int]]
+        self._diskBytes = 0
+        self._lock = threading.Lock()
+        self._counters = {'memoryHits': 0, 'misses': 0, 'diskHits': 0, 'diskMisses': 0}
+
+    def get(self, url: str, size: QSize, radius: int = 0) -> Optional[QPixmap]:
+        """
+        Get a ready-to-paint thumbnail from the memory tier
+
+        Parameters
+        ----------
+        url: str
+            source image URL
+        size: QSize
+            thumbnail size
+        radius: int
+            corner radius the thumbnail was rounded with
+
+        Returns
+        -------
+        pixmap: Optional[QPixmap]
+            cached thumbnail or None
+        """
+        key = self._key(url, size, radius)
+        with self._lock:
+            pixmap = self._memory.get(key)
+            if pixmap is None:
+                self._counters['misses'] += 1
+                return None
+
+            self._memory.move_to_end(key)
+            self._counters['memoryHits'] += 1
+            return pixmap
+
+    def loadFromDisk(self, url: str, size: QSize, radius: int = 0) -> Optional[QImage]:
+        """ Load a thumbnail from the disk tier, safe to call from worker threads """
+        path = self._path(url, size, radius)
+        image = QImage(str(path))
+        with self._lock:
+            index = self._diskIndex()
+            if image.isNull():
+                self._counters['diskMisses'] += 1
+                self._diskBytes -= index.pop(path.name, 0)
+                return None
+
+            self._counters['diskHits'] += 1
+            if path.name in index:
+                index.move_to_end(path.name)
+
+        # the modification time keeps the order of use across sessions
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        return image
+
+    def put(self, url: str, size: QSize, radius: int, pixmap: QPixmap, persist=True):
+        """
+        Add a thumbnail to the memory tier and optionally the disk tier
+
+        Parameters
+        ----------
+        url: str
+            source image URL
+        size: QSize
+            thumbnail size
+        radius: int
+            corner radius the thumbnail was rounded with
+        pixmap: QPixmap
+            processed thumbnail
+        persist: bool
+            whether to write the thumbnail to disk as well
+        """
+        if pixmap.isNull():
+            return
+
+        key = self._key(url, size, radius)
+        cost = self._cost(pixmap)
+
+        with self._lock:
+            old = self._memory.pop(key, None)
+            if old is not None:
+                self._memoryBytes -= self._cost(old)
+
+            self._memory[key] = pixmap
+            self._memoryBytes += cost
+
+            # drop least recently used thumbnails until the budget is met
+            while self._memoryBytes > self.memoryBudget and len(self._memory) > 1:
+                _, evicted = self._memory.popitem(last=False)
+                self._memoryBytes -= self._cost(evicted)
+
+        if persist:
+            self.saveToDisk(url, size, radius, pixmap.toImage())
+
+    def saveToDisk(self, url: str, size: QSize, radius: int, image: QImage):
+        """ Write a thumbnail to the disk tier, safe to call from worker threads """
+        path = self._path(url, size, radius)
+        tmpPath = path.with_name(path.stem + '.tmp.png')
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            if not image.save(str(tmpPath), 'PNG'):
+                return
+
+            os.replace(tmpPath, path)
+            fileSize = path.stat().st_size
+        except OSError:
+            return
+
+        with self._lock:
+            index = self._diskIndex()
+            self._diskBytes += fileSize - index.pop(path.name, 0)
+            index[path.name] = fileSize
+            self._evictDisk()
+
+    def stats(self) -> Dict[str, int]:
+        """ Get hit/miss counters and usage of both tiers """
+        with self._lock:
+            stats = dict(self._counters)
+            stats['memoryEntries'] = len(self._memory)
+            stats['memoryBytes'] = self._memoryBytes
+            stats['diskEntries'] = len(self._disk or ())
+            stats['diskBytes'] = self._diskBytes
+
+        return stats
+
+    def clearMemory(self):
+        """ Clear the memory tier """
+        with self._lock:
+            self._memory.clear()
+            self._memoryBytes = 0
+
+    def _diskIndex(self) -> 'OrderedDict[str, int]':
+        """ Sizes of the thumbnails on disk, least recently used first, read from the directory on first use """
+        if self._disk is not None:
+            return self._disk
+
+        entries = []
+        try:
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith('.png') and not entry.name.endswith('.tmp.png'):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, entry.name, stat.st_size))
+        except OSError:
+            pass
+
+        entries.sort()
+        self._disk = OrderedDict((name, fileSize) for _, name, fileSize in entries)
+        self._diskBytes = sum(self._disk.values())
+        return self._disk
+
+    def _evictDisk(self):
+        """ Remove least recently used thumbnails until the disk tier fits its budget """
+        while self._diskBytes > self.diskBudget and len(self._disk) > 1:
+            name, fileSize = self._disk.popitem(last=False)
+            self._diskBytes -= fileSize
+            try:
+                (self.directory / name).unlink()
+            except OSError:
+                pass
+
+    def _path(self, url: str, size: QSize, radius: int) -> Path:
+        name = hashlib.sha1(self._key(url, size, radius).encode('utf-8')).hexdigest()
+        return self.directory / f"{name}.png"
+
+    @staticmethod
+    def _key(url: str, size: QSize, radius: int) -> str:
+        return f"{url}|{size.width()}x{size.height()}|{radius}"
+
+    @staticmethod
+    def _cost(pixmap: QPixmap) -> int:
+        return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+
+
+thumbnailCache = ThumbnailCache(get_cache_dir() / 'thumbnails')
@@ -1,7 +1,25 @@
 # coding:utf-8
-from .main_window import MainWindow
-from .home_interface import HomeInterface
-from .setting_interface import SettingInterface
+"""
+Views
 
-__all__ = ['MainWindow', 'HomeInterface', 'SettingInterface']
+Interfaces are built on first navigation, so a module is only imported when
+one of its names is first used.
+"""
+from importlib import import_module
 
+_EXPORTS = {
+    'MainWindow': 'main_window',
+    'HomeInterface': 'home_interface',
+    'SettingInterface': 'setting_interface'
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,100 @@
+# coding:utf-8
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout
+from qfluentwidgets import ScrollArea, SubtitleLabel, BodyLabel, CaptionLabel, PushButton, FluentIcon
+
+from ..common.style_sheet import StyleSheet
+from ..components.download_item_card import DownloadItemCard, formatSize
+from ..download import downloadManager
+
+
+class DownloadInterface(ScrollArea):
+    """ Download interface listing track downloads with their throughput """
+
+    STATS_INTERVAL = 500
+
+    def __init__(self, parent=None):
+        super().__init__(parent=parent)
+        self.view = QWidget(self)
+        self.vBoxLayout = QVBoxLayout(self.view)
+        self.headerLayout = QHBoxLayout()
+
+        # create widgets
+        self.titleLabel = SubtitleLabel(self.tr('Downloads'), self.view)
+        self.statsLabel = CaptionLabel(self.view)
+        self.clearButton = PushButton(FluentIcon.BROOM, self.tr('Clear finished'), self.view)
+        self.emptyLabel = BodyLabel(self.tr('No downloads yet. Open an album and click Download.'), self.view)
+        self.cards = {}
+
+        # the aggregate throughput is refreshed periodically instead of on every chunk
+        self.statsTimer = QTimer(self)
+
+        self.__initWidget()
+        self.__initLayout()
+
+    def __initWidget(self):
+        """ Initialize widget """
+        self.setObjectName('downloadInterface')
+        self.setWidgetResizable(True)
+        self.setWidget(self.view)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+
+        # set object name for styling
+        self.view.setObjectName('view')
+        StyleSheet.HOME_INTERFACE.apply(self)
+
+        self.statsLabel.setTextColor("#606060", "#d2d2d2")
+        self.emptyLabel.setAlignment(Qt.AlignCenter)
+
+        self.clearButton.clicked.connect(self.__onClearClicked)
+        self.statsTimer.timeout.connect(self.__updateStats)
+        self.statsTimer.start(self.STATS_INTERVAL)
+
+        downloadManager.taskAdded.connect(self.__addTask)
+        for task in downloadManager.tasks:
+            self.__addTask(task)
+
+    def __initLayout(self):
+        """ Initialize layout """
+        self.headerLayout.addWidget(self.titleLabel)
+        self.headerLayout.addStretch(1)
+        self.headerLayout.addWidget(self.clearButton)
+
+        self.vBoxLayout.setContentsMargins(36, 36, 36, 36)
+        self.vBoxLayout.setSpacing(12)
+        self.vBoxLayout.addLayout(self.headerLayout)
+        self.vBoxLayout.addWidget(self.statsLabel)
+        self.vBoxLayout.addSpacing(8)
+        self.vBoxLayout.addWidget(self.emptyLabel)
+        self.vBoxLayout.addStretch(1)
+        self.vBoxLayout.setAlignment(Qt.AlignTop)
+
+        self.__updateStats()
+
+    def __addTask(self, task):
+        """ Add a card for a new download """
+        card = DownloadItemCard(task, self.view)
+        self.vBoxLayout.insertWidget(self.vBoxLayout.count() - 1, card)
+        self.cards[task] = card
+        self.emptyLabel.hide()
+
+    def __onClearClicked(self):
+        """ Remove cards of downloads which are not active any more """
+        for task in downloadManager.clearFinished():
+            card = self.cards.pop(task, None)
+            if card:
+                self.vBoxLayout.removeWidget(card)
+                card.deleteLater()
+
+        self.emptyLabel.setVisible(not self.cards)
+        self.__updateStats()
+
+    def __updateStats(self):
+        """ Show number of active downloads and aggregate throughput """
+        active = downloadManager.activeCount()
+        if not active:
+            self.statsLabel.setText(self.tr('No active downloads'))
+            return
+
+        speed = formatSize(downloadManager.throughput())
+        self.statsLabel.setText(self.tr('{0} active • {1}/s').format(active, speed))
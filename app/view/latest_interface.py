@@ -1,30 +1,42 @@
 # coding:utf-8
-from PyQt5.QtCore import Qt, QThread, pyqtSignal
+from PyQt5.QtCore import Qt, QThread, QTimer, QRect, pyqtSignal
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QStackedWidget
 from qfluentwidgets import ScrollArea, SubtitleLabel, IndeterminateProgressRing, BodyLabel, Pivot, PushButton, FluentIcon
 
+from ..common.config import cfg
 from ..common.style_sheet import StyleSheet
-from ..api import KhinsiderAPI
-from ..components import AlbumCard
+from ..api import KhinsiderAPI, asyncKhinsider
+from ..components import AlbumCard, AlbumListView
+from ..utils import imageService, asyncRunner, detailPrefetcher, categoryWarmer
 
 
 class FetchAlbumsThread(QThread):
     """ Thread for fetching albums """
     
-    finished = pyqtSignal(list)
+    finished = pyqtSignal(list, object)     # albums, cursor of the following albums
     
-    def __init__(self, category='latest', limit=20, parent=None):
+    def __init__(self, category='latest', limit=20, offset=0, cursor=None, parent=None):
         super().__init__(parent)
         self.category = category
         self.limit = limit
+        self.offset = offset
+        self.cursor = cursor
         
     def run(self):
-        albums = KhinsiderAPI.fetchAlbumsByCategory(self.category, self.limit)
-        self.finished.emit(albums)
+        albums, cursor = KhinsiderAPI.fetchAlbumPage(self.category, self.limit, self.cursor, self.offset)
+        self.finished.emit(albums, cursor)
 
 
 class AlbumListWidget(ScrollArea):
-    """ Album list widget for each category """
+    """ Album list widget for each category with infinite scrolling
+
+    Albums are shown as `AlbumCard` widgets, or in a virtualized `AlbumListView`
+    when `cfg.virtualAlbumList` is enabled
+    """
+    
+    PAGE_SIZE = 20
+    LOAD_MORE_DISTANCE = 300    # pixels from the bottom at which the next page is shown
+    PREFETCH_SETTLE_DELAY = 400     # milliseconds the list must rest before visible albums are prefetched
     
     def __init__(self, category='latest', parent=None):
         super().__init__(parent=parent)
@@ -35,12 +47,31 @@ class AlbumListWidget(ScrollArea):
         # create widgets
         self.loadingRing = IndeterminateProgressRing(self.view)
         self.loadingLabel = BodyLabel(self.tr('Loading soundtracks...'), self.view)
+        self.footerRing = IndeterminateProgressRing(self.view)
         self.errorLabel = None
         self.retryButton = None
+        self.cards = []
+        self.visibleCards = set()   # cards whose covers were moved to the front of the queue
+        self.albumView = AlbumListView(self.view) if cfg.get(cfg.virtualAlbumList) else None
         
         self.fetchThread = None
         self.isLoaded = False
         
+        # pagination state, the next page is fetched one page ahead
+        self.offset = 0
+        self.cursor = None      # where the next page starts, see `KhinsiderAPI.fetchAlbumPage`
+        self.hasMore = True
+        self.pageThread = None
+        self.prefetchedAlbums = None
+        self.prefetchedCursor = None
+        self.isWaitingForPage = False
+        
+        # album details are prefetched for rows that stay visible
+        self.prefetchTimer = QTimer(self)
+        self.prefetchTimer.setSingleShot(True)
+        self.prefetchTimer.setInterval(self.PREFETCH_SETTLE_DELAY)
+        self.visibleUrls = set()
+        
         self.__initWidget()
         self.__initLayout()
     
@@ -59,6 +90,18 @@ class AlbumListWidget(ScrollArea):
         self.loadingRing.setFixedSize(60, 60)
         self.loadingRing.setStrokeWidth(5)
         self.loadingLabel.setAlignment(Qt.AlignCenter)
+        self.footerRing.setFixedSize(32, 32)
+        self.footerRing.setStrokeWidth(3)
+        self.footerRing.hide()
+        self.prefetchTimer.timeout.connect(self.__prefetchVisibleDetails)
+        
+        if self.albumView:
+            # the list view scrolls itself and fills the whole viewport
+            self.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+            self.albumView.hide()
+            self.albumView.verticalScrollBar().valueChanged.connect(self.__onScrollValueChanged)
+        else:
+            self.verticalScrollBar().valueChanged.connect(self.__onScrollValueChanged)
     
     def __initLayout(self):
         """ Initialize layout """
@@ -68,11 +111,17 @@ class AlbumListWidget(ScrollArea):
         self.vBoxLayout.addWidget(self.loadingRing, 0, Qt.AlignCenter)
         self.vBoxLayout.addSpacing(16)
         self.vBoxLayout.addWidget(self.loadingLabel, 0, Qt.AlignCenter)
-        self.vBoxLayout.addStretch(1)
+        
+        if self.albumView:
+            self.vBoxLayout.addWidget(self.albumView, 1)
+            self.vBoxLayout.addWidget(self.footerRing, 0, Qt.AlignCenter)
+        else:
+            self.vBoxLayout.addWidget(self.footerRing, 0, Qt.AlignCenter)
+            self.vBoxLayout.addStretch(1)
     
     def loadAlbums(self):
-        """ Load albums from KHInsider """
-        if self.isLoaded:
+        """ Load albums from KHInsider, ignored while the first page is loading """
+        if self.isLoaded or self.isLoading():
             return
         
         # show loading widgets if retrying
@@ -84,12 +133,28 @@ class AlbumListWidget(ScrollArea):
             if self.retryButton:
                 self.retryButton.hide()
         
-        self.fetchThread = FetchAlbumsThread(self.category, 20, self)
+        self.fetchThread = FetchAlbumsThread(self.category, self.PAGE_SIZE, parent=self)
         self.fetchThread.finished.connect(self.__onAlbumsFetched)
         self.fetchThread.start()
     
-    def __onAlbumsFetched(self, albums):
+    def isLoading(self) -> bool:
+        """ Whether the first page is being fetched """
+        return self.fetchThread is not None and self.fetchThread.isRunning()
+    
+    def setAlbums(self, albums: list):
+        """ Show a first page fetched elsewhere, ignored if the list is already loaded or loading """
+        if self.isLoaded or self.isLoading() or not albums:
+            return
+        
+        # no cursor comes with these, the next page is found from the offset
+        self.__showFirstPage(albums, None, False)
+    
+    def __onAlbumsFetched(self, albums: list, cursor):
         """ Handle fetched albums """
+        self.__showFirstPage(albums, cursor, cursor is None)
+    
+    def __showFirstPage(self, albums: list, cursor, isLast: bool):
+        """ Show the first page of albums, or the error state if there are none """
         # remove loading widgets
         self.loadingRing.hide()
         self.loadingLabel.hide()
@@ -98,15 +163,40 @@ class AlbumListWidget(ScrollArea):
             self.__showErrorState()
             return
         
+        # a page delivered by `setAlbums()` after a failed attempt replaces the error state
+        if self.errorLabel:
+            self.errorLabel.hide()
+        if self.retryButton:
+            self.retryButton.hide()
+        
         self.isLoaded = True
         
         # remove the initial spacing before adding cards
-        # layout order: spacing(40), loadingRing, spacing(16), loadingLabel, stretch
+        # layout order: spacing(40), loadingRing, spacing(16), loadingLabel, footerRing, stretch
         item = self.vBoxLayout.itemAt(0)
         if item and item.spacerItem():
             self.vBoxLayout.removeItem(item)
         
-        # add album cards
+        self.__addAlbums(albums, cursor, isLast)
+    
+    def __addAlbums(self, albums: list, cursor, isLast: bool):
+        """ Append a page of albums and prefetch the page after it """
+        if self.albumView:
+            self.albumView.show()
+            self.albumView.appendAlbums(albums)
+        else:
+            self.__addCards(albums)
+        
+        self.offset += len(albums)
+        self.cursor = cursor
+        self.hasMore = not isLast and len(albums) >= self.PAGE_SIZE
+        self.__prefetchNextPage()
+        
+        # wait for the layout to place cards before checking visibility
+        QTimer.singleShot(0, self.__onScrollValueChanged)
+    
+    def __addCards(self, albums: list):
+        """ Append album card widgets """
         for album in albums:
             card = AlbumCard(
                 title=album['title'],
@@ -117,7 +207,115 @@ class AlbumListWidget(ScrollArea):
                 coverUrl=album.get('cover'),
                 parent=self.view
             )
-            self.vBoxLayout.insertWidget(self.vBoxLayout.count() - 1, card)
+            self.vBoxLayout.insertWidget(self.vBoxLayout.indexOf(self.footerRing), card)
+            self.cards.append(card)
+    
+    def __prefetchNextPage(self):
+        """ Fetch the next page in background so it is ready before the user reaches the bottom """
+        if not self.hasMore or self.pageThread or self.prefetchedAlbums is not None:
+            return
+        
+        # the page continues from the cursor, earlier pages are not fetched again
+        self.pageThread = FetchAlbumsThread(self.category, self.PAGE_SIZE, self.offset, self.cursor, self)
+        self.pageThread.finished.connect(self.__onNextPageFetched)
+        self.pageThread.start()
+    
+    def __onNextPageFetched(self, albums: list, cursor):
+        """ Handle prefetched page """
+        self.pageThread = None
+        self.prefetchedAlbums = albums
+        self.prefetchedCursor = cursor
+        
+        if self.isWaitingForPage:
+            self.__showNextPage()
+    
+    def __showNextPage(self):
+        """ Render the prefetched page, or wait for it if it is still loading """
+        if self.prefetchedAlbums is None:
+            if self.hasMore:
+                self.isWaitingForPage = True
+                self.footerRing.show()
+                self.__prefetchNextPage()
+            return
+        
+        albums, cursor = self.prefetchedAlbums, self.prefetchedCursor
+        self.prefetchedAlbums = self.prefetchedCursor = None
+        self.isWaitingForPage = False
+        self.footerRing.hide()
+        
+        if not albums:
+            self.hasMore = False
+            return
+        
+        self.__addAlbums(albums, cursor, cursor is None)
+    
+    def __onScrollValueChanged(self):
+        """ Update cover priorities and load more albums near the bottom """
+        self.__updateCoverPriorities()
+        self.prefetchTimer.start()
+        
+        if not self.isLoaded or not self.hasMore or self.isWaitingForPage:
+            return
+        
+        # use the layout size hint, the scroll range is only updated after the next relayout
+        if self.albumView:
+            view = self.albumView
+            contentHeight = view.contentHeight()
+        else:
+            view = self
+            contentHeight = self.vBoxLayout.sizeHint().height()
+        
+        remaining = contentHeight - view.verticalScrollBar().value() - view.viewport().height()
+        if remaining < self.LOAD_MORE_DISTANCE:
+            self.__showNextPage()
+    
+    def __updateCoverPriorities(self):
+        """ Move covers of cards inside the viewport to the front of the download queue,
+        and covers of cards which left it to the back """
+        visibleCards = set(self.__visibleCards()) if self.isVisible() else set()
+        for card in self.visibleCards.difference(visibleCards):
+            card.setCoverPriority(imageService.PRIORITY_LOW)
+        
+        for card in visibleCards.difference(self.visibleCards):
+            card.setCoverPriority(imageService.PRIORITY_HIGH)
+        
+        self.visibleCards = visibleCards
+    
+    def __visibleCards(self) -> list:
+        visibleRect = QRect(0, self.verticalScrollBar().value(), self.viewport().width(), self.viewport().height())
+        return [card for card in self.cards if card.geometry().intersects(visibleRect)]
+    
+    def __prefetchVisibleDetails(self):
+        """ Prefetch details of albums the list settled on, and drop those scrolled away """
+        if not self.isVisible():
+            return
+        
+        if self.albumView:
+            urls = [album['url'] for album in self.albumView.visibleAlbums()]
+        else:
+            urls = [card.albumData['url'] for card in self.__visibleCards()]
+        
+        for url in self.visibleUrls.difference(urls):
+            detailPrefetcher.cancelPrefetch(url)
+        
+        # queue bottom rows first so the top row is fetched first
+        for url in reversed(urls):
+            detailPrefetcher.prefetch(url)
+        
+        self.visibleUrls = set(urls)
+    
+    def resizeEvent(self, e):
+        super().resizeEvent(e)
+        self.__onScrollValueChanged()
+    
+    def showEvent(self, e):
+        super().showEvent(e)
+        self.__updateCoverPriorities()
+        self.prefetchTimer.start()
+    
+    def hideEvent(self, e):
+        super().hideEvent(e)
+        self.__updateCoverPriorities()
     
     def __showErrorState(self):
         """ Show error state with retry button """
@@ -147,6 +345,9 @@ class AlbumListWidget(ScrollArea):
 class LatestInterface(QWidget):
     """ Latest soundtracks interface with category tabs """
 
+    # delay before the other categories are prefetched, so the first paint is not slowed down
+    PREFETCH_DELAY = 500
+
     def __init__(self, parent=None):
         super().__init__(parent=parent)
         self.vBoxLayout = QVBoxLayout(self)
@@ -161,6 +362,7 @@ class LatestInterface(QWidget):
         self.top40Widget = AlbumListWidget('top40', self)
         self.newlyAddedWidget = AlbumListWidget('newly_added', self)
         self.mostFavoritesWidget = AlbumListWidget('most_favorites', self)
+        self.prefetchTask = None
 
         self.__initWidget()
         self.__initLayout()
@@ -182,8 +384,18 @@ class LatestInterface(QWidget):
         # connect signals
         self.pivot.currentItemChanged.connect(self.__onCurrentIndexChanged)
         
+        # the categories may have been warmed up after startup, see `CategoryWarmer`
+        albums = categoryWarmer.takeAlbums()
+        if albums:
+            self.__fillCategories(albums)
+        
         # load first category
         self.latestWidget.loadAlbums()
+        
+        if categoryWarmer.isRunning():
+            categoryWarmer.finished.connect(self.__onCategoriesWarmed)
+        elif cfg.get(cfg.prefetchCategories):
+            QTimer.singleShot(self.PREFETCH_DELAY, self.prefetchCategories)
 
     def __initLayout(self):
         """ Initialize layout """
@@ -206,4 +418,38 @@ class LatestInterface(QWidget):
         if widget:
             self.stackedWidget.setCurrentWidget(widget)
             widget.loadAlbums()
-
+    
+    def prefetchCategories(self):
+        """ Fetch the first page of every category not loaded yet, concurrently and at low priority """
+        widgets = [w for w in self.findChildren(AlbumListWidget) if not w.isLoaded and not w.isLoading()]
+        if not widgets or self.prefetchTask:
+            return
+        
+        categories = [w.category for w in widgets]
+        self.prefetchTask = asyncRunner.submit(
+            asyncKhinsider.fetchCategories(categories, AlbumListWidget.PAGE_SIZE, bulk=True), self)
+        self.prefetchTask.finished.connect(self.__onCategoriesPrefetched)
+        self.prefetchTask.error.connect(self.__onCategoriesPrefetchFailed)
+    
+    def __onCategoriesPrefetchFailed(self, error: str):
+        """ Allow a later prefetch, the lists still load their albums when shown """
+        self.prefetchTask = None
+        print(f"Error prefetching categories: {error}")
+    
+    def __onCategoriesPrefetched(self, albums: dict):
+        """ Fill the category lists with prefetched albums """
+        self.prefetchTask = None
+        self.__fillCategories(albums)
+    
+    def __onCategoriesWarmed(self):
+        """ Fill the category lists with the albums of a warm-up finished after the interface was built """
+        albums = categoryWarmer.takeAlbums()
+        if albums:
+            self.__fillCategories(albums)
+    
+    def __fillCategories(self, albums: dict):
+        """ Show albums of categories not loaded yet """
+        for category, categoryAlbums in albums.items():
+            widget = self.findChild(AlbumListWidget, category)
+            if widget:
+                widget.setAlbums(categoryAlbums)
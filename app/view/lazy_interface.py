@@ -0,0 +1,55 @@
+# coding:utf-8
+from importlib import import_module
+from typing import Optional
+
+from PyQt5.QtWidgets import QWidget, QVBoxLayout
+
+from ..utils.startup_profiler import startupProfiler
+
+
+class LazyInterface(QWidget):
+    """
+    Navigation placeholder which builds its interface when first shown
+
+    The interface module is imported at that point too, so startup does not
+    pay for widgets and network modules of pages the user has not opened.
+    """
+
+    def __init__(self, objectName: str, module: str, className: str, parent=None):
+        """
+        Parameters
+        ----------
+        objectName: str
+            route key of the navigation item
+
+        module: str
+            module of the interface, relative to `app.view`
+
+        className: str
+            interface class, constructed with the placeholder as parent
+        """
+        super().__init__(parent=parent)
+        self.module = module
+        self.className = className
+        self.interface = None   # type: Optional[QWidget]
+
+        self.vBoxLayout = QVBoxLayout(self)
+        self.vBoxLayout.setContentsMargins(0, 0, 0, 0)
+        self.setObjectName(objectName)
+
+    def isBuilt(self) -> bool:
+        return self.interface is not None
+
+    def build(self) -> QWidget:
+        """ Build the interface if it does not exist yet """
+        if self.interface is None:
+            with startupProfiler.measure(f"build {self.className}"):
+                interfaceClass = getattr(import_module(f".{self.module}", __package__), self.className)
+                self.interface = interfaceClass(self)
+                self.vBoxLayout.addWidget(self.interface)
+
+        return self.interface
+
+    def showEvent(self, e):
+        self.build()
+        super().showEvent(e)
@@ -1,6 +1,8 @@
 # coding:utf-8
-from PyQt5.QtCore import QSize, QTimer, QUrl
-from PyQt5.QtGui import QIcon, QDesktopServices, QPainter
+import sys
+
+from PyQt5.QtCore import Qt, QPoint, QRect, QSize, QTimer, QUrl
+from PyQt5.QtGui import QIcon, QDesktopServices, QPainter, QPixmap
 from PyQt5.QtWidgets import QApplication
 
 from qfluentwidgets import (NavigationItemPosition, FluentWindow,
@@ -8,31 +10,44 @@ from qfluentwidgets import (NavigationItemPosition, FluentWindow,
                             NavigationAvatarWidget)
 from qfluentwidgets import FluentIcon as FIF
 
-from .home_interface import HomeInterface
-from .latest_interface import LatestInterface
-from .setting_interface import SettingInterface
+from .lazy_interface import LazyInterface
 from ..common.config import cfg, APP_NAME
 from ..common.signal_bus import signalBus
 from ..background import BackgroundManager
+from ..utils.category_warmer import categoryWarmer
+from ..utils.startup_profiler import startupProfiler
 
 
 class MainWindow(FluentWindow):
     """ Main window """
 
+    # delay after the first frame before the categories are warmed up
+    WARM_UP_DELAY = 500
+
+    # albums warmed up per category, a page of the Latest interface
+    WARM_UP_LIMIT = 20
+
     def __init__(self):
         super().__init__()
+        self.isStarting = False
         self.initWindow()
+        startupProfiler.mark("create window")
 
         # create background manager
-        self.backgroundManager = BackgroundManager()
+        self.backgroundPixmap = QPixmap()
+        self.backgroundManager = BackgroundManager(self)
+        self.backgroundManager.set_window_size(self.size())
+        startupProfiler.mark("create background manager")
 
         # create system theme listener
         self.themeListener = SystemThemeListener(self)
 
-        # create sub interface
-        self.homeInterface = HomeInterface(self)
-        self.latestInterface = LatestInterface(self)
-        self.settingInterface = SettingInterface(self)
+        # create sub interface, each one is built when it is first shown
+        self.homeInterface = LazyInterface('homeInterface', 'home_interface', 'HomeInterface', self)
+        self.latestInterface = LazyInterface('latestInterface', 'latest_interface', 'LatestInterface', self)
+        self.searchInterface = LazyInterface('searchInterface', 'search_interface', 'SearchInterface', self)
+        self.downloadInterface = LazyInterface('downloadInterface', 'download_interface', 'DownloadInterface', self)
+        self.settingInterface = LazyInterface('settingInterface', 'setting_interface', 'SettingInterface', self)
 
         # enable acrylic effect
         self.navigationInterface.setAcrylicEnabled(True)
@@ -41,15 +56,19 @@ class MainWindow(FluentWindow):
 
         # add items to navigation interface
         self.initNavigation()
-        self.splashScreen.finish()
+        startupProfiler.mark("create navigation")
 
         # start theme listener
         self.themeListener.start()
 
+        # the splash screen stays until the first frame of the window is painted
+        self.isStarting = True
+        self.update()
+
     def connectSignalToSlot(self):
         """ Connect signal to slot """
         signalBus.micaEnableChanged.connect(self.setMicaEffectEnabled)
-        signalBus.backgroundChanged.connect(self.update)
+        signalBus.backgroundChanged.connect(self._onBackgroundChanged)
 
     def openGitHub(self):
         QDesktopServices.openUrl(QUrl("https://github.com/JustKanade"))
@@ -57,6 +76,8 @@ class MainWindow(FluentWindow):
     def initNavigation(self):
         self.addSubInterface(self.homeInterface, FIF.HOME, self.tr('Home'))
         self.addSubInterface(self.latestInterface, FIF.MUSIC, self.tr('Latest'))
+        self.addSubInterface(self.searchInterface, FIF.SEARCH, self.tr('Search'))
+        self.addSubInterface(self.downloadInterface, FIF.DOWNLOAD, self.tr('Downloads'))
         
         self.navigationInterface.addWidget(
             routeKey='avatar',
@@ -97,8 +118,18 @@ class MainWindow(FluentWindow):
         if hasattr(self, 'splashScreen'):
             self.splashScreen.resize(self.size())
 
+        if hasattr(self, 'backgroundManager'):
+            self.backgroundManager.set_window_size(self.size())
+
     def closeEvent(self, e):
         """ Close event """
+        # close the async connection pool before the event loop stops, but only
+        # if a page loaded the network modules, importing them here would undo the lazy imports
+        if 'app.api.async_khinsider' in sys.modules:
+            from ..api import asyncKhinsider
+            from ..utils import asyncRunner
+            asyncRunner.addShutdownHook(asyncKhinsider.close)
+
         self.themeListener.terminate()
         self.themeListener.deleteLater()
         super().closeEvent(e)
@@ -111,24 +142,40 @@ class MainWindow(FluentWindow):
         if self.isMicaEffectEnabled():
             QTimer.singleShot(100, lambda: self.windowEffect.setMicaEffect(self.winId(), isDarkTheme()))
     
+    def _onBackgroundChanged(self, pixmap: QPixmap):
+        """ Show a newly rendered background """
+        self.backgroundPixmap = pixmap
+        self.update()
+
+    def _onFirstFrame(self):
+        """ Hide the splash screen once the window is interactive """
+        self.splashScreen.finish()
+        startupProfiler.report()
+
+        # the Latest interface is built on first navigation, its albums are fetched before that
+        if cfg.get(cfg.prefetchCategories):
+            QTimer.singleShot(self.WARM_UP_DELAY, lambda: categoryWarmer.start(self.WARM_UP_LIMIT))
+
     def paintEvent(self, event):
         """ Paint event for background rendering """
         super().paintEvent(event)
-        
-        # check if background manager is initialized
-        if not hasattr(self, 'backgroundManager'):
+
+        if getattr(self, 'isStarting', False):
+            self.isStarting = False
+            startupProfiler.mark("first frame")
+            QTimer.singleShot(0, self._onFirstFrame)
+
+        # the frame is rendered with its opacity, previews and frames of an earlier size are stretched
+        pixmap = getattr(self, 'backgroundPixmap', None)
+        if not pixmap or pixmap.isNull():
             return
-        
-        if self.backgroundManager.is_background_enabled():
-            painter = QPainter(self)
-            background_pixmap = self.backgroundManager.get_background_pixmap(self.size())
-            
-            if background_pixmap:
-                # set opacity
-                opacity = self.backgroundManager.get_background_opacity() / 100.0
-                painter.setOpacity(opacity)
-                
-                # draw background
-                painter.drawPixmap(0, 0, background_pixmap)
-                painter.end()
 
+        source = QRect(QPoint(0, 0), self.size().scaled(pixmap.size(), Qt.KeepAspectRatio))
+        source.moveCenter(pixmap.rect().center())
+
+        painter = QPainter(self)
+        if source.size() != self.size():
+            painter.setRenderHint(QPainter.SmoothPixmapTransform)
+
+        painter.drawPixmap(self.rect(), pixmap, source)
+        painter.end()
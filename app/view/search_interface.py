@@ -0,0 +1,206 @@
+# coding:utf-8
+from typing import Dict, List
+
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout
+from qfluentwidgets import SubtitleLabel, SearchLineEdit, CaptionLabel, BodyLabel, IndeterminateProgressRing
+
+from ..api import KhinsiderAPI, albumIndex, asyncKhinsider
+from ..components import AlbumListView
+from ..utils import asyncRunner
+
+
+class SearchInterface(QWidget):
+    """ Search interface showing local index results after a short pause in typing and site results after a longer one """
+
+    MAX_RESULTS = 200
+
+    # milliseconds typing must pause before the local index is searched
+    LOCAL_SEARCH_DELAY = 80
+
+    # milliseconds typing must pause before the site is searched
+    SEARCH_DELAY = 300
+
+    def __init__(self, parent=None):
+        super().__init__(parent=parent)
+        self.vBoxLayout = QVBoxLayout(self)
+        self.statusLayout = QHBoxLayout()
+
+        # create widgets
+        self.titleLabel = SubtitleLabel(self.tr('Search'), self)
+        self.searchLineEdit = SearchLineEdit(self)
+        self.statusLabel = CaptionLabel(self)
+        self.searchingRing = IndeterminateProgressRing(self)
+        self.albumView = AlbumListView(self)
+        self.emptyLabel = BodyLabel(self.tr('No albums found'), self)
+
+        # the index and the site are only searched once typing pauses, and only for the latest query
+        self.localSearchTimer = QTimer(self)
+        self.localSearchTimer.setSingleShot(True)
+        self.localSearchTimer.setInterval(self.LOCAL_SEARCH_DELAY)
+        self.searchTimer = QTimer(self)
+        self.searchTimer.setSingleShot(True)
+        self.searchTimer.setInterval(self.SEARCH_DELAY)
+        self.searchTask = None
+        self.generation = 0
+
+        self.query = ''
+        self.localAlbums = []   # type: List[Dict]
+        self.siteAlbums = []    # type: List[Dict]
+        self.isPreliminary = False  # whether the site results are guessed from a broader query
+
+        self.__initWidget()
+        self.__initLayout()
+
+    def __initWidget(self):
+        """ Initialize widget """
+        self.setObjectName('searchInterface')
+
+        self.searchLineEdit.setPlaceholderText(self.tr('Search albums by title, platform or year'))
+        self.searchLineEdit.setClearButtonEnabled(True)
+        self.searchLineEdit.setFixedWidth(400)
+        self.statusLabel.setTextColor("#606060", "#d2d2d2")
+        self.searchingRing.setFixedSize(16, 16)
+        self.searchingRing.setStrokeWidth(2)
+        self.searchingRing.hide()
+        self.emptyLabel.setAlignment(Qt.AlignCenter)
+        self.emptyLabel.hide()
+
+        self.searchLineEdit.textChanged.connect(self.search)
+        self.searchLineEdit.searchSignal.connect(self.__searchSiteNow)
+        self.searchLineEdit.clearSignal.connect(lambda: self.search(''))
+        self.localSearchTimer.timeout.connect(self.__searchLocal)
+        self.searchTimer.timeout.connect(self.__searchSite)
+
+        self.__updateResults()
+
+    def __initLayout(self):
+        """ Initialize layout """
+        self.statusLayout.setContentsMargins(0, 0, 0, 0)
+        self.statusLayout.setSpacing(8)
+        self.statusLayout.addWidget(self.statusLabel)
+        self.statusLayout.addWidget(self.searchingRing)
+        self.statusLayout.addStretch(1)
+
+        self.vBoxLayout.setContentsMargins(36, 36, 36, 0)
+        self.vBoxLayout.setSpacing(12)
+        self.vBoxLayout.addWidget(self.titleLabel)
+        self.vBoxLayout.addSpacing(8)
+        self.vBoxLayout.addWidget(self.searchLineEdit, 0, Qt.AlignLeft)
+        self.vBoxLayout.addLayout(self.statusLayout)
+        self.vBoxLayout.addWidget(self.emptyLabel)
+        self.vBoxLayout.addWidget(self.albumView, 1)
+
+    def search(self, text: str):
+        """ Schedule searches of the local index and the site for text """
+        query = KhinsiderAPI.normalizeQuery(text)
+        if query == self.query:
+            return
+
+        self.query = query
+        self.siteAlbums = []
+        self.isPreliminary = False
+        self.__cancelSiteSearch()
+
+        # results of the previous query stay visible until the index answers
+        if query:
+            self.localSearchTimer.start()
+        else:
+            self.localSearchTimer.stop()
+            self.localAlbums = []
+
+        # refined queries show results guessed from a broader query until the site answers
+        cached = KhinsiderAPI.cachedSearch(query) if query else None
+        if cached is not None:
+            self.siteAlbums = cached
+        elif query:
+            self.siteAlbums = KhinsiderAPI.preliminarySearch(query) or []
+            self.isPreliminary = bool(self.siteAlbums)
+            self.searchTimer.start()
+
+        if query:
+            self.__updateStatus()
+        else:
+            self.__updateResults()
+
+    def showEvent(self, e):
+        super().showEvent(e)
+        if not self.query:
+            self.__updateResults()
+
+    def __searchSiteNow(self, text: str):
+        """ Search the index and the site at once when return is pressed """
+        self.search(text)
+        if self.localSearchTimer.isActive():
+            self.localSearchTimer.stop()
+            self.__searchLocal()
+
+        if self.searchTimer.isActive():
+            self.searchTimer.stop()
+            self.__searchSite()
+
+    def __searchLocal(self):
+        self.localAlbums = albumIndex.search(self.query, self.MAX_RESULTS)
+        self.__updateResults()
+
+    def __searchSite(self):
+        self.generation += 1
+        generation = self.generation
+
+        self.searchTask = asyncRunner.submit(asyncKhinsider.search(self.query), self)
+        self.searchTask.finished.connect(lambda albums: self.__onSiteSearchFinished(generation, albums))
+        self.searchTask.error.connect(lambda e: self.__onSiteSearchFinished(generation, []))
+        self.searchingRing.show()
+
+    def __cancelSiteSearch(self):
+        """ Drop the pending or in-flight site search, it was superseded """
+        self.searchTimer.stop()
+        self.generation += 1
+        if self.searchTask is not None:
+            self.searchTask.cancel()
+            self.searchTask = None
+
+        self.searchingRing.hide()
+
+    def __onSiteSearchFinished(self, generation: int, albums: list):
+        # a result queued before the query changed must not replace newer results
+        if generation != self.generation:
+            return
+
+        self.searchTask = None
+        self.siteAlbums = albums
+        self.searchingRing.hide()
+
+        # the guessed results are replaced by the answer of the site
+        if self.isPreliminary:
+            self.isPreliminary = False
+            self.__updateResults()
+            return
+
+        # append instead of replacing, so the local results keep their scroll position
+        urls = {album['url'] for album in self.localAlbums}
+        self.albumView.appendAlbums([album for album in albums if album['url'] not in urls])
+        self.__updateStatus()
+
+    def __updateResults(self):
+        """ Show local results first, followed by site results not found locally """
+        if not self.query:
+            self.albumView.setAlbums([])
+            self.emptyLabel.hide()
+            self.statusLabel.setText(
+                self.tr('{0} albums indexed, albums are added while you browse').format(albumIndex.count()))
+            return
+
+        urls = {album['url'] for album in self.localAlbums}
+        self.albumView.setAlbums(self.localAlbums + [album for album in self.siteAlbums if album['url'] not in urls])
+        self.__updateStatus()
+
+    def __updateStatus(self):
+        """ Show number of results and whether the site is still searched """
+        albums = self.albumView.albumModel.albums
+        isSearching = self.searchTask is not None or self.searchTimer.isActive()
+        self.emptyLabel.setVisible(not albums and not isSearching)
+        if isSearching:
+            self.statusLabel.setText(self.tr('{0} albums, searching KHInsider...').format(len(albums)))
+        else:
+            self.statusLabel.setText(self.tr('{0} albums').format(len(albums)))
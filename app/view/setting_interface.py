@@ -108,6 +108,13 @@ class SettingInterface(ScrollArea):
             ],
             parent=self.personalGroup
         )
+        self.virtualListCard = SwitchSettingCard(
+            FIF.SPEED_HIGH,
+            self.tr('Virtualized album list'),
+            self.tr('Draw album lists with a lightweight view, recommended for browsing long lists'),
+            cfg.virtualAlbumList,
+            self.personalGroup
+        )
         
         # background group - use ExpandSettingCard for collapsible section
         self.backgroundGroup = ExpandSettingCard(
@@ -146,6 +153,23 @@ class SettingInterface(ScrollArea):
         # network group
         self.networkGroup = SettingCardGroup(
             self.tr('Network'), self.scrollWidget)
+        self.prefetchCard = SwitchSettingCard(
+            FIF.SYNC,
+            self.tr('Prefetch categories'),
+            self.tr('Load all soundtrack categories in background after startup, so switching tabs is instant'),
+            cfg.prefetchCategories,
+            self.networkGroup
+        )
+        self.bandwidthCard = OptionsSettingCard(
+            cfg.bandwidthLimit,
+            FIF.SPEED_OFF,
+            self.tr('Download bandwidth'),
+            self.tr('Limit download speed, browsing stays responsive while downloads run'),
+            texts=[
+                self.tr('Unlimited'), '256 KB/s', '512 KB/s', '1 MB/s', '2 MB/s', '5 MB/s', '10 MB/s'
+            ],
+            parent=self.networkGroup
+        )
         self.proxyEnableCard = SwitchSettingCard(
             FIF.GLOBE,
             self.tr('Proxy server'),
@@ -159,6 +183,32 @@ class SettingInterface(ScrollArea):
             self.tr('Set proxy host and port'),
             self.networkGroup
         )
+        
+        # download group
+        self.downloadGroup = SettingCardGroup(
+            self.tr('Download'), self.scrollWidget)
+        self.downloadFolderCard = PushSettingCard(
+            self.tr('Choose folder'),
+            FIF.DOWNLOAD,
+            self.tr('Download directory'),
+            cfg.get(cfg.downloadFolder),
+            self.downloadGroup
+        )
+        self.downloadConcurrencyCard = RangeSettingCard(
+            cfg.downloadConcurrency,
+            FIF.SPEED_HIGH,
+            self.tr('Parallel downloads'),
+            self.tr('Number of tracks downloaded at the same time'),
+            self.downloadGroup
+        )
+        self.downloadFormatCard = OptionsSettingCard(
+            cfg.downloadFormat,
+            FIF.MUSIC,
+            self.tr('Preferred format'),
+            self.tr('Tracks without this format are downloaded in another one'),
+            texts=['MP3', 'FLAC'],
+            parent=self.downloadGroup
+        )
 
         self.__initWidget()
 
@@ -190,6 +240,7 @@ class SettingInterface(ScrollArea):
         self.personalGroup.addSettingCard(self.micaCard)
         self.personalGroup.addSettingCard(self.languageCard)
         self.personalGroup.addSettingCard(self.dpiCard)
+        self.personalGroup.addSettingCard(self.virtualListCard)
         
         # add widgets to expand card view instead of as setting cards
         self.backgroundGroup.viewLayout.addWidget(self.backgroundEnableCard)
@@ -200,6 +251,12 @@ class SettingInterface(ScrollArea):
         
         self.networkGroup.addSettingCard(self.proxyEnableCard)
         self.networkGroup.addSettingCard(self.proxyHostCard)
+        self.networkGroup.addSettingCard(self.prefetchCard)
+        self.networkGroup.addSettingCard(self.bandwidthCard)
+        
+        self.downloadGroup.addSettingCard(self.downloadFolderCard)
+        self.downloadGroup.addSettingCard(self.downloadConcurrencyCard)
+        self.downloadGroup.addSettingCard(self.downloadFormatCard)
 
         # add setting card group to layout
         self.expandLayout.setSpacing(28)
@@ -207,6 +264,7 @@ class SettingInterface(ScrollArea):
         self.expandLayout.addWidget(self.personalGroup)
         self.expandLayout.addWidget(self.backgroundGroup)
         self.expandLayout.addWidget(self.networkGroup)
+        self.expandLayout.addWidget(self.downloadGroup)
         
         # load proxy settings
         self.__loadProxySettings()
@@ -225,13 +283,19 @@ class SettingInterface(ScrollArea):
         self.backgroundEnableCard.checkedChanged.connect(self.__onBackgroundEnabledChanged)
         self.backgroundFileCard.selectButton.clicked.connect(self.__onChooseBackgroundFile)
         self.backgroundFileCard.clearButton.clicked.connect(self.__onClearBackgroundImage)
-        self.backgroundOpacityCard.valueChanged.connect(self.__onBackgroundSettingChanged)
-        self.backgroundBlurCard.valueChanged.connect(self.__onBackgroundSettingChanged)
+
+        # render cheap previews while a background slider is dragged
+        for card in (self.backgroundOpacityCard, self.backgroundBlurCard):
+            card.slider.sliderPressed.connect(lambda: signalBus.backgroundPreviewChanged.emit(True))
+            card.slider.sliderReleased.connect(lambda: signalBus.backgroundPreviewChanged.emit(False))
         
         # proxy settings
         self.proxyEnableCard.checkedChanged.connect(self.__onProxyEnabledChanged)
         self.proxyHostCard.hostLineEdit.textChanged.connect(self.__onProxyHostChanged)
         self.proxyHostCard.portLineEdit.textChanged.connect(self.__onProxyPortChanged)
+        
+        # download settings
+        self.downloadFolderCard.clicked.connect(self.__onDownloadFolderCardClicked)
     
     def __loadProxySettings(self):
         """ Load proxy settings from config """
@@ -256,10 +320,19 @@ class SettingInterface(ScrollArea):
         """ Handle proxy port changed """
         cfg.set(cfg.proxyPort, text)
 
+    def __onDownloadFolderCardClicked(self):
+        """ Handle download folder card clicked """
+        folder = QFileDialog.getExistingDirectory(
+            self, self.tr("Choose folder"), cfg.get(cfg.downloadFolder))
+        if not folder or cfg.get(cfg.downloadFolder) == folder:
+            return
+        
+        cfg.set(cfg.downloadFolder, folder)
+        self.downloadFolderCard.setContent(folder)
+
     def __onBackgroundEnabledChanged(self, checked: bool):
         """ Handle background enabled changed """
         self.__updateBackgroundCardStates()
-        self.__onBackgroundSettingChanged()
     
     def __updateBackgroundCardStates(self):
         """ Update background card enabled states """
@@ -282,7 +355,6 @@ class SettingInterface(ScrollArea):
             if BackgroundManager.validate_image_path(file_path):
                 cfg.set(cfg.backgroundImagePath, file_path)
                 self.backgroundFileCard._updateDisplay()
-                self.__onBackgroundSettingChanged()
             else:
                 InfoBar.error(
                     self.tr('Invalid image'),
@@ -295,12 +367,6 @@ class SettingInterface(ScrollArea):
         """ Handle clear background image """
         cfg.set(cfg.backgroundImagePath, "")
         self.backgroundFileCard._updateDisplay()
-        self.__onBackgroundSettingChanged()
-    
-    def __onBackgroundSettingChanged(self):
-        """ Handle background setting changed """
-        # trigger main window repaint
-        signalBus.backgroundChanged.emit()
 
     def __showRestartTooltip(self):
         """ Show restart tooltip """
@@ -0,0 +1,199 @@
+# coding:utf-8
+"""
+Benchmark of the background blur
+
+Compares the scale-down/scale-up blur the background manager used before
+with `app.background.blur`, for every installed blur backend, on synthetic
+images at common window sizes. For each method, backend, size and radius it
+reports the median time, and with NumPy installed, the error against an exact
+Gaussian blur with clamped edges, measured on a smaller image.
+
+Usage (from the repository root):
+
+    python -m benchmarks.blur [--repeat 5] [--size 1920x1080] [--radius 25] [--output FILE]
+
+Results are written as JSON.
+"""
+import argparse
+import json
+import math
+import platform
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from PyQt5.QtCore import QSize, Qt
+from PyQt5.QtGui import QColor, QImage, QLinearGradient, QPainter
+
+from app.background import blur
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+SIZES = ((1280, 720), (1920, 1080), (3840, 2160))
+RADII = (0, 5, 10, 25, 50)
+ERROR_SIZE = (640, 360)
+
+
+def testImage(width: int, height: int) -> QImage:
+    """ Create an image with gradients, hard edges and fine stripes """
+    image = QImage(width, height, blur.BLUR_FORMAT)
+    gradient = QLinearGradient(0, 0, width, height)
+    gradient.setColorAt(0, QColor(20, 40, 120))
+    gradient.setColorAt(1, QColor(230, 160, 40))
+
+    painter = QPainter(image)
+    painter.fillRect(image.rect(), gradient)
+
+    cell = max(8, width // 16)
+    for y in range(0, height, cell):
+        for x in range((y // cell) % 2 * cell, width, 2 * cell):
+            painter.fillRect(x, y, cell // 2, cell // 2, QColor(255, 255, 255, 160))
+
+    for x in range(0, width // 3, 2):
+        painter.fillRect(x, height // 2, 1, height // 4, QColor(0, 0, 0))
+
+    painter.end()
+    return image
+
+
+def legacyBlur(image: QImage, radius: int) -> QImage:
+    """ Scale-down/scale-up blur of the previous background manager """
+    if radius <= 0:
+        return image
+
+    factor = max(0.25, 1.0 - (radius / 100.0))
+    small = image.scaled(QSize(int(image.width() * factor), int(image.height() * factor)),
+                         Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    return small.scaled(image.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation)
+
+
+def gaussianBlur(image: QImage, radius: int):
+    """ Exact separable Gaussian with clamped edges, as a float array """
+    image = image.convertToFormat(blur.BLUR_FORMAT)
+    array = blur._imageArray(image).astype(np.float64)
+    sigma = blur.sigmaForRadius(radius)
+    if sigma <= 0:
+        return array
+
+    reach = math.ceil(3 * sigma)
+    kernel = np.exp(-np.arange(-reach, reach + 1) ** 2 / (2 * sigma * sigma))
+    kernel /= kernel.sum()
+
+    for axis in (0, 1):
+        length = array.shape[axis]
+        padWidth = [(0, 0)] * 3
+        padWidth[axis] = (reach, reach)
+        padded = np.pad(array, padWidth, mode='edge')
+        array = sum(
+            weight * np.take(padded, np.arange(i, i + length), axis=axis)
+            for i, weight in enumerate(kernel)
+        )
+
+    return array
+
+
+def blurError(method, radius: int) -> dict:
+    """ Compare a blur with the exact Gaussian, in 8-bit channel levels """
+    image = testImage(*ERROR_SIZE)
+    expected = gaussianBlur(image, radius)
+    blurred = method(image, radius).convertToFormat(blur.BLUR_FORMAT)
+    actual = blur._imageArray(blurred).astype(np.float64)
+    difference = np.abs(actual - expected)
+    return {'mean': round(float(difference.mean()), 3), 'max': round(float(difference.max()), 1)}
+
+
+def timeit(func, repeat: int) -> dict:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1000)
+
+    return {'median': round(statistics.median(times), 3), 'min': round(min(times), 3)}
+
+
+def methods(backends: list) -> list:
+    """ Get (name, backend, function) tuples of the blurs to compare """
+    result = [('legacy', None, legacyBlur)]
+    result += [('blur', backend, blur.blurImage) for backend in backends]
+    return result
+
+
+def run(sizes: list, radii: list, backends: list, repeat: int) -> list:
+    results = []
+    for width, height in sizes:
+        image = testImage(width, height)
+        for name, backend, method in methods(backends):
+            if backend:
+                blur.setBackend(backend)
+
+            for radius in radii:
+                method(image, radius)    # warm up
+                timing = timeit(lambda: method(image, radius), repeat)
+                error = blurError(method, radius) if np is not None else None
+
+                results.append({
+                    'method': name,
+                    'backend': backend,
+                    'size': f"{width}x{height}",
+                    'radius': radius,
+                    'ms': timing,
+                    'error': error
+                })
+                errorText = f"  error mean {error['mean']:>6.2f} max {error['max']:>6.1f}" if error else ''
+                print(f"{name:<7} {backend or '-':<7} {width}x{height:<5} r={radius:<3} "
+                      f"{timing['median']:>9.2f} ms{errorText}", file=sys.stderr)
+
+    return results
+
+
+def parseSize(text: str) -> tuple:
+    width, _, height = text.lower().partition('x')
+    return int(width), int(height)
+
+
+def main():
+    argParser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    argParser.add_argument('--repeat', type=int, default=5, help='runs per measurement')
+    argParser.add_argument('--size', action='append', type=parseSize, help='image size like 1920x1080, may be repeated')
+    argParser.add_argument('--radius', action='append', type=int, help='blur radius, may be repeated')
+    argParser.add_argument('--backend', action='append', help='blur backend to run, may be repeated')
+    argParser.add_argument('--output', help='write JSON results to this file instead of stdout')
+    args = argParser.parse_args()
+
+    backends = args.backend or blur.availableBackends()
+    sizes = args.size or SIZES
+    radii = args.radius or RADII
+    defaultBackend = blur.backend()
+
+    try:
+        results = run(sizes, radii, backends, max(1, args.repeat))
+    finally:
+        blur.setBackend(defaultBackend)
+
+    report = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': np.__version__ if np is not None else None,
+        'backends': backends,
+        'repeat': args.repeat,
+        'errorSize': f"{ERROR_SIZE[0]}x{ERROR_SIZE[1]}",
+        'results': results
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text, encoding='utf-8')
+    else:
+        print(text)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,294 @@
+# coding:utf-8
+"""
+Offline benchmark of the KhinsiderAPI scrapers
+
+Runs the scrapers against synthetic album and category pages, and against
+recorded pages if a fixture directory is given. Nothing is fetched from the
+live site. For each function, fixture and parser backend it reports:
+
+* parse time: the function with its page served from memory
+* peak allocations: traced with tracemalloc during one parse
+* end-to-end latency: the function fetching the page from a local HTTP server
+
+Before timing, the output of every backend is checked against html.parser.
+
+Usage (from the repository root):
+
+    python -m benchmarks.scrapers [--repeat 5] [--fixtures DIR] [--output FILE]
+
+Recorded fixtures are `album_<name>.html` and `category_<name>.html` files,
+by default those in `tests/fixtures` which the parser tests check as well.
+Results are written as JSON.
+"""
+import argparse
+import http.server
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+import bs4
+
+from app.api import AlbumIndex, KhinsiderAPI, ResponseCache, parser
+from app.api import khinsider
+
+FIXTURE_DIR = Path(__file__).resolve().parent.parent / 'tests' / 'fixtures'
+
+ALBUM_SIZES = (10, 100, 1000, 5000)
+CATEGORY_SIZES = (20, 50, 200, 1000)
+
+FUNCTIONS = {
+    'album': ('fetchAlbumTracks', 'fetchAlbumCovers', 'fetchAlbumDetails'),
+    'category': ('_fetchAlbumsFromUrl', )
+}
+
+
+def albumPage(tracks: int) -> str:
+    """ Create an album page with the given number of tracks """
+    rows = ''.join(
+        f'<tr><td class="playlistDownloadSong"></td><td align="right">{i + 1}.</td>'
+        f'<td class="clickable-row"><a href="/game-soundtracks/album/bench/{i + 1:04d}.mp3">Track {i + 1}</a></td>'
+        f'<td class="clickable-row" align="right"><a href="/game-soundtracks/album/bench/{i + 1:04d}.mp3">{i % 10}:{i % 60:02d}</a></td>'
+        f'<td class="clickable-row" align="right"><a href="/game-soundtracks/album/bench/{i + 1:04d}.mp3">{i % 9 + 1}.2 MB</a></td></tr>\n'
+        for i in range(tracks)
+    )
+    covers = ''.join(
+        f'<div class="albumImage"><a href="/soundtracks/bench/{i}.jpg" target="_blank">'
+        f'<img src="/soundtracks/bench/thumbs/{i}.jpg"></a></div>'
+        for i in range(4)
+    )
+    return (
+        '<html><head><title>Bench</title></head><body><div id="header"><a href="/">Home</a></div>'
+        '<div id="pageContent"><h2>Benchmark Soundtrack</h2>'
+        f'<table><tr><td>{covers}</td></tr></table>'
+        '<p align="left">Platforms: <a href="/game-soundtracks/pc">PC</a><br>\n'
+        'Year: <b>2024</b><br>\nCatalog Number: <b>BENCH-001</b><br>\n'
+        f'Number of Files: <b>{tracks}</b><br>\nAlbum type: <b>Soundtrack</b><br>\n</p>'
+        '<table id="songlist"><tr id="songlist_header"><th>&nbsp;</th><th>#</th><th>Song Name</th><th>Time</th><th>Size</th></tr>\n'
+        f'{rows}</table></div><div id="footer">' + '<p>footer</p>' * 50 + '</div></body></html>'
+    )
+
+
+def categoryPage(albums: int) -> str:
+    """ Create a browse page with the given number of albums """
+    rows = ''.join(
+        f'<tr><td><a href="/game-soundtracks/album/bench-{i}"><img src="/thumbs/{i}.jpg"></a></td>'
+        f'<td><a href="/game-soundtracks/album/bench-{i}">Benchmark Album {i}</a></td>'
+        f'<td><a href="/game-soundtracks/pc">PC</a>, <a href="/game-soundtracks/ps5">PS5</a></td>'
+        f'<td>Soundtrack</td><td>{2000 + i % 25}</td></tr>\n'
+        for i in range(albums)
+    )
+    return (
+        '<html><body><div id="header"><a href="/">Home</a></div><div id="pageContent">'
+        '<table class="albumList"><tr><th></th><th>Album</th><th>Platform</th><th>Type</th><th>Year</th></tr>\n'
+        f'{rows}</table></div></body></html>'
+    )
+
+
+def loadFixtures(directory: str = None) -> list:
+    """ Get (kind, name, size, content) tuples of synthetic and recorded fixtures """
+    fixtures = [('album', f'synthetic-{n}', n, albumPage(n).encode()) for n in ALBUM_SIZES]
+    fixtures += [('category', f'synthetic-{n}', n, categoryPage(n).encode()) for n in CATEGORY_SIZES]
+
+    if directory:
+        for path in sorted(Path(directory).glob('*.html')):
+            kind, _, name = path.stem.partition('_')
+            if kind not in FUNCTIONS:
+                continue
+
+            # a recorded listing links to pages that are not recorded, stop at its last album
+            content = path.read_bytes()
+            size = len(KhinsiderAPI._parseCategoryPage(content, '', 10 ** 6)[0]) if kind == 'category' else None
+            fixtures.append((kind, name or path.stem, size, content))
+
+    return fixtures
+
+
+class MemoryCache:
+    """ Stand-in for the response cache which serves pages from memory """
+
+    def __init__(self, pages: dict):
+        self.pages = pages
+
+    def fetch(self, url, ttl, **kwargs):
+        return self.pages[url]
+
+
+class FixtureServer:
+    """ Local HTTP stand-in for downloads.khinsider.com """
+
+    def __init__(self, pages: dict):
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True    # headers and body go out in separate writes
+
+            def do_GET(self):
+                content = pages.get(self.path)
+                self.send_response(200 if content is not None else 404)
+                content = content or b''
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def url(self, path: str) -> str:
+        return f"http://127.0.0.1:{self.server.server_port}{path}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def call(function: str, url: str, size):
+    """ Call a scraper the way the application does """
+    if function == '_fetchAlbumsFromUrl':
+        return KhinsiderAPI._fetchAlbumsFromUrl(url, size or 10 ** 6, 0)
+
+    return getattr(KhinsiderAPI, function)(url)
+
+
+def timeit(func, repeat: int) -> dict:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1000)
+
+    return {'median': round(statistics.median(times), 3), 'min': round(min(times), 3)}
+
+
+def peakAllocations(func) -> int:
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def checkParity(fixtures: list, backends: list) -> list:
+    """ Compare the output of every backend with html.parser, returns mismatches """
+    mismatches = []
+    for kind, name, size, content in fixtures:
+        url = f"/{kind}/{name}"
+        khinsider.responseCache = MemoryCache({url: content})
+        for function in FUNCTIONS[kind]:
+            parser.setBackend('html.parser')
+            expected = call(function, url, size)
+            for backend in backends:
+                parser.setBackend(backend)
+                if call(function, url, size) != expected:
+                    mismatches.append({'function': function, 'fixture': name, 'backend': backend})
+
+    return mismatches
+
+
+def run(fixtures: list, backends: list, repeat: int) -> list:
+    results = []
+    pages = {f"/{kind}/{name}": content for kind, name, _, content in fixtures}
+    originalCache = khinsider.responseCache
+
+    with FixtureServer(pages) as server, tempfile.TemporaryDirectory() as cacheDir:
+        # empty disk cache with nothing fresh, so every call downloads the page
+        networkCache = ResponseCache(cacheDir)
+        originalTtl = KhinsiderAPI.ALBUM_TTL
+        KhinsiderAPI.ALBUM_TTL = 0
+
+        try:
+            for kind, name, size, content in fixtures:
+                path = f"/{kind}/{name}"
+                for backend in backends:
+                    parser.setBackend(backend)
+                    for function in FUNCTIONS[kind]:
+                        khinsider.responseCache = MemoryCache({path: content})
+                        parse = timeit(lambda: call(function, path, size), repeat)
+                        peak = peakAllocations(lambda: call(function, path, size))
+
+                        khinsider.responseCache = networkCache
+                        url = server.url(path)
+                        call(function, url, size)    # warm up the connection
+                        networkCache.clear()
+                        endToEnd = timeit(lambda: (networkCache.clear(), call(function, url, size)), repeat)
+
+                        results.append({
+                            'function': function,
+                            'fixture': name,
+                            'size': size,
+                            'bytes': len(content),
+                            'backend': backend,
+                            'parseMs': parse,
+                            'peakAllocKb': round(peak / 1024, 1),
+                            'endToEndMs': endToEnd
+                        })
+                        print(f"{function:<20} {name:<18} {backend:<12} "
+                              f"parse {parse['median']:>9.2f} ms  peak {peak / 1024:>9.1f} KiB  "
+                              f"e2e {endToEnd['median']:>9.2f} ms", file=sys.stderr)
+        finally:
+            KhinsiderAPI.ALBUM_TTL = originalTtl
+            khinsider.responseCache = originalCache
+
+    return results
+
+
+def main():
+    argParser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    argParser.add_argument('--repeat', type=int, default=5, help='runs per measurement')
+    argParser.add_argument('--fixtures', default=str(FIXTURE_DIR),
+                           help='directory with recorded album_*.html / category_*.html pages')
+    argParser.add_argument('--backend', action='append', help='parser backend to run, may be repeated')
+    argParser.add_argument('--output', help='write JSON results to this file instead of stdout')
+    args = argParser.parse_args()
+
+    backends = args.backend or parser.availableBackends()
+    fixtures = loadFixtures(args.fixtures)
+    defaultBackend = parser.backend()
+    originalIndex = khinsider.albumIndex
+
+    # synthetic albums must not end up in the user's search index
+    with tempfile.TemporaryDirectory() as indexDir:
+        khinsider.albumIndex = AlbumIndex(Path(indexDir) / 'albums.db')
+        try:
+            mismatches = checkParity(fixtures, backends)
+            results = run(fixtures, backends, max(1, args.repeat))
+        finally:
+            parser.setBackend(defaultBackend)
+            khinsider.albumIndex.close()
+            khinsider.albumIndex = originalIndex
+
+    report = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'bs4': bs4.__version__,
+        'backends': backends,
+        'repeat': args.repeat,
+        'parityMismatches': mismatches,
+        'results': results
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text, encoding='utf-8')
+    else:
+        print(text)
+
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
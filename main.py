@@ -2,12 +2,18 @@
 import os
 import sys
 
+from app.utils.startup_profiler import startupProfiler
+
 from PyQt5.QtCore import Qt, QTranslator
 from PyQt5.QtWidgets import QApplication
+startupProfiler.mark("import Qt")
+
 from qfluentwidgets import FluentTranslator
+from app.common.config import cfg, loadConfig
+startupProfiler.mark("import qfluentwidgets")
 
-from app.common.config import cfg
-from app.view.main_window import MainWindow
+loadConfig()
+startupProfiler.mark("load config")
 
 
 # enable dpi scale
@@ -24,6 +30,7 @@ QApplication.setAttribute(Qt.AA_UseHighDpiPixmaps)
 # create application
 app = QApplication(sys.argv)
 app.setAttribute(Qt.AA_DontCreateNativeWidgetSiblings)
+startupProfiler.mark("create application")
 
 # internationalization
 locale = cfg.get(cfg.language).value
@@ -33,8 +40,12 @@ appTranslator.load(locale, "app", ".", "app/resource/i18n")
 
 app.installTranslator(translator)
 app.installTranslator(appTranslator)
+startupProfiler.mark("install translators")
+
+# create main window, the interfaces are imported when first shown
+from app.view.main_window import MainWindow
+startupProfiler.mark("import main window")
 
-# create main window
 w = MainWindow()
 w.show()
 
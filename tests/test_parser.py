@@ -0,0 +1,159 @@
+# coding:utf-8
+"""
+Parity tests of app.api.parser
+
+The filtered parse of every backend must extract the same data as a full
+html.parser parse, and the streaming track parser the same tracks as
+`KhinsiderAPI._parseAlbumTracks` on a full parse. Besides generated pages,
+every `album_*.html` and `category_*.html` page in `tests/fixtures` is checked,
+the directory `python -m benchmarks.scrapers` reads its fixtures from too.
+Run from the repository root:
+
+    python -m pytest tests
+"""
+from pathlib import Path
+
+import pytest
+from bs4 import BeautifulSoup
+
+from app.api import KhinsiderAPI, parser
+from app.api.parser import ALBUM_HEADER_RULES, ALBUM_PAGE_RULES, TrackStreamParser
+from benchmarks.scrapers import albumPage, categoryPage
+
+PAGE_URL = KhinsiderAPI.BASE_URL + '/game-soundtracks/browse/bench'
+
+FIXTURE_DIR = Path(__file__).parent / 'fixtures'
+
+
+def loadFixtures(kind: str) -> dict:
+    """ Pages of a kind in the fixture directory, line endings are kept as served """
+    return {f'fixture-{path.stem.partition("_")[2]}': path.read_bytes().decode('utf-8')
+            for path in sorted(FIXTURE_DIR.glob(f'{kind}_*.html'))}
+
+
+NESTED_ROWS = (
+    # a table nested in the name cell, its cells become columns of the row too
+    '<tr><td></td><td>1.</td><td><table><tr><td>Disc</td><td><a href="/nested/1.mp3">Nested 1</a></td>'
+    '<td>0:42</td></tr></table></td><td><a href="/nested/outer.mp3">Outer</a></td><td>1 MB</td></tr>\n'
+    # a table nested in a trailing cell, its row is a row of the song list too
+    '<tr><td></td><td>2.</td><td><a href="/nested/2.mp3">Nested <b>2</b></a></td><td>1:05</td>'
+    '<td><table><tr><td>a</td><td>b</td><td><a href="/nested/inner.mp3">Inner</a></td><td>9:99</td></tr>'
+    '</table></td></tr>\n'
+    # unclosed cells and rows end where the next one starts
+    '<tr><td><td>3.<td><a href="/nested/3.mp3">Unclosed &amp; Co</a><td>2:10\n'
+)
+
+ALBUM_PAGES = {
+    'synthetic-10': albumPage(10),
+    'synthetic-100': albumPage(100),
+    'nested': albumPage(3).replace('</table></div><div id="footer">', NESTED_ROWS + '</table></div><div id="footer">'),
+    'no-songlist': albumPage(0).replace('id="songlist"', 'id="other"'),
+    **loadFixtures('album')
+}
+
+CATEGORY_PAGES = {
+    'synthetic-20': categoryPage(20),
+    'synthetic-200': categoryPage(200),
+    'paginated': categoryPage(20).replace(
+        '</div></body>',
+        '<div class="pagination"><a href="?page=1">1</a> <a href="?page=2">2</a> '
+        '<a href="?page=2">Next &gt;</a></div></div></body>'),
+    'next-titled-album': categoryPage(5).replace('Benchmark Album 3', 'Next Level'),
+    **loadFixtures('category')
+}
+
+
+@pytest.fixture(params=parser.availableBackends())
+def backend(request):
+    default = parser.backend()
+    parser.setBackend(request.param)
+    yield request.param
+    parser.setBackend(default)
+
+
+def fullParse(content: str) -> BeautifulSoup:
+    """ Unfiltered html.parser parse, the baseline of every comparison """
+    return BeautifulSoup(content, 'html.parser')
+
+
+def streamTracks(content: str, chunkSize: int) -> list:
+    streamParser = TrackStreamParser(KhinsiderAPI.BASE_URL)
+    data = content.encode('utf-8')
+    tracks = []
+    for i in range(0, len(data), chunkSize):
+        streamParser.feed(data[i:i + chunkSize])
+        tracks += streamParser.takeTracks()
+
+    streamParser.close()
+    return tracks + streamParser.takeTracks()
+
+
+@pytest.mark.skipif(parser.RuleFilter is None, reason="bs4 is too old for tag filters")
+@pytest.mark.parametrize('name', ALBUM_PAGES)
+def test_filtered_album_page_matches_full_parse(backend, name):
+    content = ALBUM_PAGES[name]
+    expected = KhinsiderAPI._parseAlbumDetails(fullParse(content))
+
+    assert KhinsiderAPI._parseAlbumDetails(parser.parseHtml(content, ALBUM_PAGE_RULES)) == expected
+    assert KhinsiderAPI._parseAlbumHeader(parser.parseHtml(content, ALBUM_HEADER_RULES)) == \
+        KhinsiderAPI._parseAlbumHeader(fullParse(content))
+
+
+@pytest.mark.skipif(parser.RuleFilter is None, reason="bs4 is too old for tag filters")
+@pytest.mark.parametrize('name', CATEGORY_PAGES)
+def test_filtered_category_page_matches_full_parse(backend, name):
+    content = CATEGORY_PAGES[name]
+    soup = fullParse(content)
+    rows = soup.find('table').find_all('tr')[1:]
+    albums = [album for album in map(KhinsiderAPI._parseAlbumRow, rows) if album]
+    nextUrl = KhinsiderAPI._parseNextPageUrl(soup, PAGE_URL)
+
+    expected = (albums, (nextUrl, 0) if nextUrl else None)
+    assert KhinsiderAPI._parseCategoryPage(content.encode('utf-8'), PAGE_URL, 10 ** 6) == expected
+
+
+def test_next_page_link_needs_whole_next_text():
+    assert KhinsiderAPI._parseCategoryPage(
+        CATEGORY_PAGES['paginated'].encode('utf-8'), PAGE_URL, 10 ** 6)[1] == (PAGE_URL + '?page=2', 0)
+    assert KhinsiderAPI._parseCategoryPage(
+        CATEGORY_PAGES['next-titled-album'].encode('utf-8'), PAGE_URL, 10 ** 6)[1] is None
+
+
+@pytest.mark.parametrize('chunkSize', [1, 7, 4096, 10 ** 7])
+@pytest.mark.parametrize('name', ALBUM_PAGES)
+def test_stream_parser_matches_full_parse(backend, name, chunkSize):
+    content = ALBUM_PAGES[name]
+    expected = KhinsiderAPI._parseAlbumTracks(BeautifulSoup(content, backend))
+
+    assert streamTracks(content, chunkSize) == expected
+    assert expected == KhinsiderAPI._parseAlbumTracks(fullParse(content))
+
+
+def test_stream_parser_reads_nested_rows():
+    names = [track['name'] for track in streamTracks(ALBUM_PAGES['nested'], 4096)]
+    assert names[3:] == ['Nested 1', 'Nested 2', 'Inner', 'Unclosed & Co']
+
+
+@pytest.mark.parametrize('name', loadFixtures('album'))
+def test_album_fixture_yields_details(name):
+    # parity alone would pass if markup drift left every parser with nothing
+    details = KhinsiderAPI._parseAlbumDetails(parser.parseHtml(ALBUM_PAGES[name], ALBUM_PAGE_RULES))
+    assert details['tracks'] and all(track['name'] and track['url'] for track in details['tracks'])
+    assert details['covers'] and details['info'].get('title') and details['info'].get('platforms')
+    assert len(details['tracks']) == int(details['info']['number_of_files'])
+
+
+@pytest.mark.parametrize('name', loadFixtures('category'))
+def test_category_fixture_yields_albums(name):
+    albums, _ = KhinsiderAPI._parseCategoryPage(CATEGORY_PAGES[name].encode('utf-8'), PAGE_URL, 10 ** 6)
+    assert albums and all(album['title'] and album['url'].startswith(KhinsiderAPI.BASE_URL) for album in albums)
+
+
+def test_fixture_pagination():
+    latest = KhinsiderAPI.BASE_URL + '/game-soundtracks/latest'
+    assert KhinsiderAPI._parseCategoryPage(
+        CATEGORY_PAGES['fixture-latest'].encode('utf-8'), latest, 10 ** 6)[1] == (latest + '?page=2', 0)
+
+    # the last page links back only, a "Next" outside the pagination is not followed
+    assert KhinsiderAPI._parseCategoryPage(
+        CATEGORY_PAGES['fixture-browse-last-page'].encode('utf-8'), PAGE_URL, 10 ** 6)[1] is None